@@ -0,0 +1,49 @@
+"""Full-text and trigram search indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ### pg_trgm backs "partial" (ILIKE '%term%') searchable columns ###
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_index(
+        'ix_task_title_trgm', 'task', ['title'],
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_status_name_trgm', 'status', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_category_name_trgm', 'category', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+    # ### generated tsvector backs "fulltext" searchable columns ###
+    op.execute(
+        "ALTER TABLE task ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED"
+    )
+    op.create_index('ix_task_search_vector', 'task', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_search_vector', table_name='task')
+    op.drop_column('task', 'search_vector')
+    op.drop_index('ix_category_name_trgm', table_name='category')
+    op.drop_index('ix_status_name_trgm', table_name='status')
+    op.drop_index('ix_task_title_trgm', table_name='task')
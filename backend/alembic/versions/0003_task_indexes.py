@@ -0,0 +1,33 @@
+"""Task filter and ordering indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # board columns: filter by status, order by priority, id breaks ties for cursors
+    op.create_index('ix_task_status_id_priority', 'task', ['status_id', 'priority', 'id'])
+    op.create_index('ix_task_category_id_priority', 'task', ['category_id', 'priority', 'id'])
+    op.create_index('ix_task_priority', 'task', ['priority', 'id'])
+    op.create_index('ix_task_due_date', 'task', ['due_date', 'id'])
+    op.create_index('ix_task_created_at', 'task', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_created_at', table_name='task')
+    op.drop_index('ix_task_due_date', table_name='task')
+    op.drop_index('ix_task_priority', table_name='task')
+    op.drop_index('ix_task_category_id_priority', table_name='task')
+    op.drop_index('ix_task_status_id_priority', table_name='task')
@@ -0,0 +1,47 @@
+"""Fractional task priority
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'task', 'priority',
+        type_=sa.Float(),
+        existing_type=sa.Integer(),
+        existing_nullable=False,
+        postgresql_using='priority::double precision',
+    )
+    # spread existing priorities so midpoints have room, keeping each column's order
+    op.execute(
+        "UPDATE task SET priority = ranked.position * 1024 "
+        "FROM (SELECT id, row_number() OVER (PARTITION BY status_id ORDER BY priority, id) AS position FROM task) AS ranked "
+        "WHERE task.id = ranked.id"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE task SET priority = ranked.position "
+        "FROM (SELECT id, row_number() OVER (PARTITION BY status_id ORDER BY priority, id) AS position FROM task) AS ranked "
+        "WHERE task.id = ranked.id"
+    )
+    op.alter_column(
+        'task', 'priority',
+        type_=sa.Integer(),
+        existing_type=sa.Float(),
+        existing_nullable=False,
+        postgresql_using='priority::integer',
+    )
@@ -0,0 +1,54 @@
+"""Per-table change versions for conditional GET
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ('task', 'status', 'category')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_version',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+    op.execute(
+        "INSERT INTO table_version (table_name) VALUES "
+        + ", ".join(f"('{table}')" for table in TRACKED_TABLES)
+    )
+    # bumped inside the writing transaction, readers never see a version before its data
+    op.execute("""
+        CREATE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE table_version SET version = version + 1, updated_at = now()
+            WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in TRACKED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_bump_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()"
+        )
+
+
+def downgrade() -> None:
+    for table in TRACKED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table('table_version')
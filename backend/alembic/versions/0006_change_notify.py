@@ -0,0 +1,46 @@
+"""Row triggers publishing entity changes over NOTIFY
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ('task', 'status', 'category')
+
+
+def upgrade() -> None:
+    # only ids go over the wire, payloads stay far below the 8000 byte NOTIFY limit;
+    # notifications are delivered on commit and dropped on rollback
+    op.execute("""
+        CREATE FUNCTION notify_entity_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('entity_changes', json_build_object(
+                'table', TG_TABLE_NAME,
+                'op', CASE TG_OP WHEN 'INSERT' THEN 'create' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END,
+                'id', CASE TG_OP WHEN 'DELETE' THEN OLD.id ELSE NEW.id END
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in TRACKED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_notify_change AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION notify_entity_change()"
+        )
+
+
+def downgrade() -> None:
+    for table in TRACKED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_change ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_entity_change()")
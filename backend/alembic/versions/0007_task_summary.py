@@ -0,0 +1,85 @@
+"""Task counts per status, category and due day, kept by triggers
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# NULL keys (no status, no category, no due date) map to sentinels so they conflict too
+SUMMARY_KEY = "(COALESCE(status_id, 0)), (COALESCE(category_id, 0)), (COALESCE(due_day, 'infinity'::date))"
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_summary',
+        sa.Column('status_id', sa.Integer(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('due_day', sa.Date(), nullable=True),
+        sa.Column('task_count', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.execute(f"CREATE UNIQUE INDEX ux_task_summary_key ON task_summary ({SUMMARY_KEY})")
+
+    # statement-level with transition tables: a bulk insert costs one upsert
+    # per touched group, not one per row; groups are locked in key order
+    upsert = (
+        "INSERT INTO task_summary AS s (status_id, category_id, due_day, task_count) {select} "
+        f"ON CONFLICT ({SUMMARY_KEY}) DO UPDATE SET task_count = s.task_count + EXCLUDED.task_count"
+    )
+    grouped = "SELECT status_id, category_id, due_date::date, {count} FROM {rows} GROUP BY 1, 2, 3 ORDER BY 1, 2, 3"
+    op.execute(f"""
+        CREATE FUNCTION task_summary_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {upsert.format(select=grouped.format(count='count(*)', rows='new_rows'))};
+            ELSIF TG_OP = 'DELETE' THEN
+                {upsert.format(select=grouped.format(count='-count(*)', rows='old_rows'))};
+            ELSIF TG_OP = 'UPDATE' THEN
+                {upsert.format(select='''
+                    SELECT status_id, category_id, due_day, sum(delta) FROM (
+                        SELECT status_id, category_id, due_date::date AS due_day, 1 AS delta FROM new_rows
+                        UNION ALL
+                        SELECT status_id, category_id, due_date::date, -1 FROM old_rows
+                    ) AS changes
+                    GROUP BY 1, 2, 3 HAVING sum(delta) <> 0 ORDER BY 1, 2, 3
+                ''')};
+            ELSE
+                DELETE FROM task_summary;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # transition tables allow one event per trigger
+    op.execute("LOCK TABLE task IN SHARE MODE")
+    for event, rows in (('INSERT', 'NEW TABLE AS new_rows'), ('DELETE', 'OLD TABLE AS old_rows'),
+                        ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows')):
+        op.execute(
+            f"CREATE TRIGGER task_summary_{event.lower()} AFTER {event} ON task "
+            f"REFERENCING {rows} FOR EACH STATEMENT EXECUTE FUNCTION task_summary_apply()"
+        )
+    op.execute(
+        "CREATE TRIGGER task_summary_truncate AFTER TRUNCATE ON task "
+        "FOR EACH STATEMENT EXECUTE FUNCTION task_summary_apply()"
+    )
+    # backfill under the same lock, no write can slip between it and the triggers
+    op.execute(
+        "INSERT INTO task_summary (status_id, category_id, due_day, task_count) "
+        "SELECT status_id, category_id, due_date::date, count(*) FROM task GROUP BY 1, 2, 3"
+    )
+
+
+def downgrade() -> None:
+    for event in ('insert', 'delete', 'update', 'truncate'):
+        op.execute(f"DROP TRIGGER IF EXISTS task_summary_{event} ON task")
+    op.execute("DROP FUNCTION IF EXISTS task_summary_apply()")
+    op.drop_table('task_summary')
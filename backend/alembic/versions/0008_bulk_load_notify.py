@@ -0,0 +1,44 @@
+"""Skip per-row change notifications during bulk loads
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+NOTIFY = """
+    CREATE OR REPLACE FUNCTION notify_entity_change() RETURNS trigger AS $$
+    BEGIN
+        {skip}
+        PERFORM pg_notify('entity_changes', json_build_object(
+            'table', TG_TABLE_NAME,
+            'op', CASE TG_OP WHEN 'INSERT' THEN 'create' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END,
+            'id', CASE TG_OP WHEN 'DELETE' THEN OLD.id ELSE NEW.id END
+        )::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    # an import sets app.bulk_load for its transactions (SET LOCAL) and sends
+    # one id-less "import" notification at the end instead of one per row
+    op.execute(NOTIFY.format(skip="""
+        IF current_setting('app.bulk_load', true) = 'on' THEN
+            RETURN NULL;
+        END IF;
+    """))
+
+
+def downgrade() -> None:
+    op.execute(NOTIFY.format(skip=""))
@@ -0,0 +1,51 @@
+"""Archive table for completed tasks moved out of the hot task table
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # task's columns without foreign keys: archived rows never block
+    # deleting a status or category
+    op.create_table(
+        'task_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('priority', sa.Float(), nullable=False),
+        sa.Column('status_id', sa.Integer(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_archive_status_id_priority', 'task_archive', ['status_id', 'priority', 'id'])
+    op.create_index('ix_task_archive_created_at', 'task_archive', ['created_at', 'id'])
+
+    # same search columns as task, so includeArchived searches match both alike
+    op.execute(
+        "ALTER TABLE task_archive ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED"
+    )
+    op.create_index('ix_task_archive_search_vector', 'task_archive', ['search_vector'], postgresql_using='gin')
+    op.create_index(
+        'ix_task_archive_title_trgm', 'task_archive', ['title'],
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_archive')
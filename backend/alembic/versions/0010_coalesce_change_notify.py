@@ -0,0 +1,75 @@
+"""Coalesce the change notifications of large transactions
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+# Rows per table and transaction announced one by one, keep in step with
+# FEED_BULK_ROWS in app/crud/crud_change_feed.py
+FEED_BULK_ROWS = 100
+
+OP = "CASE TG_OP WHEN 'INSERT' THEN 'create' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END"
+
+
+def upgrade() -> None:
+    # a bulk request, rebalance or archive batch writes thousands of rows in one
+    # transaction; one notification each would overflow every feed subscriber.
+    # Rows are counted in a transaction-local setting per table: the first
+    # FEED_BULK_ROWS are announced by id, the next one as a single event
+    # without an id (clients reload the table) and the rest not at all.
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION notify_entity_change() RETURNS trigger AS $$
+        DECLARE
+            counter text := 'app.feed_rows_' || TG_TABLE_NAME;
+            written integer;
+        BEGIN
+            IF current_setting('app.bulk_load', true) = 'on' THEN
+                RETURN NULL;
+            END IF;
+            written := coalesce(nullif(current_setting(counter, true), ''), '0')::integer + 1;
+            PERFORM set_config(counter, written::text, true);
+            IF written <= {FEED_BULK_ROWS} THEN
+                PERFORM pg_notify('entity_changes', json_build_object(
+                    'table', TG_TABLE_NAME,
+                    'op', {OP},
+                    'id', CASE TG_OP WHEN 'DELETE' THEN OLD.id ELSE NEW.id END
+                )::text);
+            ELSIF written = {FEED_BULK_ROWS} + 1 THEN
+                PERFORM pg_notify('entity_changes', json_build_object(
+                    'table', TG_TABLE_NAME,
+                    'op', {OP}
+                )::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION notify_entity_change() RETURNS trigger AS $$
+        BEGIN
+            IF current_setting('app.bulk_load', true) = 'on' THEN
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify('entity_changes', json_build_object(
+                'table', TG_TABLE_NAME,
+                'op', {OP},
+                'id', CASE TG_OP WHEN 'DELETE' THEN OLD.id ELSE NEW.id END
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
@@ -0,0 +1,80 @@
+"""Table versions from an append-only change log instead of one hot row
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+# pg_try_advisory_xact_lock key pair held while folding the log
+COMPACT_LOCK = (8002, 0)
+
+
+def upgrade() -> None:
+    # 0005 bumped one table_version row per table in every writing
+    # transaction, and the row lock made writers of a table wait for each
+    # other's commit. Now each write statement appends its own row here,
+    # inserts never block each other, and a table's version is its
+    # table_version.version plus its committed rows in the log. The sum only
+    # ever grows at a writer's commit, so a version is still never visible
+    # before its data, on the primary and on replicas alike.
+    op.create_table(
+        'table_change',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_change (table_name) VALUES (TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # moves committed log rows into table_version in one transaction, which
+    # leaves every version unchanged; rows of writers still in flight are
+    # not visible to the DELETE and stay. Concurrent callers skip.
+    op.execute(f"""
+        CREATE FUNCTION compact_table_changes() RETURNS void AS $$
+        BEGIN
+            IF NOT pg_try_advisory_xact_lock({COMPACT_LOCK[0]}, {COMPACT_LOCK[1]}) THEN
+                RETURN;
+            END IF;
+            WITH moved AS (
+                DELETE FROM table_change RETURNING table_name, changed_at
+            ), folded AS (
+                SELECT table_name, count(*) AS changes, max(changed_at) AS changed_at
+                FROM moved GROUP BY table_name
+            )
+            UPDATE table_version
+            SET version = table_version.version + folded.changes,
+                updated_at = greatest(table_version.updated_at, folded.changed_at)
+            FROM folded
+            WHERE table_version.table_name = folded.table_name;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    op.execute("SELECT compact_table_changes()")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE table_version SET version = version + 1, updated_at = now()
+            WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP FUNCTION IF EXISTS compact_table_changes()")
+    op.drop_table('table_change')
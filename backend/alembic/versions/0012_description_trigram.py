@@ -0,0 +1,34 @@
+"""Trigram indexes for substring search on task descriptions
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # description is searchable as "partial" again, next to its tsvector;
+    # the archive gets the same index so includeArchived searches match alike
+    op.create_index(
+        'ix_task_description_trgm', 'task', ['description'],
+        postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_task_archive_description_trgm', 'task_archive', ['description'],
+        postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_archive_description_trgm', table_name='task_archive')
+    op.drop_index('ix_task_description_trgm', table_name='task')
@@ -0,0 +1,52 @@
+"""When each task entered its current status, for archiving by completion time
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+NOW_UTC = "(now() AT TIME ZONE 'utc')"
+
+
+def upgrade() -> None:
+    # a stable default fills existing rows without rewriting the table; when
+    # they entered their status is unknown, so their archival clock starts now
+    op.add_column(
+        'task',
+        sa.Column('status_changed_at', sa.DateTime(), nullable=False, server_default=sa.text(NOW_UTC)),
+    )
+    op.add_column('task_archive', sa.Column('status_changed_at', sa.DateTime(), nullable=True))
+
+    # a row trigger catches every writer: the ORM, bulk executemany updates,
+    # reorder and anything outside the app
+    op.execute(f"""
+        CREATE FUNCTION task_status_changed() RETURNS trigger AS $$
+        BEGIN
+            NEW.status_changed_at := {NOW_UTC};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER task_status_changed BEFORE UPDATE OF status_id ON task FOR EACH ROW "
+        "WHEN (OLD.status_id IS DISTINCT FROM NEW.status_id) EXECUTE FUNCTION task_status_changed()"
+    )
+    op.create_index('ix_task_status_id_status_changed_at', 'task', ['status_id', 'status_changed_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_status_id_status_changed_at', table_name='task')
+    op.execute("DROP TRIGGER task_status_changed ON task")
+    op.execute("DROP FUNCTION task_status_changed()")
+    op.drop_column('task_archive', 'status_changed_at')
+    op.drop_column('task', 'status_changed_at')
@@ -0,0 +1,341 @@
+import asyncio
+import itertools
+import json
+import math
+import os
+import re
+from collections import deque
+from time import perf_counter
+from typing import Deque, Dict, List, Optional, Tuple
+from sqlalchemy.pool import QueuePool
+from app.metrics import Counter, Histogram, WAIT_BUCKETS, current_request_stats, gauge_providers
+
+# Admission control in front of the route handlers, 0 turns it off
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") == "1"
+# Concurrent requests to start with and the bounds the adaptive limit moves in,
+# 0 = sized from the connection pools (pool_size + max_overflow)
+ADMISSION_LIMIT = int(os.getenv("ADMISSION_LIMIT", "0"))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "0"))
+# Requests waiting for a slot, 0 = twice the limit; past it requests are shed
+ADMISSION_QUEUE = int(os.getenv("ADMISSION_QUEUE", "0"))
+# Seconds a request waits for a slot before it is shed
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+# Share of the limit one route may hold, so one slow endpoint cannot take all slots
+ADMISSION_ROUTE_SHARE = float(os.getenv("ADMISSION_ROUTE_SHARE", "0.5"))
+# Share of the limit only writes may use
+ADMISSION_WRITE_RESERVE = float(os.getenv("ADMISSION_WRITE_RESERVE", "0.2"))
+# Latency over a route's baseline, as a factor, above which the limit shrinks
+ADMISSION_LATENCY_TOLERANCE = float(os.getenv("ADMISSION_LATENCY_TOLERANCE", "2"))
+# Path prefixes never queued: scraping, docs, long-lived change feeds
+ADMISSION_EXEMPT = tuple(
+    prefix.strip()
+    for prefix in os.getenv(
+        "ADMISSION_EXEMPT", "/metrics,/docs,/redoc,/openapi.json,/changes,/cache/stats,/replicas/stats"
+    ).split(",")
+    if prefix.strip()
+)
+RETRY_AFTER_SECONDS = 1
+
+# Lower sheds later: writes keep flowing while reads are turned away
+WRITE, READ = 0, 1
+PRIORITY_CLASSES = {WRITE: "write", READ: "read"}
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# POSTs that only read
+READ_POST_SUFFIXES = ("/search",)
+
+ADJUST_EVERY = 20     # completions between limit adjustments
+MAX_ROUTES = 256      # distinct route keys tracked, the rest share one
+LATENCY_WINDOW = 200  # latest timed runs per route the baseline is taken from
+MIN_BASELINE = 20     # timed runs a route needs before it is compared
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+admission_requests = Counter(
+    "admission_requests_total", "Requests by priority class and admission outcome.", ("class", "outcome"),
+)
+admission_wait_seconds = Histogram(
+    "admission_wait_seconds", "Time queued before admission.", ("class",), WAIT_BUCKETS,
+)
+
+
+def _percentile(samples: List[float], share: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+class _RouteLatency:
+    """
+    Run times of one route: the latest LATENCY_WINDOW as the baseline and
+    the runs since the last limit adjustment.
+    """
+    __slots__ = ("window", "recent")
+
+    def __init__(self):
+        self.window: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.recent: List[float] = []
+
+    def ratio(self) -> Optional[float]:
+        """
+        Median of the recent runs over the p90 of the baseline, then folds
+        them into it. A route mixing fast and slow runs has its slow ones
+        within its p90, so only a shift of the typical run counts. Slow
+        runs go in one in ten, so overload does not become the baseline at
+        once but a lasting change does in time. None while there is too
+        little to compare.
+        """
+        recent, self.recent = self.recent, []
+        if not recent:
+            return None
+        ratio = None
+        if len(self.window) >= MIN_BASELINE:
+            ratio = _percentile(recent, 0.5) / max(_percentile(list(self.window), 0.9), 1e-6)
+        slow = ratio is not None and ratio > ADMISSION_LATENCY_TOLERANCE
+        self.window.extend(recent[::10] if slow else recent)
+        return ratio
+
+
+def route_key(path: str) -> str:
+    # "/task/42/reorder" -> "/task/{id}/reorder", bounded without routing first
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+def priority_class(method: str, path: str) -> int:
+    if method in WRITE_METHODS and not path.endswith(READ_POST_SUFFIXES):
+        return WRITE
+    return READ
+
+
+def pool_capacity(engines) -> int:
+    capacity = 0
+    for engine in engines:
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            capacity += pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        else:
+            capacity += 1  # SQLite and other single-connection pools
+    return max(capacity, 1)
+
+
+class _Waiter:
+    __slots__ = ("priority", "sequence", "route", "future")
+
+    def __init__(self, priority: int, sequence: int, route: str, future: asyncio.Future):
+        self.priority = priority
+        self.sequence = sequence
+        self.route = route
+        self.future = future
+
+
+class AdmissionController:
+    """
+    Concurrency limiter for one event loop (one worker process).
+
+    A request runs when fewer than `limit` are in flight (reads leave the
+    write reserve free) and its route holds less than its share; otherwise
+    it queues, writes ahead of reads, and is shed with a 503 when the queue
+    is full or it waited too long. A full queue sheds its newest read to
+    make room for a write.
+
+    The limit adapts to latency: every ADJUST_EVERY completions in which
+    demand reached the limit, it shrinks by 10% when the typical request
+    ran slower than ADMISSION_LATENCY_TOLERANCE times its route's p90 (or
+    most failed), and grows by one otherwise. Without demand at the limit
+    the limit is not what holds requests back, and it stays. Runs that
+    never reached the database (304s, cache hits) are not timed.
+    """
+    def __init__(self, limit: int, min_limit: int, max_limit: int, queue_size: int):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(limit, self.min_limit), self.max_limit))
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self._route_in_flight: Dict[str, int] = {}
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._latencies: Dict[str, _RouteLatency] = {}
+        self._completions = 0
+        self._failures = 0
+        # demand reached the limit since the last adjustment
+        self._saturated = False
+
+    def _route(self, route: str) -> str:
+        if route in self._route_in_flight or len(self._route_in_flight) < MAX_ROUTES:
+            return route
+        return "other"
+
+    def _can_run(self, route: str, priority: int) -> bool:
+        limit = math.floor(self.limit)
+        if priority != WRITE:
+            limit -= max(1, round(limit * ADMISSION_WRITE_RESERVE)) if limit > 1 else 0
+        route_limit = max(1, math.ceil(self.limit * ADMISSION_ROUTE_SHARE))
+        return self.in_flight < limit and self._route_in_flight.get(route, 0) < route_limit
+
+    def _start(self, route: str) -> None:
+        self.in_flight += 1
+        self._route_in_flight[route] = self._route_in_flight.get(route, 0) + 1
+        if self.in_flight >= math.floor(self.limit):
+            self._saturated = True
+
+    async def acquire(self, route: str, priority: int) -> Tuple[str, Optional[str]]:
+        """
+        Wait for a slot. Returns the tracked route key and None once
+        admitted, or the reason the request was shed.
+        """
+        route = self._route(route)
+        ahead = any(waiter.priority <= priority for waiter in self._waiters)
+        if not ahead and self._can_run(route, priority):
+            self._start(route)
+            return route, None
+
+        if len(self._waiters) >= self.queue_size:
+            victim = max(
+                (waiter for waiter in self._waiters if waiter.priority > priority),
+                key=lambda waiter: (waiter.priority, waiter.sequence),
+                default=None,
+            )
+            if victim is None:
+                return route, "queue_full"
+            self._waiters.remove(victim)
+            victim.future.set_result(False)
+
+        self._saturated = True
+        waiter = _Waiter(priority, next(self._sequence), route, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._wake()  # slots held back only by other routes' shares
+        try:
+            done, _ = await asyncio.wait({waiter.future}, timeout=ADMISSION_QUEUE_TIMEOUT)
+        except asyncio.CancelledError:
+            # the client went away while queued
+            self._abandon(waiter)
+            raise
+        if not done:
+            self._waiters.remove(waiter)
+            return route, "timeout"
+        return route, None if waiter.future.result() else "displaced"
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        elif waiter.future.done() and waiter.future.result():
+            # admitted in the meantime, give the slot back
+            self.in_flight -= 1
+            self._route_in_flight[waiter.route] -= 1
+            self._wake()
+
+    def release(self, route: str, seconds: float, failed: bool, timed: bool = True) -> None:
+        """
+        Give back the slot of a finished request. `timed` False keeps its
+        run time out of the route's latency, e.g. for a 304 or a cache hit.
+        """
+        self.in_flight -= 1
+        self._route_in_flight[route] -= 1
+        self._observe(route, seconds, failed, timed)
+        self._wake()
+
+    def _wake(self) -> None:
+        for waiter in sorted(self._waiters, key=lambda waiter: (waiter.priority, waiter.sequence)):
+            if self._can_run(waiter.route, waiter.priority):
+                self._waiters.remove(waiter)
+                self._start(waiter.route)
+                waiter.future.set_result(True)
+
+    def _observe(self, route: str, seconds: float, failed: bool, timed: bool) -> None:
+        if failed:
+            self._failures += 1
+        elif timed:
+            latency = self._latencies.get(route)
+            if latency is None:
+                latency = self._latencies[route] = _RouteLatency()
+            latency.recent.append(seconds)
+
+        self._completions += 1
+        if self._completions % ADJUST_EVERY:
+            return
+        ratios = [ratio for ratio in (latency.ratio() for latency in self._latencies.values()) if ratio is not None]
+        slow = bool(ratios) and _percentile(ratios, 0.5) > ADMISSION_LATENCY_TOLERANCE
+        failing = self._failures * 2 > ADJUST_EVERY
+        saturated = self._saturated or self.in_flight + len(self._waiters) >= math.floor(self.limit)
+        self._failures = 0
+        self._saturated = False
+        if not saturated:
+            return
+        if slow or failing:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1)
+        self._wake()
+
+    def render_gauges(self) -> List[str]:
+        lines = []
+        for name, help, value in (
+            ("admission_limit", "Current adaptive concurrency limit.", self.limit),
+            ("admission_in_flight", "Admitted requests still running.", self.in_flight),
+            ("admission_queue_depth", "Requests waiting for a slot.", len(self._waiters)),
+        ):
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return lines
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware, so a streamed response keeps its slot until its
+    last chunk. Shed requests get a 503 with Retry-After before any handler
+    or pooled connection is touched.
+    """
+    def __init__(self, app, capacity: int):
+        self.app = app
+        limit = ADMISSION_LIMIT or capacity
+        self.controller = AdmissionController(
+            limit=limit,
+            min_limit=ADMISSION_MIN_LIMIT,
+            max_limit=ADMISSION_MAX_LIMIT or max(capacity, limit),
+            queue_size=ADMISSION_QUEUE or 2 * limit,
+        )
+        gauge_providers.append(self.controller.render_gauges)
+        gauge_providers.append(admission_requests.render)
+        gauge_providers.append(admission_wait_seconds.render)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(ADMISSION_EXEMPT):
+            return await self.app(scope, receive, send)
+        priority = priority_class(scope["method"], scope["path"])
+        label = PRIORITY_CLASSES[priority]
+        queued_at = perf_counter()
+        route, shed = await self.controller.acquire(route_key(scope["path"]), priority)
+        if shed is not None:
+            admission_requests.inc(label, shed)
+            return await self._busy(send)
+        started = perf_counter()
+        admission_wait_seconds.observe(started - queued_at, label)
+        admission_requests.inc(label, "admitted")
+
+        status_code = 500
+        stats = current_request_stats()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # 304s and cache hits are fast whatever the load, timing them
+            # would make every database read look slow
+            timed = status_code != 304 and (stats is None or stats.statements > 0)
+            self.controller.release(route, perf_counter() - started, status_code >= 500, timed)
+
+    async def _busy(self, send) -> None:
+        body = json.dumps({"detail": "Server busy, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(RETRY_AFTER_SECONDS).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -21,4 +21,12 @@ class CategoryUpdateDto(BaseModel):
             "example": {
                 "name": "Feature",
             }
-        }
\ No newline at end of file
+        }
+
+
+class CategoryResponseDto(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        from_attributes = True
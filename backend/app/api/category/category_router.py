@@ -1,8 +1,9 @@
 from app.crud.crud_router import BaseCrudRouter
 from .category_service import CategoryService
-from .category_dtos import CategoryCreateDto, CategoryUpdateDto
+from .category_dtos import CategoryCreateDto, CategoryResponseDto, CategoryUpdateDto
 from .category_model import Category
-from app.database import get_database
+from app.crud.crud_async_service import AsyncBaseCrudService
+from app.database import USE_ASYNC_DATABASE, get_async_database, get_async_read_database, get_database, get_read_database
 from fastapi import APIRouter
 
 router = APIRouter(
@@ -14,10 +15,11 @@ router = APIRouter(
 category_service = CategoryService()
 
 category_router = BaseCrudRouter[Category, CategoryCreateDto, CategoryUpdateDto](
-    service=category_service,
+    service=AsyncBaseCrudService(Category, CategoryResponseDto, cache=category_service.cache) if USE_ASYNC_DATABASE else category_service,
     create_model=CategoryCreateDto,
     update_model=CategoryUpdateDto,
-    get_database=get_database,
+    get_database=get_async_database if USE_ASYNC_DATABASE else get_database,
+    get_read_database=get_async_read_database if USE_ASYNC_DATABASE else get_read_database,
     prefix="/category",
     tags=["category"]
 ).router
\ No newline at end of file
@@ -1,7 +1,9 @@
+from app.crud.crud_cache import EntityCache
 from app.crud.crud_service import BaseCrudService
+from .category_dtos import CategoryResponseDto
 from .category_model import Category
 
 
 class CategoryService(BaseCrudService[Category]):
     def __init__(self):
-        super().__init__(Category)
\ No newline at end of file
+        super().__init__(Category, CategoryResponseDto, cache=EntityCache("category"))
\ No newline at end of file
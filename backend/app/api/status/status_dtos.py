@@ -25,4 +25,13 @@ class StatusUpdateDto(BaseModel):
                 "name": "In Progress",
                 "order": 50,
             }
-        }
\ No newline at end of file
+        }
+
+
+class StatusResponseDto(BaseModel):
+    id: int
+    name: str
+    order: int = 0
+
+    class Config:
+        from_attributes = True
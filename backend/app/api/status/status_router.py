@@ -1,8 +1,9 @@
 from app.crud.crud_router import BaseCrudRouter
 from .status_service import StatusService
-from .status_dtos import StatusCreateDto, StatusUpdateDto
+from .status_dtos import StatusCreateDto, StatusResponseDto, StatusUpdateDto
 from .status_model import Status
-from app.database import get_database
+from app.crud.crud_async_service import AsyncBaseCrudService
+from app.database import USE_ASYNC_DATABASE, get_async_database, get_async_read_database, get_database, get_read_database
 from fastapi import APIRouter
 
 router = APIRouter(
@@ -14,10 +15,11 @@ router = APIRouter(
 status_service = StatusService()
 
 status_router = BaseCrudRouter[Status, StatusCreateDto, StatusUpdateDto](
-    service=status_service,
+    service=AsyncBaseCrudService(Status, StatusResponseDto, cache=status_service.cache) if USE_ASYNC_DATABASE else status_service,
     create_model=StatusCreateDto,
     update_model=StatusUpdateDto,
-    get_database=get_database,
+    get_database=get_async_database if USE_ASYNC_DATABASE else get_database,
+    get_read_database=get_async_read_database if USE_ASYNC_DATABASE else get_read_database,
     prefix="/status",
     tags=["status"]
 ).router
\ No newline at end of file
@@ -1,7 +1,9 @@
+from app.crud.crud_cache import EntityCache
 from app.crud.crud_service import BaseCrudService
+from .status_dtos import StatusResponseDto
 from .status_model import Status
 
 
 class StatusService(BaseCrudService[Status]):
     def __init__(self):
-        super().__init__(Status)
\ No newline at end of file
+        super().__init__(Status, StatusResponseDto, cache=EntityCache("status"))
\ No newline at end of file
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.database import SessionLocal
+from app.metrics import Counter, gauge_providers
+from .task_service import TaskService
+
+logger = logging.getLogger("uvicorn.error")
+
+# Days a task stays in a completed status before it moves to task_archive, 0 turns archival off
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+# Comma-separated names of the statuses whose tasks count as completed
+ARCHIVE_STATUSES = [name.strip() for name in os.getenv("ARCHIVE_STATUSES", "Done").split(",") if name.strip()]
+# Seconds between archival runs of the background job
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL", "3600"))
+# Tasks moved per transaction
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+archived_tasks = Counter("task_archived_total", "Tasks moved from task to task_archive.")
+gauge_providers.append(archived_tasks.render)
+
+
+def archive_completed(service: TaskService) -> int:
+    """
+    Move every task due for archiving, one short transaction per batch so
+    writers on the task table are never held up for long. Returns how many
+    moved.
+    """
+    done_before = datetime.utcnow() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    moved = 0
+    while True:
+        with SessionLocal() as db:
+            ids = service.archive_batch(db, ARCHIVE_STATUSES, done_before, ARCHIVE_BATCH_SIZE)
+        moved += len(ids)
+        archived_tasks.inc(amount=len(ids))
+        if len(ids) < ARCHIVE_BATCH_SIZE:
+            break
+    if moved:
+        logger.info("Archived %d tasks completed before %s", moved, done_before.isoformat())
+    return moved
+
+
+class ArchiveJob:
+    """
+    Runs archive_completed every ARCHIVE_INTERVAL seconds for the lifetime
+    of the app. Every worker runs one; batches skip rows another worker has
+    locked, so they share the backlog instead of colliding.
+    """
+    def __init__(self, service: TaskService):
+        self.service = service
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if ARCHIVE_AFTER_DAYS > 0 and ARCHIVE_STATUSES and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(archive_completed, self.service)
+            except Exception:
+                logger.exception("Task archival failed, retrying in %.0fs", ARCHIVE_INTERVAL)
+            await asyncio.sleep(ARCHIVE_INTERVAL)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 
 class TaskCreateDto(BaseModel):
@@ -9,7 +9,7 @@ class TaskCreateDto(BaseModel):
     due_date: Optional[datetime] = Field(None, description="Task due date")
     status_id: int = Field(..., description="Task status")
     category_id: Optional[int] = Field(None, description="Task category")
-    priority: int = Field(..., description="Task priority")
+    priority: float = Field(..., description="Task priority (fractional rank, ascending)")
     
     class Config:
         # from_attributes = True  # Pydantic v2 (use orm_mode = True for v1)
@@ -31,7 +31,7 @@ class TaskUpdateDto(BaseModel):
     due_date: Optional[datetime] = Field(None, description="Task due date")
     status_id: Optional[int] = Field(None, description="Task status")
     category_id: Optional[int] = Field(None, description="Task category")
-    priority: Optional[int] = Field(None, description="Task priority")
+    priority: Optional[float] = Field(None, description="Task priority (fractional rank, ascending)")
     
     class Config:
         json_schema_extra = {
@@ -43,4 +43,52 @@ class TaskUpdateDto(BaseModel):
                 "category_id": 5,
                 "priority": -50,
             }
-        }
\ No newline at end of file
+        }
+
+
+class TaskReorderDto(BaseModel):
+    status_id: Optional[int] = Field(None, description="Target status column, the task's current one when omitted")
+    after_id: Optional[int] = Field(None, description="Task to place the moved task right after, null moves it to the top")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "status_id": 1,
+                "after_id": 42,
+            }
+        }
+
+
+class TaskResponseDto(BaseModel):
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    due_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    priority: float = 0
+    status_id: Optional[int] = None
+    category_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TaskStatusCountDto(BaseModel):
+    status_id: Optional[int] = None
+    count: int
+    overdue: int
+
+
+class TaskCategoryCountDto(BaseModel):
+    category_id: Optional[int] = None
+    count: int
+    overdue: int
+
+
+class TaskSummaryDto(BaseModel):
+    total: int
+    overdue: int = Field(..., description="Tasks due before today (UTC)")
+    byStatus: List[TaskStatusCountDto]
+    byCategory: List[TaskCategoryCountDto]
+    mode: str = Field(..., description="live (GROUP BY over task) or table (trigger-maintained task_summary)")
+    asOf: date
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import ForeignKey
+from sqlalchemy import DDL, BigInteger, Column, Date, DateTime, Float, ForeignKey, Index, Integer, String, Table, event, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.crud.crud_searchable_registry import searchable
 from app.database import BaseDataModel
@@ -8,6 +8,14 @@ from typing import Optional
 
 class Task(BaseDataModel):
     __tablename__ = "task"
+    __table_args__ = (
+        Index("ix_task_status_id_priority", "status_id", "priority", "id"),
+        Index("ix_task_category_id_priority", "category_id", "priority", "id"),
+        Index("ix_task_priority", "priority", "id"),
+        Index("ix_task_due_date", "due_date", "id"),
+        Index("ix_task_created_at", "created_at", "id"),
+        Index("ix_task_status_id_status_changed_at", "status_id", "status_changed_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
@@ -15,7 +23,10 @@ class Task(BaseDataModel):
     description: Mapped[Optional[str]] = mapped_column(nullable=True)
     due_date: Mapped[datetime] = mapped_column(nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
-    priority: Mapped[int] = mapped_column(default=0)
+    priority: Mapped[float] = mapped_column(default=0)
+    # when the task entered its current status (UTC), set by the database on
+    # insert and by a trigger whenever status_id changes (migration 0013)
+    status_changed_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     status_id: Mapped[Optional[int]] = mapped_column(ForeignKey("status.id"), nullable=True)
     category_id: Mapped[Optional[int]] = mapped_column(ForeignKey("category.id"), nullable=True)
@@ -23,5 +34,44 @@ class Task(BaseDataModel):
     status: Mapped[Optional["Status"]] = relationship(back_populates="tasks")
     category: Mapped[Optional["Category"]] = relationship(back_populates="tasks")
 
-searchable(Task, "title", "partial")
-searchable(Task, "description", "partial")
\ No newline at end of file
+# SQLite in local runs gets its status_changed_at trigger with the table
+event.listen(Task.__table__, "after_create", DDL(
+    "CREATE TRIGGER task_status_changed AFTER UPDATE OF status_id ON task "
+    "WHEN OLD.status_id IS NOT NEW.status_id BEGIN "
+    "UPDATE task SET status_changed_at = CURRENT_TIMESTAMP WHERE id = NEW.id; END"
+).execute_if(dialect="sqlite"))
+
+searchable(Task, "title", "partial", weight=2)
+# substrings ("voic" finds "invoice") plus word matches ranked by ts_rank
+searchable(Task, "description", "partial")
+searchable(Task, "description", "fulltext")
+
+# Task counts per (status, category, due day), kept current by statement-level
+# triggers on task (migration 0007). Postgres only, read by TaskService.summary.
+task_summary = Table(
+    "task_summary",
+    BaseDataModel.metadata,
+    Column("status_id", Integer, nullable=True),
+    Column("category_id", Integer, nullable=True),
+    Column("due_day", Date, nullable=True),
+    Column("task_count", BigInteger, nullable=False, default=0),
+)
+
+# Completed tasks moved out of task by the archival job (migration 0009), same
+# columns without foreign keys. Searched only with includeArchived.
+task_archive = Table(
+    "task_archive",
+    BaseDataModel.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String, nullable=False),
+    Column("description", String, nullable=True),
+    Column("due_date", DateTime, nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("priority", Float, nullable=False),
+    Column("status_id", Integer, nullable=True),
+    Column("category_id", Integer, nullable=True),
+    Column("status_changed_at", DateTime, nullable=True),
+    Column("archived_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Index("ix_task_archive_status_id_priority", "status_id", "priority", "id"),
+    Index("ix_task_archive_created_at", "created_at", "id"),
+)
@@ -1,9 +1,20 @@
+from contextlib import contextmanager
+from tempfile import SpooledTemporaryFile
 from app.crud.crud_router import BaseCrudRouter
-from .task_service import TaskService
-from .task_dtos import TaskCreateDto, TaskUpdateDto
-from .task_model import Task
-from app.database import get_database
-from fastapi import APIRouter
+from app.crud.crud_streaming import release_once
+from app.crud.crud_transfer import TRANSFER_MEDIA_TYPES, TRANSFER_SPOOL_SIZE, export_table, import_table, require_format
+from .task_archive import ArchiveJob
+from .task_service import BOARD_MAX_LIMIT, TaskService
+from .task_dtos import TaskCreateDto, TaskReorderDto, TaskResponseDto, TaskSummaryDto, TaskUpdateDto
+from .task_model import Task, task_archive
+from app.crud.crud_async_service import AsyncBaseCrudService
+from app.database import SessionLocal, USE_ASYNC_DATABASE, get_async_database, get_async_read_database, get_database, get_read_database
+from typing import List, Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
 
 router = APIRouter(
     prefix="/task",
@@ -12,12 +23,101 @@ router = APIRouter(
 )
 
 task_service = TaskService()
+task_archiver = ArchiveJob(task_service)
 
-task_router = BaseCrudRouter[Task, TaskCreateDto, TaskUpdateDto](
-    service=task_service,
+class TaskCrudRouter(BaseCrudRouter[Task, TaskCreateDto, TaskUpdateDto]):
+    def _register_fixed_routes(self):
+        @self.router.get("/summary", response_model=TaskSummaryDto)
+        def summary(
+            mode: Literal["live", "table"] = Query("table", description="live GROUP BY, or the trigger-maintained summary table"),
+            db: Session = Depends(get_read_database),
+        ):
+            return task_service.summary(db, mode)
+
+        @self.router.get("/board")
+        def board(
+            limit: int = Query(20, ge=1, le=BOARD_MAX_LIMIT, description="Tasks per status column"),
+            status_id: Optional[List[int]] = Query(None, description="Columns to return, all by default"),
+            cursor: Optional[str] = Query(None, description="nextCursor of a column, continues that one column"),
+            db: Session = Depends(get_read_database),
+        ):
+            result = task_service.board(db, limit, status_id, cursor)
+            return Response(content=task_service.serializer.dump_columns(result), media_type="application/json")
+
+        @self.router.get("/export")
+        def export(format: Literal["csv", "arrow"] = Query("csv", description="csv, or arrow for an Arrow IPC stream")):
+            _require_format(format)
+            # the stream outlives the route call, so it owns its session
+            reads = contextmanager(get_read_database)()
+            db = reads.__enter__()
+            release = release_once(reads)
+            try:
+                return StreamingResponse(
+                    _stream_export(release, db, format),
+                    media_type=TRANSFER_MEDIA_TYPES[format],
+                    headers={"Content-Disposition": f'attachment; filename="task.{format}"'},
+                    background=BackgroundTask(release),
+                )
+            except BaseException:
+                release()
+                raise
+
+        @self.router.post("/import")
+        async def import_tasks(
+            request: Request,
+            format: Literal["csv", "arrow"] = Query("csv", description="Format of the request body"),
+        ):
+            _require_format(format)
+            with SpooledTemporaryFile(max_size=TRANSFER_SPOOL_SIZE) as upload:
+                async for chunk in request.stream():
+                    upload.write(chunk)
+                upload.seek(0)
+                return await run_in_threadpool(_import, upload, format)
+
+
+task_router = TaskCrudRouter(
+    service=AsyncBaseCrudService(Task, TaskResponseDto, cache=task_service.cache, archive=task_archive) if USE_ASYNC_DATABASE else task_service,
     create_model=TaskCreateDto,
     update_model=TaskUpdateDto,
-    get_database=get_database,
+    get_database=get_async_database if USE_ASYNC_DATABASE else get_database,
+    get_read_database=get_async_read_database if USE_ASYNC_DATABASE else get_read_database,
     prefix="/task",
     tags=["tasks"]
-).router
\ No newline at end of file
+).router
+
+
+def _require_format(fmt):
+    try:
+        require_format(fmt)
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _stream_export(release, db, fmt):
+    try:
+        yield from export_table(db, Task.__table__, fmt)
+    finally:
+        release()
+
+
+def _import(upload, fmt):
+    with SessionLocal() as db:
+        return import_table(db, task_service, TaskCreateDto, upload, fmt)
+
+
+def rebalance_column(status_id):
+    with SessionLocal() as db:
+        task_service.rebalance(db, status_id)
+
+
+@task_router.post("/{id}/reorder", response_model=TaskResponseDto)
+def reorder(
+    id: int,
+    reorder_dto: TaskReorderDto,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_database)
+):
+    task, crowded = task_service.reorder(db, id, reorder_dto.status_id, reorder_dto.after_id)
+    if crowded:
+        background_tasks.add_task(rebalance_column, task.status_id)
+    return Response(content=task_service.serializer.dump_one(task), media_type="application/json")
@@ -1,7 +1,308 @@
+from datetime import datetime, time
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session, aliased
+from app.crud.crud_cache import CACHE_TTL, EntityCache
+from app.crud.crud_search_utils import decode_cursor, encode_cursor, keyset_predicate
 from app.crud.crud_service import BaseCrudService
-from .task_model import Task
+from app.database import advisory_xact_lock
+from .task_dtos import TaskResponseDto
+from app.api.status.status_model import Status
+from .task_model import Task, task_archive, task_summary
+
+# Gap between neighbours after a rebalance, and the gap below which
+# a column is rebalanced because midpoints are running out of precision
+PRIORITY_STEP = 1024.0
+PRIORITY_MIN_GAP = 1e-6
+
+# pg_advisory_xact_lock namespace for per-status-column reordering
+REORDER_LOCK_NAMESPACE = 8001
+
+# live  - one GROUP BY over task, cost grows with the table
+# table - sums of task_summary, cost grows with statuses x categories x due days
+SUMMARY_MODES = ("live", "table")
+
+# Most tasks one board column returns per request
+BOARD_MAX_LIMIT = 100
 
 
 class TaskService(BaseCrudService[Task]):
     def __init__(self):
-        super().__init__(Task)
\ No newline at end of file
+        # tasks change often: short TTL, and /all keeps streaming instead of caching
+        super().__init__(
+            Task, TaskResponseDto,
+            cache=EntityCache("task", ttl=min(CACHE_TTL, 5), cache_all=False),
+            archive=task_archive,
+        )
+
+    def reorder(
+        self,
+        db: Session,
+        task_id: int,
+        status_id: Optional[int],
+        after_id: Optional[int],
+    ) -> Tuple[Task, bool]:
+        """
+        Move a task into `status_id` (None keeps its column) right after
+        `after_id` (or to the top) by giving it the midpoint of its new
+        neighbours' priorities. Writes exactly one row; returns the task
+        and whether the column ran out of room and should be rebalanced.
+        """
+        task = self._get_entity(db, task_id)
+        if status_id is None:
+            status_id = task.status_id
+        try:
+            # serializes moves within one column, one lock per transaction cannot deadlock
+            advisory_xact_lock(db, REORDER_LOCK_NAMESPACE, status_id or 0)
+            new_priority, crowded = self._priority_after(db, task_id, status_id, after_id)
+            if new_priority is None:
+                self._rebalance_column(db, status_id)
+                new_priority, crowded = self._priority_after(db, task_id, status_id, after_id)
+            task.status_id = status_id
+            task.priority = new_priority
+            db.commit()
+            db.refresh(task)
+            self._invalidate([task_id])
+            return task, crowded
+        except HTTPException:
+            db.rollback()
+            raise
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    def rebalance(self, db: Session, status_id: Optional[int]) -> None:
+        try:
+            advisory_xact_lock(db, REORDER_LOCK_NAMESPACE, status_id or 0)
+            moved_ids = self._rebalance_column(db, status_id)
+            db.commit()
+            self._invalidate(moved_ids)
+        except Exception:
+            db.rollback()
+            raise
+
+    def summary(self, db: Session, mode: Literal["live", "table"] = "table") -> Dict[str, Any]:
+        """
+        Task counts per status and per category, and how many are overdue
+        (due before today, UTC). Both modes fold the same (status, category)
+        groups; `table` falls back to `live` where triggers do not keep
+        task_summary (non-Postgres). Archived tasks are not counted: moving
+        a task to task_archive deletes it from task, which the summary
+        triggers count like any delete.
+        """
+        today = datetime.combine(datetime.utcnow().date(), time.min)
+        if mode == "table" and db.get_bind().dialect.name != "postgresql":
+            mode = "live"
+        if mode == "table":
+            query = select(
+                task_summary.c.status_id,
+                task_summary.c.category_id,
+                func.sum(task_summary.c.task_count),
+                func.sum(case((task_summary.c.due_day < today.date(), task_summary.c.task_count), else_=0)),
+            ).group_by(task_summary.c.status_id, task_summary.c.category_id)
+        else:
+            query = select(
+                Task.status_id,
+                Task.category_id,
+                func.count(),
+                func.sum(case((Task.due_date < today, 1), else_=0)),
+            ).group_by(Task.status_id, Task.category_id)
+
+        total = overdue = 0
+        by_status: Dict[Optional[int], List[int]] = {}
+        by_category: Dict[Optional[int], List[int]] = {}
+        for status_id, category_id, count, late in db.execute(query):
+            count, late = int(count or 0), int(late or 0)
+            if not count:
+                continue  # summary groups emptied by deletes
+            total += count
+            overdue += late
+            for groups, key in ((by_status, status_id), (by_category, category_id)):
+                group = groups.setdefault(key, [0, 0])
+                group[0] += count
+                group[1] += late
+
+        def rows(groups, key_name):
+            ordered = sorted(groups.items(), key=lambda item: (item[0] is None, item[0] or 0))
+            return [{key_name: key, "count": count, "overdue": late} for key, (count, late) in ordered]
+
+        return {
+            "total": total,
+            "overdue": overdue,
+            "byStatus": rows(by_status, "status_id"),
+            "byCategory": rows(by_category, "category_id"),
+            "mode": mode,
+            "asOf": today.date().isoformat(),
+        }
+
+    def board(
+        self,
+        db: Session,
+        limit: int,
+        status_ids: Optional[List[int]] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        The first `limit` tasks of every status column in priority order,
+        each column's total, and a cursor for the rest of the column, all
+        from one query: the total and the rank are window functions
+        partitioned by status_id, the rank filtered in an outer query.
+        With `cursor` (exactly one status) the column continues after it.
+        """
+        if cursor is not None and (not status_ids or len(status_ids) != 1):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A board cursor continues one column, pass exactly one status_id",
+            )
+        columns = select(
+            Task,
+            func.count().over(partition_by=Task.status_id).label("column_total"),
+        )
+        if status_ids:
+            columns = columns.where(Task.status_id.in_(status_ids))
+        columns = columns.subquery()
+        task = aliased(Task, columns)
+
+        # ranked after the totals are taken, so a cursor shortens the rank, not the total
+        ranked = select(
+            task,
+            columns.c.column_total,
+            func.row_number().over(
+                partition_by=task.status_id, order_by=(task.priority, task.id)
+            ).label("position"),
+        )
+        if cursor is not None:
+            try:
+                column_name, last_priority, last_id = decode_cursor(Task, cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            if column_name != "priority":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Cursor was issued for orderByColumn={column_name}",
+                )
+            ranked = ranked.where(keyset_predicate(task.priority, task.id, last_priority, last_id, True))
+        ranked = ranked.subquery()
+        page = aliased(Task, ranked)
+
+        # one row past the limit tells whether the column goes on
+        rows = db.execute(
+            select(page, ranked.c.column_total)
+            .where(ranked.c.position <= limit + 1)
+            .order_by(ranked.c.status_id, ranked.c.position)
+        ).all()
+
+        by_status: Dict[Optional[int], Dict[str, Any]] = {
+            status_id: {"status_id": status_id, "total": 0, "items": [], "hasNext": False, "nextCursor": None}
+            for status_id in status_ids or ()
+        }
+        for entity, column_total in rows:
+            column = by_status.setdefault(
+                entity.status_id,
+                {"status_id": entity.status_id, "total": 0, "items": [], "hasNext": False, "nextCursor": None},
+            )
+            column["total"] = column_total
+            if len(column["items"]) == limit:
+                last = column["items"][-1]
+                column["hasNext"] = True
+                column["nextCursor"] = encode_cursor("priority", last.priority, last.id)
+            else:
+                column["items"].append(entity)
+        ordered = sorted(by_status.values(), key=lambda column: (column["status_id"] is None, column["status_id"] or 0))
+        return {"limit": limit, "columns": ordered}
+
+    def archive_batch(self, db: Session, status_names: List[str], done_before: datetime, limit: int) -> List[int]:
+        """
+        Move up to `limit` tasks that entered one of the statuses named
+        `status_names` before `done_before` from task to task_archive, in
+        one transaction. Rows another mover holds are skipped, so workers
+        can run this side by side. Returns the moved ids, fewer than
+        `limit` once the backlog is done.
+        """
+        try:
+            ids = db.scalars(
+                select(Task.id)
+                .where(
+                    Task.status_id.in_(select(Status.id).where(Status.name.in_(status_names))),
+                    Task.status_changed_at < done_before,
+                )
+                .order_by(Task.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if ids:
+                # one table-level event for the batch instead of a delete per row
+                self.begin_bulk_write(db)
+                columns = [column.name for column in Task.__table__.columns]
+                db.execute(insert(task_archive).from_select(
+                    columns, select(*Task.__table__.columns).where(Task.id.in_(ids))
+                ))
+                db.execute(delete(Task.__table__).where(Task.id.in_(ids)))
+                self.announce_bulk_write(db, "archive")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if ids:
+            self.invalidate_bulk("archive", ids)
+        return ids
+
+    def _column_filter(self, status_id: Optional[int]):
+        return Task.status_id.is_(None) if status_id is None else Task.status_id == status_id
+
+    def _priority_after(
+        self,
+        db: Session,
+        task_id: int,
+        status_id: Optional[int],
+        after_id: Optional[int],
+    ) -> Tuple[Optional[float], bool]:
+        """
+        Midpoint between the anchor and the next task of the column, read with
+        two indexed lookups on (status_id, priority, id). Returns None when the
+        floats between the neighbours are exhausted.
+        """
+        neighbours = select(Task.priority).where(self._column_filter(status_id), Task.id != task_id)
+        previous = None
+        if after_id is not None:
+            anchor = db.execute(
+                select(Task.priority, Task.status_id).where(Task.id == after_id)
+            ).first()
+            if anchor is None or anchor.status_id != status_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Task with id={after_id} is not in status {status_id}",
+                )
+            previous = anchor.priority
+            neighbours = neighbours.where(tuple_(Task.priority, Task.id) > tuple_(previous, after_id))
+        following = db.scalar(neighbours.order_by(Task.priority, Task.id).limit(1))
+
+        if previous is None and following is None:
+            return 0.0, False
+        if previous is None:
+            return following - PRIORITY_STEP, False
+        if following is None:
+            return previous + PRIORITY_STEP, False
+        middle = (previous + following) / 2
+        if not previous < middle < following:
+            return None, True
+        return middle, (following - previous) < PRIORITY_MIN_GAP
+
+    def _rebalance_column(self, db: Session, status_id: Optional[int]) -> List[int]:
+        # respace the whole column in one statement, keeping the current order
+        ranked = (
+            select(
+                Task.id.label("id"),
+                func.row_number().over(order_by=(Task.priority, Task.id)).label("position"),
+            )
+            .where(self._column_filter(status_id))
+            .subquery()
+        )
+        return db.scalars(
+            update(Task)
+            .where(Task.id == ranked.c.id)
+            .values(priority=ranked.c.position * PRIORITY_STEP)
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        ).all()
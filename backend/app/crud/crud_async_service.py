@@ -0,0 +1,156 @@
+from typing import AsyncIterator, TypeVar, List, Dict, Any, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+from .crud_service import BaseCrudService, reads_replica
+from .crud_cache import query_cache_key
+from .crud_search_dtos import EntitySearchDto
+from .crud_search_recorder import record_search_request
+from .crud_streaming import STREAM_BATCH_SIZE
+
+T = TypeVar("T") # SQLAlchemy model type
+
+class AsyncBaseCrudService(BaseCrudService[T]):
+    """
+    asyncio counterpart of BaseCrudService: same search/get/create/update/remove
+    semantics, awaited on an AsyncSession instead of blocking a worker thread.
+    Pass the sync service's `cache` to share its entries and invalidations.
+    """
+
+    async def search(
+        self,
+        db: AsyncSession,
+        req: EntitySearchDto,
+    ) -> Dict[str, Any]:
+        record_search_request(self.model, req)
+        # expanded items embed other tables, whose writes do not invalidate this cache
+        use_cache = self.cache is not None and not req.expand
+        if use_cache:
+            generation, version = self.cache.generation(), self._table_version()
+            cache_key = query_cache_key(req.model_dump(mode="json", by_alias=True))
+            cached = self.cache.get_query("search", cache_key, generation, version)
+            if cached is not None:
+                return cached
+
+        plan, filter_value, params = self._build_search_queries(req, db.get_bind().dialect.name)
+        rows = (await db.execute(plan.query, params)).all()
+        if plan.null_query is not None and len(rows) < params["limit"]:
+            # the non-NULL block ended inside this page, fill it from the NULL block
+            rows += (await db.execute(plan.null_query, {**params, "limit": params["limit"] - len(rows)})).all()
+        rows, has_next = self._split_page(rows, req)
+        # count helpers are plain Session code, run_sync drives them on the async connection
+        strategy, total_count = await db.run_sync(
+            lambda session: self._resolve_count(session, req, plan.base_query, filter_value, params, rows)
+        )
+        result = self._search_result(req, rows, has_next, strategy, total_count)
+
+        if use_cache:
+            result["items"] = self.serializer.to_python(result["items"])
+            if not reads_replica(db):
+                self.cache.set_query("search", cache_key, result, generation, version)
+        return result
+
+    async def get_all(self, db: AsyncSession, expand: Sequence[str] = ()) -> List[T]:
+        use_cache = self.cache is not None and self.cache.cache_all and not expand
+        if use_cache:
+            generation, version = self.cache.generation(), self._table_version()
+            cached = self.cache.get_query("all", "", generation, version)
+            if cached is not None:
+                return cached
+        try:
+            entities = (await db.scalars(select(self.model).options(*self.expand_options(expand)))).all()
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        if use_cache:
+            entities = self.serializer.to_python(entities)
+            if not reads_replica(db):
+                self.cache.set_query("all", "", entities, generation, version)
+        return entities
+
+    async def iter_all(
+        self, db: AsyncSession, batch_size: int = STREAM_BATCH_SIZE, expand: Sequence[str] = ()
+    ) -> AsyncIterator[List[T]]:
+        result = await db.stream(
+            select(self.model)
+            .options(*self.expand_options(expand))
+            .order_by(self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in result.scalars().partitions():
+            yield partition
+
+    async def get(self, db: AsyncSession, entity_id: int, expand: Sequence[str] = ()) -> T:
+        if self.cache is None or expand:
+            return await self._get_entity_async(db, entity_id, expand)
+        generation, version = self.cache.generation(), self._table_version()
+        cached = self.cache.get_entity(entity_id, version)
+        if cached is not None:
+            return cached
+        entity = self.serializer.to_python([await self._get_entity_async(db, entity_id)])[0]
+        if not reads_replica(db):
+            self.cache.set_entity(entity_id, entity, generation, version)
+        return entity
+
+    async def _get_entity_async(self, db: AsyncSession, entity_id: int, expand: Sequence[str] = ()) -> T:
+        entity = await db.scalar(
+            select(self.model).options(*self.expand_options(expand)).where(self.model.id == entity_id)
+        )
+        if not entity:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{self.model.__name__} with id={entity_id} not found",
+            )
+        return entity
+
+    async def create(self, db: AsyncSession, data: Dict[str, Any]) -> T:
+        try:
+            entity = self.model(**data)
+            db.add(entity)
+            await db.commit()
+            await db.refresh(entity)
+            self._invalidate([entity.id], "create")
+            return entity
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    async def update(self, db: AsyncSession, entity_id: int, data: Dict[str, Any]) -> T:
+        entity = await self._get_entity_async(db, entity_id)
+
+        try:
+            for key, value in data.items():
+                setattr(entity, key, value)
+            setattr(entity, "id", entity_id)
+            await db.commit()
+            await db.refresh(entity)
+            self._invalidate([entity_id])
+            return entity
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async def remove(self, db: AsyncSession, entity_id: int) -> None:
+        entity = await self._get_entity_async(db, entity_id)
+
+        try:
+            await db.delete(entity)
+            await db.commit()
+            self._invalidate([entity_id], "delete")
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # the bulk paths are savepoint-per-chunk Session code with item-by-item
+    # retries, run_sync drives the same code on the async connection
+
+    async def bulk_create(self, db: AsyncSession, items: List[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        bulk_create = super().bulk_create
+        return await db.run_sync(lambda session: bulk_create(session, items))
+
+    async def bulk_update(self, db: AsyncSession, items: List[Tuple[int, int, Dict[str, Any]]]) -> Dict[str, Any]:
+        bulk_update = super().bulk_update
+        return await db.run_sync(lambda session: bulk_update(session, items))
+
+    async def bulk_remove(self, db: AsyncSession, ids: List[int]) -> Dict[str, Any]:
+        bulk_remove = super().bulk_remove
+        return await db.run_sync(lambda session: bulk_remove(session, ids))
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict
+
+# Upper bound on items per bulk request, keeps one transaction reasonably short
+BULK_MAX_ITEMS = 10000
+
+
+class EntityBulkUpdateItemDto(BaseModel):
+    id: int = Field(..., description="Entity id")
+    data: Dict[str, Any] = Field(..., description="Fields to update, validated against the update DTO")
+
@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+# Shared cache backend, e.g. redis://localhost:6379/0; in-process LRU when unset
+CACHE_URL = os.getenv("CACHE_URL")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+
+# Every EntityCache, for the stats endpoint
+cache_registry: Dict[str, "EntityCache"] = {}
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class CacheBackend:
+    """
+    Key/value store holding JSON-compatible values with a per-key TTL.
+    """
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, keys: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class LocalCacheBackend(CacheBackend):
+    """
+    In-process LRU with TTL and a size limit. Also the stand-in for a
+    shared backend in tests.
+    """
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, stats: Optional[CacheStats] = None):
+        self.max_entries = max_entries
+        self.stats = stats or CacheStats()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # counters never expire and are not subject to LRU eviction
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.incr("evictions")
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self, prefix: str) -> None:
+        # counters stay, a generation must never go back
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared backend so every API process sees the same entries and invalidations.
+    Needs the optional `redis` package.
+    """
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_URL is set but the 'redis' package is not installed") from e
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        self._client.set(key, json.dumps(value), px=int(ttl * 1000) if ttl is not None else None)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys:
+            self._client.delete(*keys)
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+
+class EntityCache:
+    """
+    Read-through cache for one model. Single entities are keyed by id and
+    invalidated precisely; list and search results are keyed under a model
+    generation counter, so one increment drops all of them at once.
+    """
+    def __init__(
+        self,
+        namespace: str,
+        backend: Optional[CacheBackend] = None,
+        ttl: float = CACHE_TTL,
+        cache_all: bool = True,
+    ):
+        self.namespace = namespace
+        self.stats = CacheStats()
+        if backend is None:
+            backend = RedisCacheBackend(CACHE_URL) if CACHE_URL else LocalCacheBackend(stats=self.stats)
+        self.backend = backend
+        self.ttl = ttl
+        self.cache_all = cache_all
+        cache_registry[namespace] = self
+
+    def generation(self) -> int:
+        """
+        Take this before reading the database and hand it to get_query and
+        the set_* methods: a store that raced an invalidation then lands
+        under a dead key, or is dropped, instead of serving stale rows.
+        """
+        return self.backend.get(f"{self.namespace}:generation") or 0
+
+    def _entity_key(self, entity_id: int) -> str:
+        return f"{self.namespace}:entity:{entity_id}"
+
+    def _query_key(self, kind: str, key: str, generation: int, version: int) -> str:
+        return f"{self.namespace}:{generation}:{version}:{kind}:{key}"
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        value = self.backend.get(key)
+        self.stats.incr("hits" if value is not None else "misses")
+        return value
+
+    # `version` is the table version the response's ETag is built from,
+    # taken with the generation: an entry stored under an older one may
+    # predate a write of another process this one has not been told about
+
+    def get_entity(self, entity_id: int, version: int = 0) -> Optional[Any]:
+        entry = self.backend.get(self._entity_key(entity_id))
+        value = entry[1] if entry is not None and entry[0] >= version else None
+        self.stats.incr("hits" if value is not None else "misses")
+        return value
+
+    def set_entity(self, entity_id: int, value: Any, generation: int, version: int = 0) -> None:
+        key = self._entity_key(entity_id)
+        self.backend.set(key, [version, value], self.ttl)
+        # entity keys outlive generations: take the value back out if an
+        # invalidation ran since the read (invalidate bumps before deleting)
+        if self.generation() != generation:
+            self.backend.delete([key])
+
+    def get_query(self, kind: str, key: str, generation: int, version: int = 0) -> Optional[Any]:
+        return self._lookup(self._query_key(kind, key, generation, version))
+
+    def set_query(self, kind: str, key: str, value: Any, generation: int, version: int = 0) -> None:
+        self.backend.set(self._query_key(kind, key, generation, version), value, self.ttl)
+
+    def invalidate(self, entity_ids: Iterable[int] = ()) -> None:
+        """
+        Drop the given entities and every cached list/search of the model.
+        """
+        self.backend.incr(f"{self.namespace}:generation")
+        self.backend.delete([self._entity_key(entity_id) for entity_id in entity_ids])
+        self.stats.incr("invalidations")
+
+    def clear(self) -> None:
+        """
+        Drop everything cached for the model, entities included. Only for
+        an in-process backend, which misses the writes of other processes
+        while the change feed is down; a shared one is kept current by
+        every writer.
+        """
+        self.invalidate()
+        if isinstance(self.backend, LocalCacheBackend):
+            self.backend.clear(f"{self.namespace}:")
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {namespace: cache.stats.as_dict() for namespace, cache in cache_registry.items()}
+
+
+def query_cache_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections import deque
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+from sqlalchemy.engine import make_url
+from app.database import DATABASE_URL, engine
+from .crud_cache import LocalCacheBackend, cache_registry
+from .crud_search_count import count_cache
+from .crud_versions import version_tracker
+
+logger = logging.getLogger("uvicorn.error")
+
+# NOTIFY channel written by the row triggers of migration 0006
+CHANGE_CHANNEL = "entity_changes"
+# Events buffered per subscriber before it counts as too slow and is cut off
+FEED_QUEUE_SIZE = int(os.getenv("FEED_QUEUE_SIZE", "256"))
+# Recent events kept for clients reconnecting with Last-Event-ID
+FEED_REPLAY_SIZE = int(os.getenv("FEED_REPLAY_SIZE", "1024"))
+# Rows per table and write announced one by one, the rest of a larger write
+# goes out as one event without an id (also in the trigger of migration 0010)
+FEED_BULK_ROWS = 100
+# Seconds between keep-alives on an idle stream
+FEED_HEARTBEAT = float(os.getenv("FEED_HEARTBEAT", "15"))
+FEED_RECONNECT_MAX_DELAY = 30.0
+
+CHANGE_OPS = ("create", "update", "delete")
+
+
+class Subscription:
+    """
+    One connected client: a bounded queue filled by the feed. A client that
+    lets it fill up gets a single resync event and is dropped, so one slow
+    consumer can never hold events (or memory) for the others.
+    """
+    def __init__(self, tables: FrozenSet[str], queue_size: int):
+        self.tables = tables
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        return not self.tables or event.get("table") in self.tables
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self, reason: str) -> None:
+        """
+        Replace whatever is still queued with a final resync event.
+        """
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait({"type": "resync", "reason": reason})
+        self.closed = True
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        The next event, or None after `timeout` seconds without one.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ChangeFeed:
+    """
+    Process-wide fan-out of entity changes to in-memory subscribers.
+    On Postgres one LISTEN connection per process receives the trigger
+    notifications of every writer; elsewhere BaseCrudService writes are
+    published directly, which only covers this process.
+    """
+    def __init__(self, queue_size: int = FEED_QUEUE_SIZE, replay_size: int = FEED_REPLAY_SIZE):
+        self.queue_size = queue_size
+        # event ids are "<feed id>-<sequence>", ids from another process or run force a resync
+        self.feed_id = uuid.uuid4().hex[:8]
+        self._sequence = 0
+        self._replay: deque = deque(maxlen=replay_size)
+        self._subscriptions: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self.uses_listen = engine.dialect.name == "postgresql"
+        self.dropped = 0
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if self.uses_listen and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        for subscription in list(self._subscriptions):
+            subscription.close("shutdown")
+        self._subscriptions.clear()
+
+    def subscribe(self, tables: Iterable[str] = (), last_event_id: Optional[str] = None) -> Subscription:
+        subscription = Subscription(frozenset(tables), self.queue_size)
+        if last_event_id:
+            missed = self._missed_since(last_event_id)
+            if missed is None:
+                subscription.offer({"type": "resync", "reason": "history"})
+            else:
+                for event in missed:
+                    if subscription.wants(event) and not subscription.offer(event):
+                        subscription.close("overflow")
+                        return subscription
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscriptions),
+            "sequence": self._sequence,
+            "dropped": self.dropped,
+            "listening": self._listener is not None and not self._listener.done(),
+        }
+
+    def record_write(self, table_name: str, op: str, entity_ids: Iterable[int]) -> None:
+        """
+        Called by services after a commit, from any thread. A no-op on
+        Postgres, where the triggers already notify every process. Past
+        FEED_BULK_ROWS ids the rest is folded into one event without an
+        id, like the triggers do, so a bulk write cannot overflow every
+        subscriber's queue.
+        """
+        if self.uses_listen or self._loop is None or self._loop.is_closed():
+            return
+        entity_ids = list(entity_ids)
+        events = [{"table": table_name, "op": op, "id": entity_id} for entity_id in entity_ids[:FEED_BULK_ROWS]]
+        if len(entity_ids) > FEED_BULK_ROWS:
+            events.append({"table": table_name, "op": op})
+        if events:
+            self._loop.call_soon_threadsafe(self._publish_many, events)
+
+    def record_bulk_write(self, table_name: str, op: str) -> None:
+        """
+        A write too large to announce row by row, e.g. a bulk import: one
+        event without an id, subscribers reload the table. On Postgres the
+        writer sends it as a notification instead.
+        """
+        if self.uses_listen or self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self.publish, {"table": table_name, "op": op})
+
+    def _publish_many(self, events: List[Dict[str, Any]]) -> None:
+        for event in events:
+            self.publish(event)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """
+        Number the event and hand it to every matching subscriber without
+        ever awaiting, must run on the event loop.
+        """
+        self._sequence += 1
+        event = {"type": "change", "event_id": f"{self.feed_id}-{self._sequence}", **event}
+        self._replay.append((self._sequence, event))
+        for subscription in list(self._subscriptions):
+            if subscription.wants(event) and not subscription.offer(event):
+                self._subscriptions.discard(subscription)
+                subscription.close("overflow")
+                self.dropped += 1
+
+    def _broadcast_resync(self, reason: str) -> None:
+        for subscription in list(self._subscriptions):
+            if not subscription.offer({"type": "resync", "reason": reason}):
+                self._subscriptions.discard(subscription)
+                subscription.close(reason)
+                self.dropped += 1
+
+    def _recover(self) -> None:
+        """
+        After listening resumes: writes of other processes while the feed
+        was down reached none of this process's caches, drop them all and
+        have clients reload.
+        """
+        for cache in cache_registry.values():
+            if isinstance(cache.backend, LocalCacheBackend):
+                cache.clear()
+        count_cache.clear()
+        version_tracker.expire()
+        self._broadcast_resync("reconnect")
+
+    def _missed_since(self, last_event_id: str) -> Optional[List[Dict[str, Any]]]:
+        feed_id, _, sequence = last_event_id.partition("-")
+        if feed_id != self.feed_id or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if self._replay and self._replay[0][0] > sequence + 1:
+            return None
+        return [event for number, event in self._replay if number > sequence]
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed change notification: %r", payload)
+            return
+        table_name = change.get("table")
+        # writes of other processes: drop what this process has cached for them
+        version_tracker.invalidate(table_name)
+        cache = cache_registry.get(table_name)
+        if cache is not None and isinstance(cache.backend, LocalCacheBackend):
+            # bulk writes and imports carry no id, lists and searches are dropped all the same
+            cache.invalidate([change["id"]] if change.get("id") is not None else [])
+        self.publish(change)
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        dsn = make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        delay, connected_before = 1.0, False
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+                try:
+                    lost = asyncio.Event()
+                    connection.add_termination_listener(lambda _: lost.set())
+                    await connection.add_listener(CHANGE_CHANNEL, self._on_notify)
+                    if connected_before:
+                        # notifications sent while we were away are gone
+                        self._recover()
+                    connected_before, delay = True, 1.0
+                    await lost.wait()
+                finally:
+                    await connection.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Change feed listener failed, reconnecting in %.0fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, FEED_RECONNECT_MAX_DELAY)
+
+
+change_feed = ChangeFeed()
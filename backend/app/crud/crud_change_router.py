@@ -0,0 +1,79 @@
+import json
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from .crud_change_feed import FEED_HEARTBEAT, Subscription, change_feed
+
+change_router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+def _tables(tables: Optional[str]):
+    return [table.strip() for table in tables.split(",") if table.strip()] if tables else []
+
+
+def _sse_message(event: dict) -> bytes:
+    lines = []
+    if "event_id" in event:
+        lines.append(f"id: {event['event_id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def _sse_stream(request: Request, subscription: Subscription) -> AsyncIterator[bytes]:
+    try:
+        # tell the browser how long to wait before reconnecting
+        yield b"retry: 3000\n\n"
+        while True:
+            event = await subscription.next(FEED_HEARTBEAT)
+            if event is None:
+                if await request.is_disconnected():
+                    break
+                yield b": keep-alive\n\n"
+                continue
+            yield _sse_message(event)
+            if subscription.closed and subscription.queue.empty():
+                break
+    finally:
+        change_feed.unsubscribe(subscription)
+
+
+@change_router.get("")
+async def stream_changes(request: Request, tables: Optional[str] = None):
+    """
+    Server-Sent Events stream of create/update/delete events, optionally
+    limited to a comma-separated list of tables. A `resync` event means
+    events were lost and the client should re-query what it shows; a
+    change without an id stands for a bulk write, re-query that table.
+    """
+    subscription = change_feed.subscribe(_tables(tables), request.headers.get("last-event-id"))
+    return StreamingResponse(
+        _sse_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@change_router.websocket("/ws")
+async def websocket_changes(websocket: WebSocket, tables: Optional[str] = None, last_event_id: Optional[str] = None):
+    await websocket.accept()
+    subscription = change_feed.subscribe(_tables(tables), last_event_id)
+    try:
+        while True:
+            event = await subscription.next(FEED_HEARTBEAT)
+            if event is None:
+                event = {"type": "keep-alive"}
+            await websocket.send_json(event)
+            if subscription.closed and subscription.queue.empty():
+                # 1013: try again later, after re-querying
+                await websocket.close(code=1013)
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        change_feed.unsubscribe(subscription)
+
+
+@change_router.get("/stats")
+def get_change_feed_stats():
+    return change_feed.stats()
@@ -0,0 +1,205 @@
+"""
+Replay recorded search requests through EXPLAIN and suggest missing indexes.
+
+Record a request mix by running the API with SEARCH_RECORD_PATH=searches.jsonl,
+then point the advisor at a database with production-like data:
+
+    python -m app.crud.crud_index_advisor searches.jsonl [--analyze]
+"""
+import argparse
+import json
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func, inspect as inspect_engine, select
+from sqlalchemy.orm import Session
+from .crud_search_count import explain_sql
+from .crud_search_dtos import EntityCriterionDto, EntitySearchDto
+from .crud_searchable_registry import SEARCH_VECTOR_COLUMN, get_searchable_columns
+from .crud_search_utils import RELEVANCE_ORDER
+from .crud_serializer import response_model_registry
+from .crud_service import BaseCrudService
+
+
+def iter_plan_nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def explain(db: Session, query, params: Optional[Dict[str, Any]] = None, analyze: bool = False) -> Dict[str, Any]:
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    plan = db.connection().exec_driver_sql(*explain_sql(query, params, db.get_bind().dialect, options)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def request_shape(model_name: str, req: EntitySearchDto) -> Tuple:
+    criteria = []
+    for column, criterion in sorted(req.criteria.items()):
+        if isinstance(criterion, EntityCriterionDto):
+            ops = sorted(criterion.model_dump(by_alias=True, exclude_none=True))
+            criteria.append(f"{column}:{','.join(ops)}")
+        elif criterion != "":
+            criteria.append(f"{column}:eq")
+    return (
+        model_name,
+        tuple(criteria),
+        req.orderByColumn,
+        bool(req.globalFilter.strip()),
+        req.cursor is not None,
+    )
+
+
+def suggest_indexes(model, req: EntitySearchDto) -> List[Tuple[Tuple[str, ...], Optional[str]]]:
+    """
+    Index candidates for one request: equality columns first, then at most one
+    range column, then the sort column (+ id), plus GIN indexes for the global filter.
+    Returns (columns, postgresql_using) pairs.
+    """
+    equality, ranges = [], []
+    for column, criterion in req.criteria.items():
+        if not isinstance(criterion, EntityCriterionDto):
+            if criterion != "":
+                equality.append(column)
+        elif criterion.eq is not None or criterion.in_ is not None or criterion.isNull is not None:
+            equality.append(column)
+        else:
+            ranges.append(column)
+
+    btree = equality + ranges[:1]
+    if req.orderByColumn != RELEVANCE_ORDER and not ranges:
+        btree.append(req.orderByColumn)
+    if btree and btree[-1] != "id":
+        btree.append("id")
+
+    suggestions = []
+    if btree and btree != ["id"]:
+        suggestions.append((tuple(dict.fromkeys(btree)), None))
+    if req.globalFilter.strip():
+        for field in get_searchable_columns(model):
+            if field["type"] == "fulltext":
+                suggestions.append(((SEARCH_VECTOR_COLUMN,), "gin"))
+            elif field["type"] in ("partial", "prefix", "suffix"):
+                suggestions.append(((field["key"],), "gin"))
+    return list(dict.fromkeys(suggestions))
+
+
+def is_covered(columns: Tuple[str, ...], using: Optional[str], existing: List[Dict[str, Any]]) -> bool:
+    for index in existing:
+        index_using = index.get("dialect_options", {}).get("postgresql_using", "btree")
+        index_columns = tuple(index["column_names"])
+        if (using or "btree") != index_using:
+            continue
+        if index_columns[:len(columns)] == columns:
+            return True
+    return False
+
+
+def index_ddl(table: str, columns: Tuple[str, ...], using: Optional[str]) -> str:
+    name = f"ix_{table}_{'_'.join(columns)}"
+    if using == "gin" and columns != (SEARCH_VECTOR_COLUMN,):
+        column_list = ", ".join(f"{column} gin_trgm_ops" for column in columns)
+        name += "_trgm"
+    else:
+        column_list = ", ".join(columns)
+    using_clause = f" USING {using}" if using else ""
+    return f"CREATE INDEX CONCURRENTLY {name} ON {table}{using_clause} ({column_list});"
+
+
+def advise(db: Session, records: List[Dict[str, Any]], models: Dict[str, Any], analyze: bool = False) -> Dict[str, Any]:
+    seq_scans = Counter()
+    suggestions = Counter()
+    shapes = Counter()
+    errors = []
+    existing_indexes = {}
+    services: Dict[str, BaseCrudService] = {}
+    inspector = inspect_engine(db.get_bind())
+    dialect_name = db.get_bind().dialect.name
+
+    for line_no, record in enumerate(records, 1):
+        model = models.get(record.get("model"))
+        if model is None:
+            errors.append(f"line {line_no}: unknown model {record.get('model')}")
+            continue
+        table = model.__tablename__
+        try:
+            req = EntitySearchDto.model_validate(record["request"])
+            service = services.get(model.__name__)
+            if service is None:
+                # one per model, serializing with the response model the app registered
+                service = services[model.__name__] = BaseCrudService(model, response_model_registry.get(model))
+            plan, _, params = service._build_search_queries(req, dialect_name)
+        except Exception as e:
+            errors.append(f"line {line_no}: {e}")
+            continue
+
+        shape = request_shape(model.__name__, req)
+        shapes[shape] += 1
+        count_query = select(func.count()).select_from(plan.base_query.subquery())
+        statements = [plan.query, count_query] + ([plan.null_query] if plan.null_query is not None else [])
+        scanned = False
+        for statement in statements:
+            for node in iter_plan_nodes(explain(db, statement, params, analyze)):
+                if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") == table:
+                    scanned = True
+        if not scanned:
+            continue
+
+        seq_scans[shape] += 1
+        if table not in existing_indexes:
+            existing_indexes[table] = inspector.get_indexes(table)
+        for columns, using in suggest_indexes(model, req):
+            if not is_covered(columns, using, existing_indexes[table]):
+                suggestions[index_ddl(table, columns, using)] += 1
+
+    return {
+        "requests": len(records),
+        "shapes": len(shapes),
+        "seqScans": [
+            {"shape": list(shape), "count": count} for shape, count in seq_scans.most_common()
+        ],
+        "suggestions": [
+            {"ddl": ddl, "requests": count} for ddl, count in suggestions.most_common()
+        ],
+        "errors": errors,
+    }
+
+
+def load_models() -> Dict[str, Any]:
+    import app.main  # noqa: F401 (registers every model and searchable column)
+    from app.database import BaseDataModel
+    return {mapper.class_.__name__: mapper.class_ for mapper in BaseDataModel.registry.mappers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="JSON lines written via SEARCH_RECORD_PATH")
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (executes the queries)")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+    models = load_models()
+    with open(args.path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    with SessionLocal() as db:
+        report = advise(db, records, models, analyze=args.analyze)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"Replayed {report['requests']} requests, {report['shapes']} distinct shapes")
+    print("Sequential scans:")
+    for entry in report["seqScans"] or [{"shape": ["none"], "count": 0}]:
+        print(f"  {entry['count']:>6}  {entry['shape']}")
+    print("Suggested indexes:")
+    for entry in report["suggestions"] or [{"ddl": "none", "requests": 0}]:
+        print(f"  {entry['ddl']}  -- {entry['requests']} requests")
+    for error in report["errors"]:
+        print(f"  ! {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,21 @@
 from abc import ABC, abstractmethod
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from pydantic_core import to_json
 from sqlalchemy.orm import Session
-from typing import Generic, TypeVar, Type, List, Callable
+from typing import Any, Dict, Generic, Literal, Optional, Sequence, TypeVar, Type, List, Callable
+from sqlalchemy.ext.asyncio import AsyncSession
 from .crud_service import BaseCrudService
+from .crud_async_service import AsyncBaseCrudService
 from .crud_search_dtos import EntitySearchDto
+from .crud_streaming import STREAM_MEDIA_TYPES, release_once, release_once_async, stream_batches, stream_batches_async
+from .crud_versions import etag_matches, http_date, make_etag, not_modified_since, version_tracker_for
+from .crud_bulk_dtos import BULK_MAX_ITEMS, EntityBulkUpdateItemDto
+from .crud_single_flight import SingleFlight
 
 from app.crud.crud_service import BaseCrudService
 
@@ -12,6 +23,12 @@ T = TypeVar("T") # SQLAlchemy model
 CreateDto = TypeVar("CreateDto", bound=BaseModel)
 UpdateDto = TypeVar("UpdateDto", bound=BaseModel)
 
+EXPAND_QUERY = Query(None, description="Comma-separated relationships to embed, e.g. status,category")
+
+
+def parse_expand(expand: Optional[str]) -> List[str]:
+    return [name.strip() for name in expand.split(",") if name.strip()] if expand else []
+
 
 class BaseCrudRouter(Generic[T, CreateDto, UpdateDto]):
     def __init__(
@@ -21,47 +38,361 @@ class BaseCrudRouter(Generic[T, CreateDto, UpdateDto]):
         update_model: Type[UpdateDto],
         get_database: Callable,
         prefix: str = "",
-        tags: List[str] = None
+        tags: List[str] = None,
+        get_read_database: Optional[Callable] = None,
     ):
         self.service = service
         self.create_model = create_model
         self.update_model = update_model
         self.router = APIRouter(prefix=prefix, tags=tags or [])
         self.get_database = get_database
+        # search, get and all may be served by a replica, writes never are
+        self.get_read_database = get_read_database or get_database
+        self.serializer = service.serializer
+        # identical reads in flight at the same time share one execution
+        self.single_flight = SingleFlight(prefix or service.model.__tablename__)
         # ...
-        self._register_routes()
+        if isinstance(service, AsyncBaseCrudService):
+            self._register_async_routes()
+        else:
+            self._register_routes()
 
     def _register_routes(self):
         @self.router.post("/search")
         def search(
             search_dto: EntitySearchDto,
-            db: Session = Depends(self.get_database)
+            request: Request,
+            db: Session = Depends(self.get_read_database)
         ):
-            return self.service.search(db, search_dto)
+            serializer = self.service.serializer_for(search_dto.expand)
+            variant = "search:" + search_dto.model_dump_json()
+            headers, not_modified = self._conditional(request, variant, search_dto.expand or (), db)
+            if not_modified is not None:
+                return not_modified
+            return self._json(self.single_flight.do(
+                self._flight_key(variant, headers, db),
+                lambda: serializer.dump_page(self.service.search(db, search_dto)),
+            ), headers=headers)
         
         @self.router.get("/all")
-        def get_all(db: Session = Depends(self.get_database)):
-            return self.service.get_all(db)
+        def get_all(
+            request: Request,
+            format: Literal["json", "ndjson"] = "json",
+            expand: Optional[str] = EXPAND_QUERY,
+        ):
+            expand = parse_expand(expand)
+            serializer = self.service.serializer_for(expand)
+            # the stream outlives the route call, so it owns its session;
+            # opened here so the validators come from the database it reads
+            reads = contextmanager(self.get_read_database)()
+            db = reads.__enter__()
+            release = release_once(reads)
+            variant = f"all:{format}:{','.join(expand)}"
+            streaming = False
+            try:
+                headers, not_modified = self._conditional(request, variant, expand, db)
+                if not_modified is not None:
+                    return not_modified
+                if self._small_table(expand):
+                    # small, cached tables are encoded once for every concurrent reader
+                    return Response(
+                        content=self.single_flight.do(
+                            self._flight_key(variant, headers, db),
+                            lambda: b"".join(stream_batches([self.service.get_all(db)], format, serializer)),
+                        ),
+                        media_type=STREAM_MEDIA_TYPES[format],
+                        headers=headers,
+                    )
+                response = StreamingResponse(
+                    self._stream_all(release, db, format, expand, serializer),
+                    media_type=STREAM_MEDIA_TYPES[format],
+                    headers=headers,
+                    # also runs when the client goes away mid-body and the stream is abandoned
+                    background=BackgroundTask(release),
+                )
+                streaming = True
+                return response
+            finally:
+                if not streaming:
+                    release()
         
-        @self.router.get("/{id}")
-        def get(id: int, db: Session = Depends(self.get_database)):
-            return self.service.get(db, id)
+        # bulk routes go before "/{id}" so "bulk" is not parsed as an id
+        @self.router.post("/bulk")
+        def bulk_create(
+            items: List[Dict[str, Any]] = Body(..., max_length=BULK_MAX_ITEMS),
+            db: Session = Depends(self.get_database)
+        ):
+            valid, errors = self._validate_bulk_create(items)
+            return self._bulk_json(self.service.bulk_create(db, valid), errors)
+
+        @self.router.put("/bulk")
+        def bulk_update(
+            items: List[EntityBulkUpdateItemDto] = Body(..., max_length=BULK_MAX_ITEMS),
+            db: Session = Depends(self.get_database)
+        ):
+            valid, errors = self._validate_bulk_update(items)
+            return self._bulk_json(self.service.bulk_update(db, valid), errors)
+
+        @self.router.delete("/bulk")
+        def bulk_remove(
+            ids: List[int] = Body(..., max_length=BULK_MAX_ITEMS),
+            db: Session = Depends(self.get_database)
+        ):
+            return self._json(to_json(self.service.bulk_remove(db, ids)))
+
+        self._register_fixed_routes()
+
+        @self.router.get("/{id}", response_model=self.serializer.response_model)
+        def get(
+            id: int,
+            request: Request,
+            expand: Optional[str] = EXPAND_QUERY,
+            db: Session = Depends(self.get_read_database),
+        ):
+            expand = parse_expand(expand)
+            serializer = self.service.serializer_for(expand)
+            variant = f"get:{id}:{','.join(expand)}"
+            headers, not_modified = self._conditional(request, variant, expand, db)
+            if not_modified is not None:
+                return not_modified
+            return self._json(self.single_flight.do(
+                self._flight_key(variant, headers, db),
+                lambda: serializer.dump_one(self.service.get(db, id, expand)),
+            ), headers=headers)
         
-        @self.router.post("/", status_code=status.HTTP_201_CREATED)
+        @self.router.post("/", status_code=status.HTTP_201_CREATED, response_model=self.serializer.response_model)
         def create(
             create_dto: self.create_model,
             db: Session = Depends(self.get_database)
         ):
-            return self.service.create(db, create_dto.model_dump())
+            entity = self.service.create(db, create_dto.model_dump())
+            return self._json(self.serializer.dump_one(entity), status.HTTP_201_CREATED)
         
-        @self.router.put("/{id}")
+        @self.router.put("/{id}", response_model=self.serializer.response_model)
         def update(
             id: int,
             update_dto: self.update_model,
             db: Session = Depends(self.get_database)
         ):
-            return self.service.update(db, id, update_dto.model_dump(exclude_unset=True))
+            entity = self.service.update(db, id, update_dto.model_dump(exclude_unset=True))
+            return self._json(self.serializer.dump_one(entity))
         
         @self.router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
         def remove(id: int, db: Session = Depends(self.get_database)):
-            return self.service.remove(db, id)
\ No newline at end of file
+            return self.service.remove(db, id)
+
+    def _register_async_routes(self):
+        @self.router.post("/search")
+        async def search(
+            search_dto: EntitySearchDto,
+            request: Request,
+            db: AsyncSession = Depends(self.get_read_database)
+        ):
+            serializer = self.service.serializer_for(search_dto.expand)
+            variant = "search:" + search_dto.model_dump_json()
+            headers, not_modified = await run_in_threadpool(
+                self._conditional, request, variant, search_dto.expand or (), db
+            )
+            if not_modified is not None:
+                return not_modified
+
+            async def run():
+                return serializer.dump_page(await self.service.search(db, search_dto))
+
+            return self._json(
+                await self.single_flight.do_async(self._flight_key(variant, headers, db), run), headers=headers
+            )
+
+        @self.router.get("/all")
+        async def get_all(
+            request: Request,
+            format: Literal["json", "ndjson"] = "json",
+            expand: Optional[str] = EXPAND_QUERY,
+        ):
+            expand = parse_expand(expand)
+            serializer = self.service.serializer_for(expand)
+            reads = asynccontextmanager(self.get_read_database)()
+            db = await reads.__aenter__()
+            release = release_once_async(reads)
+            variant = f"all:{format}:{','.join(expand)}"
+            streaming = False
+            try:
+                headers, not_modified = await run_in_threadpool(self._conditional, request, variant, expand, db)
+                if not_modified is not None:
+                    return not_modified
+                if self._small_table(expand):
+
+                    async def run():
+                        entities = await self.service.get_all(db)
+                        return b"".join(stream_batches([entities], format, serializer))
+
+                    return Response(
+                        content=await self.single_flight.do_async(self._flight_key(variant, headers, db), run),
+                        media_type=STREAM_MEDIA_TYPES[format],
+                        headers=headers,
+                    )
+                response = StreamingResponse(
+                    self._stream_all_async(release, db, format, expand, serializer),
+                    media_type=STREAM_MEDIA_TYPES[format],
+                    headers=headers,
+                    background=BackgroundTask(release),
+                )
+                streaming = True
+                return response
+            finally:
+                if not streaming:
+                    await release()
+
+        # bulk routes go before "/{id}" so "bulk" is not parsed as an id
+        @self.router.post("/bulk")
+        async def bulk_create(
+            items: List[Dict[str, Any]] = Body(..., max_length=BULK_MAX_ITEMS),
+            db: AsyncSession = Depends(self.get_database)
+        ):
+            valid, errors = self._validate_bulk_create(items)
+            return self._bulk_json(await self.service.bulk_create(db, valid), errors)
+
+        @self.router.put("/bulk")
+        async def bulk_update(
+            items: List[EntityBulkUpdateItemDto] = Body(..., max_length=BULK_MAX_ITEMS),
+            db: AsyncSession = Depends(self.get_database)
+        ):
+            valid, errors = self._validate_bulk_update(items)
+            return self._bulk_json(await self.service.bulk_update(db, valid), errors)
+
+        @self.router.delete("/bulk")
+        async def bulk_remove(
+            ids: List[int] = Body(..., max_length=BULK_MAX_ITEMS),
+            db: AsyncSession = Depends(self.get_database)
+        ):
+            return self._json(to_json(await self.service.bulk_remove(db, ids)))
+
+        self._register_fixed_routes()
+
+        @self.router.get("/{id}", response_model=self.serializer.response_model)
+        async def get(
+            id: int,
+            request: Request,
+            expand: Optional[str] = EXPAND_QUERY,
+            db: AsyncSession = Depends(self.get_read_database),
+        ):
+            expand = parse_expand(expand)
+            serializer = self.service.serializer_for(expand)
+            variant = f"get:{id}:{','.join(expand)}"
+            headers, not_modified = await run_in_threadpool(self._conditional, request, variant, expand, db)
+            if not_modified is not None:
+                return not_modified
+
+            async def run():
+                return serializer.dump_one(await self.service.get(db, id, expand))
+
+            return self._json(
+                await self.single_flight.do_async(self._flight_key(variant, headers, db), run), headers=headers
+            )
+
+        @self.router.post("/", status_code=status.HTTP_201_CREATED, response_model=self.serializer.response_model)
+        async def create(
+            create_dto: self.create_model,
+            db: AsyncSession = Depends(self.get_database)
+        ):
+            entity = await self.service.create(db, create_dto.model_dump())
+            return self._json(self.serializer.dump_one(entity), status.HTTP_201_CREATED)
+
+        @self.router.put("/{id}", response_model=self.serializer.response_model)
+        async def update(
+            id: int,
+            update_dto: self.update_model,
+            db: AsyncSession = Depends(self.get_database)
+        ):
+            entity = await self.service.update(db, id, update_dto.model_dump(exclude_unset=True))
+            return self._json(self.serializer.dump_one(entity))
+
+        @self.router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+        async def remove(id: int, db: AsyncSession = Depends(self.get_database)):
+            return await self.service.remove(db, id)
+
+    def _validate_bulk_create(self, items: List[Dict[str, Any]]):
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, self.create_model.model_validate(item).model_dump()))
+            except ValidationError as e:
+                errors.append({"index": index, "detail": e.errors(include_url=False, include_context=False)})
+        return valid, errors
+
+    def _validate_bulk_update(self, items: List[EntityBulkUpdateItemDto]):
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                data = self.update_model.model_validate(item.data).model_dump(exclude_unset=True)
+                valid.append((index, item.id, data))
+            except ValidationError as e:
+                errors.append({"index": index, "id": item.id, "detail": e.errors(include_url=False, include_context=False)})
+        return valid, errors
+
+    def _bulk_json(self, result: Dict[str, Any], errors: List[Dict[str, Any]]) -> Response:
+        # validation errors and database errors in one list, in request order
+        result["errors"] = sorted(errors + result["errors"], key=lambda error: error["index"])
+        return self._json(self.serializer.dump_page(result))
+
+    def _register_fixed_routes(self):
+        """
+        Subclass hook for extra fixed-path routes, e.g. "/summary". Runs
+        before the "/{id}" routes are added, which would claim them otherwise.
+        """
+
+    def _stream_all(self, release, db: Session, fmt: str, expand: Sequence[str], serializer):
+        # `release` closes the session of `db`, as soon as the last row is out
+        try:
+            yield from stream_batches(self.service.iter_all(db, expand=expand), fmt, serializer)
+        finally:
+            release()
+
+    async def _stream_all_async(self, release, db: AsyncSession, fmt: str, expand: Sequence[str], serializer):
+        try:
+            async for chunk in stream_batches_async(self.service.iter_all(db, expand=expand), fmt, serializer):
+                yield chunk
+        finally:
+            await release()
+
+    def _small_table(self, expand: Sequence[str]) -> bool:
+        # tables cached whole are small enough to answer /all in one body
+        cache = self.service.cache
+        return cache is not None and cache.cache_all and not expand
+
+    def _flight_key(self, variant: str, headers: Dict[str, str], db) -> tuple:
+        # the ETag pins the table versions: a reader that saw a newer write
+        # never joins a query started before it
+        replica = db.info.get("replica")
+        return variant, headers["ETag"], replica.name if replica is not None else "primary"
+
+    def _json(self, content: bytes, status_code: int = status.HTTP_200_OK, headers: Dict[str, str] = None) -> Response:
+        # already encoded by the serializer, skip FastAPI's jsonable_encoder
+        return Response(content=content, status_code=status_code, media_type="application/json", headers=headers)
+
+    def _conditional(self, request: Request, variant: str, expand: Sequence[str] = (), db=None):
+        """
+        ETag/Last-Modified validators from the change versions of the table
+        and of every expanded relationship's table, read before the data so a
+        concurrent write can only make them older. Versions come from the
+        database `db` reads, primary or replica. Returns the headers and,
+        when the client's copy is current, a 304 answered without touching
+        the entity tables.
+        """
+        tracker = version_tracker_for(db)
+        table_names = {self.service.model.__tablename__, *self.service.expanded_tables(expand)}
+        versions = {table_name: tracker.current(table_name) for table_name in table_names}
+        updated_at = max(changed_at for _, changed_at in versions.values())
+        etag = make_etag({table_name: version for table_name, (version, _) in versions.items()}, variant)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": http_date(updated_at),
+            "Cache-Control": "no-cache",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if etag_matches(if_none_match, etag) or (
+            if_none_match is None
+            and not_modified_since(request.headers.get("if-modified-since"), updated_at)
+        ):
+            return headers, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return headers, None
@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+# exact     - separate SELECT count(*) round trip (default, legacy behaviour)
+# inline    - exact count as a scalar subquery of the page query, one round trip
+# estimated - planner estimate (pg_class.reltuples / EXPLAIN rows), exact below a threshold
+# cached    - exact count memoized per filter for a short TTL
+# none      - no count at all, only hasNext
+COUNT_STRATEGIES = ("exact", "inline", "estimated", "cached", "none")
+
+ESTIMATE_EXACT_THRESHOLD = int(os.getenv("SEARCH_COUNT_ESTIMATE_THRESHOLD", "10000"))
+
+
+class CountCache:
+    """
+    Small thread-safe TTL cache for total counts keyed by model + filter.
+    """
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple, value: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_model(self, model_name: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == model_name]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache(ttl_seconds=float(os.getenv("SEARCH_COUNT_CACHE_TTL", "30")))
+
+
+def count_cache_key(model, global_filter: str, criteria: Dict[str, Any], include_archived: bool = False) -> Tuple:
+    return (model.__name__, global_filter, json.dumps(criteria, sort_keys=True, default=str), include_archived)
+
+
+def count_exact(db: Session, query, params: Optional[Dict[str, Any]] = None) -> int:
+    return db.scalar(select(func.count()).select_from(query.order_by(None).subquery()), params)
+
+
+def inline_count_column(query):
+    """
+    The filtered total as an uncorrelated scalar subquery, evaluated once
+    by the planner and returned next to every row of the page.
+    """
+    return (
+        select(func.count())
+        .select_from(query.order_by(None).subquery())
+        .scalar_subquery()
+        .label("total_count")
+    )
+
+
+def explain_sql(query, params: Optional[Dict[str, Any]], dialect, options: str = "FORMAT JSON") -> Tuple[str, Any]:
+    """
+    EXPLAIN statement and driver parameters for `query` with `params` bound,
+    IN lists expanded. Parameters come in the driver's own style: a dict for
+    named placeholders (psycopg2), a tuple for positional ones (asyncpg's $n).
+    """
+    expanded = query.compile(dialect=dialect).construct_expanded_state(params)
+    parameters = expanded.positional_parameters if dialect.positional else expanded.parameters
+    return f"EXPLAIN ({options}) {expanded.statement}", parameters
+
+
+def count_estimated(db: Session, model, query, params: Optional[Dict[str, Any]], filtered: bool) -> Optional[int]:
+    """
+    Planner row estimate: table statistics when unfiltered, EXPLAIN otherwise.
+    Returns None when no estimate is available (non-Postgres, never analyzed).
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    if not filtered:
+        estimate = db.scalar(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": model.__tablename__},
+        )
+    else:
+        plan = db.connection().exec_driver_sql(*explain_sql(query.order_by(None), params, bind.dialect)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = plan[0]["Plan"]["Plan Rows"]
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
@@ -0,0 +1,119 @@
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import bindparam
+from sqlalchemy.inspection import inspect
+from .crud_search_dtos import EntityCriterionDto
+
+
+@lru_cache(maxsize=None)
+def criteria_columns(model) -> Dict[str, Tuple[Any, type, bool]]:
+    """
+    Filterable columns of a model, or an alias of it, resolved once from
+    its mapper: name -> (column attribute, python type, nullable).
+    """
+    columns = {}
+    for column in inspect(model).mapper.columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            continue
+        columns[column.key] = (getattr(model, column.key), python_type, column.nullable)
+    return columns
+
+
+@lru_cache(maxsize=None)
+def _adapter(python_type: type) -> TypeAdapter:
+    return TypeAdapter(python_type)
+
+
+def _coerce(column_name: str, python_type: type, value: Any) -> Any:
+    # typed bound parameters let the planner use the column's index
+    try:
+        return _adapter(python_type).validate_python(value, strict=False)
+    except ValidationError:
+        raise ValueError(f"Invalid value for criterion {column_name}: {value!r}")
+
+
+def split_criteria(model, criteria: Dict[str, Any]) -> Tuple[Tuple[Tuple[str, str], ...], Dict[str, Any]]:
+    """
+    Split EntitySearchDto.criteria into a hashable shape of (column, operator)
+    pairs and the coerced values of their bound parameters, named
+    `criterion_<column>_<operator>`.
+    A bare value is an equality test ("" is ignored), an EntityCriterionDto
+    combines its operators with AND. Raises ValueError on unknown columns,
+    unsupported operators or values that do not fit the column type.
+    """
+    columns = criteria_columns(model)
+    shape, params = [], {}
+
+    def bind(column_name: str, op: str, value: Any) -> None:
+        shape.append((column_name, op))
+        params[f"criterion_{column_name}_{op}"] = value
+
+    for column_name, criterion in sorted(criteria.items()):
+        if column_name not in columns:
+            raise ValueError(f"Invalid criterion column name: {column_name}")
+        col, python_type, nullable = columns[column_name]
+
+        if not isinstance(criterion, EntityCriterionDto):
+            if criterion == "":
+                continue
+            if criterion is None:
+                shape.append((column_name, "null"))
+            else:
+                bind(column_name, "eq", _coerce(column_name, python_type, criterion))
+            continue
+
+        if criterion.eq is not None:
+            bind(column_name, "eq", _coerce(column_name, python_type, criterion.eq))
+        if criterion.in_ is not None:
+            bind(column_name, "in", [_coerce(column_name, python_type, value) for value in criterion.in_])
+        if criterion.gte is not None:
+            bind(column_name, "gte", _coerce(column_name, python_type, criterion.gte))
+        if criterion.lte is not None:
+            bind(column_name, "lte", _coerce(column_name, python_type, criterion.lte))
+        if criterion.before is not None or criterion.after is not None:
+            if python_type not in (datetime, date):
+                raise ValueError(f"before/after need a date column, got {column_name}")
+            if criterion.before is not None:
+                bind(column_name, "before", _coerce(column_name, python_type, criterion.before))
+            if criterion.after is not None:
+                bind(column_name, "after", _coerce(column_name, python_type, criterion.after))
+        if criterion.isNull is not None:
+            if not nullable and criterion.isNull:
+                raise ValueError(f"Column {column_name} is never null")
+            shape.append((column_name, "null" if criterion.isNull else "notnull"))
+    return tuple(shape), params
+
+
+def criteria_predicates(model, shape: Tuple[Tuple[str, str], ...]) -> List[Any]:
+    """
+    SQL predicates for a criteria shape from `split_criteria`, values left as
+    typed bound parameters so one statement serves every request of the shape.
+    """
+    columns = criteria_columns(model)
+    predicates = []
+    for column_name, op in shape:
+        col = columns[column_name][0]
+        name = f"criterion_{column_name}_{op}"
+        if op == "null":
+            predicates.append(col.is_(None))
+        elif op == "notnull":
+            predicates.append(col.is_not(None))
+        elif op == "in":
+            predicates.append(col.in_(bindparam(name, expanding=True, type_=col.type)))
+        else:
+            value = bindparam(name, type_=col.type)
+            predicates.append(CRITERIA_OPERATORS[op](col, value))
+    return predicates
+
+
+CRITERIA_OPERATORS = {
+    "eq": lambda col, value: col == value,
+    "gte": lambda col, value: col >= value,
+    "lte": lambda col, value: col <= value,
+    "before": lambda col, value: col < value,
+    "after": lambda col, value: col > value,
+}
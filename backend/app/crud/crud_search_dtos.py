@@ -1,11 +1,50 @@
-from pydantic import BaseModel, Field, conint
-from typing import Dict, Optional
+from pydantic import BaseModel, Field, StrictBool, StrictFloat, StrictInt, conint
+from typing import Any, Dict, List, Literal, Optional, Union
+from datetime import datetime
+
+
+class EntityCriterionDto(BaseModel):
+    eq: Optional[Any] = Field(None, description="Equal to")
+    in_: Optional[List[Any]] = Field(None, alias="in", description="One of")
+    gte: Optional[Any] = Field(None, description="Range start (inclusive)")
+    lte: Optional[Any] = Field(None, description="Range end (inclusive)")
+    isNull: Optional[bool] = Field(None, description="Is (not) null")
+    before: Optional[datetime] = Field(None, description="Date strictly before")
+    after: Optional[datetime] = Field(None, description="Date strictly after")
+
+    class Config:
+        extra = "forbid"
+        populate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "in": [1, 2],
+            }
+        }
 
 
 class EntitySearchDto(BaseModel):
     pageNo: Optional[conint(ge=1)] = Field(1, description="Page number (min 1)")
     pageSize: Optional[conint(ge=1, le=20)] = Field(10, description="Items per page (1-20)")
     ascending: Optional[bool] = Field(True, description="Ascending or descending sort")
-    orderByColumn: Optional[str] = Field("id", description="Column name to order by")
-    criteria: Optional[Dict[str, str]] = Field(default_factory=dict, description="Column-based filters")
-    globalFilter: Optional[str] = Field("", description="Global search text")
\ No newline at end of file
+    orderByColumn: Optional[str] = Field("id", description="Column name to order by, or \"relevance\" to rank globalFilter matches")
+    criteria: Optional[Dict[str, Union[EntityCriterionDto, StrictBool, StrictInt, StrictFloat, str, None]]] = Field(
+        default_factory=dict,
+        description="Column-based filters: a value for equality or an operator object (eq, in, gte, lte, isNull, before, after)",
+    )
+    globalFilter: Optional[str] = Field("", description="Global search text")
+    cursor: Optional[str] = Field(
+        None,
+        description="Keyset cursor: \"\" for the first page, then the previous page's nextCursor (pageNo is ignored)",
+    )
+    countStrategy: Optional[Literal["exact", "inline", "estimated", "cached", "none"]] = Field(
+        "exact",
+        description="How pageCount is produced: exact, inline (same round trip), estimated (planner), cached (short TTL) or none (hasNext only)",
+    )
+    expand: Optional[List[str]] = Field(
+        None,
+        description="Relationships to embed in each item, e.g. [\"status\", \"category\"]",
+    )
+    includeArchived: Optional[bool] = Field(
+        False,
+        description="Also search archived rows (for tasks: old completed ones), only the hot table by default",
+    )
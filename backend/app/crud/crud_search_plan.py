@@ -0,0 +1,74 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+# Distinct request shapes kept per model, least recently used ones are rebuilt
+SEARCH_PLAN_CACHE_SIZE = int(os.getenv("SEARCH_PLAN_CACHE_SIZE", "256"))
+
+
+class SearchPlan(NamedTuple):
+    """
+    Statements for one request shape, built once with every request value
+    as a bound parameter. Executing the same statement objects lets
+    SQLAlchemy reuse their memoized cache key and compiled SQL.
+    """
+    query: Any       # page query: filters, order, LIMIT/OFFSET or keyset seek
+    base_query: Any  # filtered rows, unordered and unpaginated, for counts
+    null_query: Any = None  # keyset pages of a nullable column: the trailing NULL block
+
+
+class SearchPlanKey(NamedTuple):
+    dialect_name: str
+    criteria: Tuple[Tuple[str, str], ...]
+    filtered: bool
+    order_by: str
+    ascending: bool
+    cursor: Optional[str]  # None (offset pages), "first", "after" or "after_null"
+    inline_count: bool
+    expand: Tuple[str, ...]
+    archived: bool         # hot table plus its archive
+
+
+class SearchPlanCache:
+    def __init__(self, max_entries: int = SEARCH_PLAN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[SearchPlanKey, SearchPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: SearchPlanKey) -> Optional[SearchPlan]:
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return plan
+
+    def set(self, key: SearchPlanKey, plan: SearchPlan) -> None:
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._plans)}
+
+
+# one cache per table, shared by the sync and async services of a model
+search_plan_registry: Dict[str, SearchPlanCache] = {}
+
+
+def search_plan_cache(table: str) -> SearchPlanCache:
+    return search_plan_registry.setdefault(table, SearchPlanCache())
+
+
+def search_plan_stats() -> Dict[str, Dict[str, int]]:
+    return {f"search_plan:{table}": cache.stats() for table, cache in search_plan_registry.items()}
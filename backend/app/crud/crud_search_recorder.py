@@ -0,0 +1,22 @@
+import json
+import os
+import threading
+from .crud_search_dtos import EntitySearchDto
+
+# When set, every search request is appended here as one JSON line,
+# to be replayed later by `python -m app.crud.crud_index_advisor`
+SEARCH_RECORD_PATH = os.getenv("SEARCH_RECORD_PATH")
+
+_lock = threading.Lock()
+
+
+def record_search_request(model, req: EntitySearchDto) -> None:
+    if not SEARCH_RECORD_PATH:
+        return
+    line = json.dumps({
+        "model": model.__name__,
+        "request": req.model_dump(mode="json", by_alias=True, exclude_none=True),
+    })
+    with _lock:
+        with open(SEARCH_RECORD_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
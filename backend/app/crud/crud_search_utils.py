@@ -1,9 +1,160 @@
-from typing import List, Dict, Any
+import base64
+import json
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import String, and_, bindparam, case, func, literal_column, or_, tuple_
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.inspection import inspect
+from .crud_searchable_registry import SEARCH_VECTOR_COLUMN, FULLTEXT_CONFIG
+
+# orderByColumn value that sorts global filter matches by weighted rank
+RELEVANCE_ORDER = "relevance"
 
 def is_valid_column(model, column_name: str) -> bool:
     """
     Check if a column exists on the SQLAlchemy model.
     """
     mapper = inspect(model)
-    return column_name in mapper.columns
\ No newline at end of file
+    return column_name in mapper.columns
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _from_json_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+def encode_cursor(column_name: str, value: Any, entity_id: int) -> str:
+    """
+    Encode the last row of a page (order column value + id tiebreaker)
+    into an opaque url-safe cursor.
+    """
+    payload = json.dumps([column_name, _to_json_value(value), entity_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(model, cursor: str) -> Tuple[str, Any, int]:
+    """
+    Decode a cursor produced by `encode_cursor` back into typed values.
+    Raises ValueError if the cursor is malformed.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        column_name, value, entity_id = json.loads(base64.urlsafe_b64decode(padded))
+        column = inspect(model).columns[column_name]
+        return column_name, _from_json_value(column, value), int(entity_id)
+    except Exception as e:
+        raise ValueError(f"Malformed cursor: {cursor}") from e
+
+def keyset_predicate(order_col, id_col, value: Any, entity_id: int, ascending: bool):
+    """
+    Build the "rows after (value, id)" predicate for keyset pagination.
+    Rows of a nullable column are paged as two blocks, non-NULL values and
+    then NULLs (`value` None), each a plain range of a (column, id) index;
+    see `keyset_order_by`.
+    """
+    if value is None:
+        # already inside the trailing NULL block
+        return and_(order_col.is_(None), id_col > entity_id if ascending else id_col < entity_id)
+    # a NULL column never compares true, the NULL block is queried on its own
+    if ascending:
+        return tuple_(order_col, id_col) > tuple_(value, entity_id)
+    return tuple_(order_col, id_col) < tuple_(value, entity_id)
+
+def keyset_order_by(order_col, id_col, ascending: bool, null_block: bool = False) -> List[Any]:
+    """
+    Order of one keyset block, a forward or backward scan of a plain
+    (column, id) index. `NULLS LAST` over both blocks would match neither.
+    """
+    if null_block:
+        return [id_col.asc() if ascending else id_col.desc()]
+    if ascending:
+        return [order_col.asc(), id_col.asc()]
+    return [order_col.desc(), id_col.desc()]
+
+def _search_vector(model):
+    # the table, or the subquery an aliased model maps (see includeArchived)
+    return literal_column(f"{inspect(model).selectable.name}.{SEARCH_VECTOR_COLUMN}", TSVECTOR)
+
+# Bound parameter names of the global filter term, see `global_filter_params`
+FILTER_PARAMS = {
+    "exact": "filter_term",
+    "partial": "filter_contains",
+    "fulltext": "filter_contains",
+    "prefix": "filter_prefix",
+    "suffix": "filter_suffix",
+}
+
+def global_filter_params(term: str) -> Dict[str, str]:
+    """
+    Values for the bound parameters of `global_filter_condition`/`global_filter_rank`.
+    """
+    return {
+        "filter_term": term,
+        "filter_contains": f"%{term}%",
+        "filter_prefix": f"{term}%",
+        "filter_suffix": f"%{term}",
+    }
+
+def _field_condition(col, ftype: str):
+    if ftype not in FILTER_PARAMS:
+        return None
+    term = bindparam(FILTER_PARAMS[ftype], type_=String)
+    if ftype == "exact":
+        return col == term
+    return col.ilike(term)
+
+def _tsquery():
+    return func.websearch_to_tsquery(FULLTEXT_CONFIG, bindparam("filter_term", type_=String))
+
+def global_filter_condition(model, fields: List[Dict[str, Any]], dialect_name: str):
+    """
+    OR of the per-field match predicates, with the term left as bound
+    parameters so the statement can be reused for every term. On Postgres the
+    "fulltext" fields collapse into one @@ test against the GIN-indexed tsvector
+    column and "partial" ILIKEs are answered from pg_trgm indexes.
+    """
+    conditions = []
+    fulltext = dialect_name == "postgresql"
+    for field in fields:
+        if field["type"] == "fulltext" and fulltext:
+            continue
+        condition = _field_condition(getattr(model, field["key"]), field["type"])
+        if condition is not None:
+            conditions.append(condition)
+    if fulltext and any(field["type"] == "fulltext" for field in fields):
+        conditions.append(_search_vector(model).op("@@")(_tsquery()))
+    return or_(*conditions) if conditions else None
+
+def global_filter_rank(model, fields: List[Dict[str, Any]], dialect_name: str):
+    """
+    Relevance score: sum of field weight * field score, where the score is
+    ts_rank for fulltext and trigram similarity for partial matches on
+    Postgres, and a plain 0/1 match elsewhere.
+    """
+    postgres = dialect_name == "postgresql"
+    scores = []
+    fulltext_weight = 0
+    for field in fields:
+        col = getattr(model, field["key"])
+        weight = field["weight"]
+        if postgres and field["type"] == "fulltext":
+            fulltext_weight = max(fulltext_weight, weight)
+        elif postgres and field["type"] == "partial":
+            scores.append(weight * func.similarity(col, bindparam("filter_term", type_=String)))
+        else:
+            condition = _field_condition(col, field["type"])
+            scores.append(case((condition, weight), else_=0))
+    if fulltext_weight:
+        scores.append(fulltext_weight * func.ts_rank(_search_vector(model), _tsquery()))
+    rank = scores[0]
+    for score in scores[1:]:
+        rank = rank + score
+    return rank
@@ -2,14 +2,33 @@ from typing import Literal, Dict, Any, List
 
 searchable_registry: Dict[Any, Dict[str, Any]] = {}
 
+# Search types:
+#   exact    - equality
+#   partial  - ILIKE '%term%', served by a pg_trgm GIN index on Postgres
+#   prefix   - ILIKE 'term%'
+#   suffix   - ILIKE '%term'
+#   fulltext - matched through the model's generated tsvector column (GIN indexed)
+SEARCH_TYPES = ("exact", "partial", "prefix", "suffix", "fulltext")
+
+# Generated tsvector column holding every "fulltext" column of a table,
+# created by the alembic migrations together with its GIN index
+SEARCH_VECTOR_COLUMN = "search_vector"
+FULLTEXT_CONFIG = "simple"
+
 # Alternative approach using a class-based registry (more reliable)
 def searchable(model_class, column_name: str, search_type: str = "partial", weight: int = 1):
     """
     Manually register a column as searchable.
     Usage:
         register_searchable(MyModel, "name", "partial")
+    The weight ranks matches when searching with orderByColumn="relevance".
+    A column may be registered under several types, it then matches if any
+    of them does and scores the sum, e.g. "partial" for substrings plus
+    "fulltext" for ranked word matches.
     """
-    key = (model_class.__name__, column_name)
+    if search_type not in SEARCH_TYPES:
+        raise ValueError(f"Unknown search type: {search_type}")
+    key = (model_class.__name__, column_name, search_type)
     searchable_registry[key] = {
         "type": search_type,
         "weight": weight,
@@ -22,7 +41,7 @@ def get_searchable_columns(model_class) -> List[Dict[str, Any]]:
     searchable_cols = []
     class_name = model_class.__name__
     
-    for (registered_class, column_name), metadata in searchable_registry.items():
+    for (registered_class, column_name, _), metadata in searchable_registry.items():
         if registered_class == class_name:
             searchable_cols.append({
                 "key": column_name,
@@ -0,0 +1,92 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from pydantic_core import to_json
+from sqlalchemy.inspection import inspect
+from app.metrics import record_rows
+
+
+# model class -> response schema, filled by the services, used to embed related entities
+response_model_registry: Dict[type, Type[BaseModel]] = {}
+
+
+def entity_response_model(model) -> Type[BaseModel]:
+    """
+    Response schema derived from the mapper's columns, for models
+    that do not declare their own response DTO.
+    """
+    fields = {}
+    for column in inspect(model).columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = Any
+        fields[column.key] = (Optional[python_type], None)
+    return create_model(
+        f"{model.__name__}ResponseDto",
+        __config__=ConfigDict(from_attributes=True),
+        **fields,
+    )
+
+
+def expanded_response_model(model, response_model: Type[BaseModel], relationships: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    `response_model` plus one field per expanded relationship, typed with
+    the related model's registered response schema.
+    """
+    fields = {}
+    for name in relationships:
+        relationship = inspect(model).relationships[name]
+        target = relationship.mapper.class_
+        target_model = response_model_registry.get(target) or entity_response_model(target)
+        fields[name] = (List[target_model], []) if relationship.uselist else (Optional[target_model], None)
+    suffix = "".join(name.title().replace("_", "") for name in relationships)
+    return create_model(f"{response_model.__name__}With{suffix}", __base__=response_model, **fields)
+
+
+class EntitySerializer:
+    """
+    Prebuilt pydantic-core validators/serializers for one response schema.
+    Accepts ORM instances, Core Row objects or dicts and writes JSON bytes
+    directly, bypassing FastAPI's per-attribute jsonable_encoder walk.
+    """
+    def __init__(self, response_model: Type[BaseModel]):
+        self.response_model = response_model
+        self._one = TypeAdapter(response_model)
+        self._many = TypeAdapter(List[response_model])
+
+    def validate_one(self, entity: Any) -> BaseModel:
+        return self._one.validate_python(entity, from_attributes=True)
+
+    def validate_many(self, entities: Iterable[Any]) -> List[BaseModel]:
+        return self._many.validate_python(list(entities), from_attributes=True)
+
+    def to_python(self, entities: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        JSON-compatible dicts, e.g. for storing in a cache.
+        """
+        return self._many.dump_python(self.validate_many(entities), mode="json")
+
+    def dump_one(self, entity: Any) -> bytes:
+        record_rows(1)
+        return self._one.dump_json(self.validate_one(entity))
+
+    def dump_many(self, entities: Iterable[Any]) -> bytes:
+        items = self.validate_many(entities)
+        record_rows(len(items))
+        return self._many.dump_json(items)
+
+    def dump_page(self, result: Dict[str, Any]) -> bytes:
+        """
+        A search/bulk result dict whose "items" are entities.
+        """
+        items = self.validate_many(result["items"])
+        record_rows(len(items))
+        return to_json({**result, "items": items})
+
+    def dump_columns(self, result: Dict[str, Any]) -> bytes:
+        """
+        A grouped result dict whose "columns" each carry entity "items".
+        """
+        columns = [{**column, "items": self.validate_many(column["items"])} for column in result["columns"]]
+        record_rows(sum(len(column["items"]) for column in columns))
+        return to_json({**result, "columns": columns})
@@ -1,89 +1,430 @@
-from typing import Type, TypeVar, Generic, List, Dict, Any, Tuple, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, asc, desc
+import json
+from typing import Type, TypeVar, Generic, Iterable, Iterator, List, Dict, Any, Sequence, Tuple, Optional
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from sqlalchemy import Integer, Table, asc, bindparam, delete, desc, insert, literal_column, select, text, union_all, update
+from sqlalchemy.inspection import inspect
 from fastapi import HTTPException, status
 from pydantic import BaseModel
-from .crud_searchable_registry import get_searchable_columns
-from .crud_search_utils import is_valid_column
+from .crud_searchable_registry import SEARCH_VECTOR_COLUMN, get_searchable_columns
+from .crud_search_utils import (
+    is_valid_column,
+    encode_cursor,
+    decode_cursor,
+    keyset_predicate,
+    keyset_order_by,
+    global_filter_condition,
+    global_filter_rank,
+    global_filter_params,
+    RELEVANCE_ORDER,
+)
 from .crud_search_dtos import EntitySearchDto
+from .crud_search_criteria import criteria_predicates, split_criteria
+from .crud_search_plan import SearchPlan, SearchPlanKey, search_plan_cache
+from .crud_search_recorder import record_search_request
+from .crud_streaming import STREAM_BATCH_SIZE
+from .crud_serializer import EntitySerializer, entity_response_model, expanded_response_model, response_model_registry
+from .crud_cache import EntityCache, query_cache_key
+from .crud_versions import version_tracker
+from .crud_change_feed import CHANGE_CHANNEL, change_feed
+from .crud_search_count import (
+    ESTIMATE_EXACT_THRESHOLD,
+    count_cache,
+    count_cache_key,
+    count_exact,
+    count_estimated,
+    inline_count_column,
+)
 
 T = TypeVar("T") # SQLAlchemy model type
 
+def reads_replica(db) -> bool:
+    """
+    Whether `db` reads from a replica (see get_read_database). Replica rows
+    may predate a write that already invalidated the shared caches, so they
+    are served but never cached.
+    """
+    return db.info.get("replica") is not None
+
+
 class BaseCrudService(Generic[T]):
-    def __init__(self, model: Type[T]):
+    def __init__(
+        self,
+        model: Type[T],
+        response_model: Optional[Type[BaseModel]] = None,
+        cache: Optional[EntityCache] = None,
+        archive: Optional[Table] = None,
+    ):
         self.model = model
+        self.serializer = EntitySerializer(response_model or entity_response_model(model))
+        self.cache = cache
+        # cold rows moved out of the model's table, searched only with includeArchived
+        self.archive = archive
+        self._archived_entities: Dict[bool, Any] = {}
+        self._expanded_serializers: Dict[Tuple[str, ...], EntitySerializer] = {}
+        self._search_plans = search_plan_cache(self.model.__tablename__)
+        response_model_registry[model] = self.serializer.response_model
 
     def search(
         self,
         db: Session,
         req: EntitySearchDto,
     ) -> Dict[str, Any]:
-        query = db.query(self.model)
-
-        # TODO: per-column filter ability matching
-        # optional filtering
-        # for column, criterion in req.criteria.items():
-        #     if not is_valid_column(self.model, column):
-        #         raise HTTPException(
-        #             status_code=status.HTTP_400_BAD_REQUEST,
-        #             detail=f"Invalid criterion column name: {column}",
-        #         )
-        #     if criterion != "":
-        #         query = query.filter(getattr(self.model, column) == criterion)
+        record_search_request(self.model, req)
+        # expanded items embed other tables, whose writes do not invalidate this cache
+        use_cache = self.cache is not None and not req.expand
+        if use_cache:
+            generation, version = self.cache.generation(), self._table_version()
+            cache_key = query_cache_key(req.model_dump(mode="json", by_alias=True))
+            cached = self.cache.get_query("search", cache_key, generation, version)
+            if cached is not None:
+                return cached
 
-        # global filtering (search)
-        searchable_fields = get_searchable_columns(self.model)
+        plan, filter_value, params = self._build_search_queries(req, db.get_bind().dialect.name)
+        rows = db.execute(plan.query, params).all()
+        if plan.null_query is not None and len(rows) < params["limit"]:
+            # the non-NULL block ended inside this page, fill it from the NULL block
+            rows += db.execute(plan.null_query, {**params, "limit": params["limit"] - len(rows)}).all()
+        rows, has_next = self._split_page(rows, req)
+        strategy, total_count = self._resolve_count(db, req, plan.base_query, filter_value, params, rows)
+        result = self._search_result(req, rows, has_next, strategy, total_count)
+
+        if use_cache:
+            result["items"] = self.serializer.to_python(result["items"])
+            if not reads_replica(db):
+                self.cache.set_query("search", cache_key, result, generation, version)
+        return result
+
+    def _build_search_queries(self, req: EntitySearchDto, dialect_name: str) -> Tuple[SearchPlan, str, Dict[str, Any]]:
+        """
+        The plan for the request's shape (page query, the unpaginated filtered
+        query it is cut from, and for keyset pages of a nullable column the
+        NULL block), the global filter term and the bound parameter values
+        of this request. Plans are cached, so most calls only bind values.
+        No I/O, shared by the sync and async services.
+        """
+        try:
+            criteria_shape, params = split_criteria(self.model, req.criteria)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         filter_value = req.globalFilter.strip()
         if filter_value:
-            global_conditions = []
-            for idx, field in enumerate(searchable_fields):
-                key = field["key"]
-                ftype = field["type"]
-                col = getattr(self.model, key)
-
-                if ftype == "exact":
-                    global_conditions.append(col == filter_value)
-                elif ftype == "partial":
-                    global_conditions.append(col.ilike(f"%{filter_value}%"))
-                elif ftype == "prefix":
-                    global_conditions.append(col.ilike(f"{filter_value}%"))
-                elif ftype == "suffix":
-                    global_conditions.append(col.ilike(f"%{filter_value}"))
-            if global_conditions:
-                query = query.filter(or_(*global_conditions))
+            params.update(global_filter_params(filter_value))
+        cursor_state = self._cursor_params(req, params)
+        params["limit"] = req.pageSize + 1  # one extra row tells whether a next page exists
+        if cursor_state is None:
+            params["offset"] = (req.pageNo - 1) * req.pageSize
+
+        key = SearchPlanKey(
+            dialect_name=dialect_name,
+            criteria=criteria_shape,
+            filtered=bool(filter_value),
+            order_by=req.orderByColumn,
+            ascending=req.ascending,
+            cursor=cursor_state,
+            inline_count=req.countStrategy == "inline",
+            expand=tuple(sorted(set(req.expand or ()))),
+            archived=self._includes_archive(req),
+        )
+        plan = self._search_plans.get(key)
+        if plan is None:
+            plan = self._compile_search_plan(key)
+            self._search_plans.set(key, plan)
+        return plan, filter_value, params
+
+    def _compile_search_plan(self, key: SearchPlanKey) -> SearchPlan:
+        entity = self._search_entity(key)
+        query = select(entity)
+
+        # per-column filtering
+        predicates = criteria_predicates(entity, key.criteria)
+        if predicates:
+            query = query.where(*predicates)
+
+        # global filtering (search)
+        searchable_fields = get_searchable_columns(self.model)
+        if key.filtered and searchable_fields:
+            condition = global_filter_condition(entity, searchable_fields, key.dialect_name)
+            if condition is not None:
+                query = query.where(condition)
 
         # ordering
-        if not is_valid_column(self.model, req.orderByColumn):
+        by_relevance = key.order_by == RELEVANCE_ORDER
+        if by_relevance and key.cursor is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"orderByColumn={RELEVANCE_ORDER} does not support cursor pagination",
+            )
+        if not by_relevance and not is_valid_column(self.model, key.order_by):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid orderByColumn: {req.orderByColumn}",
+                detail=f"Invalid orderByColumn: {key.order_by}",
             )
 
-        order_col = getattr(self.model, req.orderByColumn)
-        query = query.order_by(asc(order_col) if req.ascending else desc(order_col))
+        base_query = query
+        null_query = None
+        if key.cursor is not None:
+            query, null_query = self._keyset_query(query, key, entity)
+        elif by_relevance:
+            if key.filtered and searchable_fields:
+                # best matches first regardless of `ascending`
+                rank = global_filter_rank(entity, searchable_fields, key.dialect_name)
+                query = query.order_by(desc(rank), entity.id)
+            else:
+                query = query.order_by(entity.id)
+            query = query.offset(bindparam("offset", type_=Integer))
+        else:
+            order_col = getattr(entity, key.order_by)
+            query = query.order_by(asc(order_col) if key.ascending else desc(order_col))
+            # pagination
+            query = query.offset(bindparam("offset", type_=Integer))
+
+        def finish(page):
+            if key.inline_count:
+                page = page.add_columns(inline_count_column(base_query))
+            if key.expand:
+                page = page.options(*self.expand_options(key.expand, entity))
+            return page.limit(bindparam("limit", type_=Integer))
+
+        return SearchPlan(finish(query), base_query, finish(null_query) if null_query is not None else None)
+
+    def _includes_archive(self, req: EntitySearchDto) -> bool:
+        return bool(req.includeArchived) and self.archive is not None
+
+    def _search_entity(self, key: SearchPlanKey):
+        """
+        The model, or for includeArchived the model mapped over UNION ALL
+        of its table and the archive, so filters, ordering, cursors and
+        counts apply to both unchanged. Postgres pushes the filters down
+        into each branch, where the tables' own indexes serve them.
+        """
+        if not key.archived:
+            return self.model
+        fulltext = key.dialect_name == "postgresql" and any(
+            field["type"] == "fulltext" for field in get_searchable_columns(self.model)
+        )
+        entity = self._archived_entities.get(fulltext)
+        if entity is None:
+            table = self.model.__table__
+            hot = select(*table.columns)
+            cold = select(*(self.archive.c[column.name] for column in table.columns))
+            if fulltext:
+                # the generated tsvector columns are not mapped, carry them by name
+                hot = hot.add_columns(literal_column(f"{table.name}.{SEARCH_VECTOR_COLUMN}").label(SEARCH_VECTOR_COLUMN))
+                cold = cold.add_columns(
+                    literal_column(f"{self.archive.name}.{SEARCH_VECTOR_COLUMN}").label(SEARCH_VECTOR_COLUMN)
+                )
+            entity = aliased(self.model, union_all(hot, cold).subquery(f"{table.name}_with_archive"))
+            self._archived_entities[fulltext] = entity
+        return entity
+
+    def _split_page(self, rows: List[Any], req: EntitySearchDto) -> Tuple[List[Any], bool]:
+        return rows[:req.pageSize], len(rows) > req.pageSize
 
-        # pagination
-        to_skip = (req.pageNo - 1) * req.pageSize
-        to_take = req.pageSize
-        total_count = query.count()
-        items = query.offset(to_skip).limit(to_take).all()
+    def _resolve_count(
+        self,
+        db: Session,
+        req: EntitySearchDto,
+        base_query,
+        filter_value: str,
+        params: Dict[str, Any],
+        rows: List[Any],
+    ) -> Tuple[str, Optional[int]]:
+        strategy = req.countStrategy
+        total_count = None
+        if strategy == "inline":
+            if rows:
+                total_count = rows[0].total_count
+            elif req.cursor or req.pageNo > 1:
+                # an empty page past the end carries no count
+                total_count = count_exact(db, base_query, params)
+            else:
+                total_count = 0
+        elif strategy == "estimated":
+            # table statistics cover the whole hot table: any global filter,
+            # criterion or the archive needs the planner's estimate instead
+            filtered = bool(filter_value) or bool(req.criteria) or self._includes_archive(req)
+            total_count = count_estimated(db, self.model, base_query, params, filtered=filtered)
+            if total_count is None or total_count < ESTIMATE_EXACT_THRESHOLD:
+                strategy = "exact"
+                total_count = count_exact(db, base_query, params)
+        elif strategy == "cached":
+            cache_key = count_cache_key(
+                self.model, filter_value, req.model_dump(mode="json", by_alias=True)["criteria"],
+                self._includes_archive(req),
+            )
+            total_count = count_cache.get(cache_key)
+            if total_count is None:
+                total_count = count_exact(db, base_query, params)
+                count_cache.set(cache_key, total_count)
+        elif strategy == "exact":
+            total_count = count_exact(db, base_query, params)
+        return strategy, total_count
+
+    def _search_result(
+        self,
+        req: EntitySearchDto,
+        rows: List[Any],
+        has_next: bool,
+        strategy: str,
+        total_count: Optional[int],
+    ) -> Dict[str, Any]:
+        items = [row[0] for row in rows]
 
-        page_modulo = total_count % req.pageSize
-        page_count = (total_count - page_modulo) // req.pageSize + (0 if page_modulo == 0 else 1)
+        page_count = None
+        if total_count is not None:
+            page_modulo = total_count % req.pageSize
+            page_count = (total_count - page_modulo) // req.pageSize + (0 if page_modulo == 0 else 1)
 
-        return {
+        result = {
             "pageCount": page_count,
+            "countStrategy": strategy,
+            "hasNext": has_next,
             "items": items,
         }
+        if req.cursor is not None:
+            result["nextCursor"] = None
+            if has_next:
+                last = items[-1]
+                result["nextCursor"] = encode_cursor(req.orderByColumn, getattr(last, req.orderByColumn), last.id)
+        return result
 
-    def get_all(self, db: Session) -> List[T]:
+    def _cursor_params(self, req: EntitySearchDto, params: Dict[str, Any]) -> Optional[str]:
+        """
+        Decode the request's cursor into bound parameters and return the
+        keyset shape it needs: None for offset pages, "first", "after", or
+        "after_null" once the seek is inside the trailing NULL block.
+        """
+        if req.cursor is None:
+            return None
+        if not req.cursor:
+            return "first"
         try:
-            return db.query(self.model).all()
+            column_name, last_value, last_id = decode_cursor(self.model, req.cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if column_name != req.orderByColumn:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cursor was issued for orderByColumn={column_name}",
+            )
+        params["cursor_id"] = last_id
+        if last_value is None:
+            return "after_null"
+        params["cursor_value"] = last_value
+        return "after"
+
+    def _keyset_query(self, query, key: SearchPlanKey, entity):
+        """
+        Keyset pagination: seek past the (orderByColumn, id) pair of the previous
+        page instead of skipping rows, so every page costs the same as the first.
+        Returns the page query and, for a nullable column, the query of the
+        NULL block that follows the non-NULL values (else None); each is one
+        range of the column's (column, id) index.
+        """
+        order_col = getattr(entity, key.order_by)
+        id_col = entity.id
+        last_id = bindparam("cursor_id", type_=id_col.type)
+        if key.cursor == "after_null":
+            null_query = query.where(keyset_predicate(order_col, id_col, None, last_id, key.ascending))
+            return null_query.order_by(*keyset_order_by(order_col, id_col, key.ascending, null_block=True)), None
+
+        nullable = inspect(self.model).columns[key.order_by].nullable
+        if key.cursor == "after":
+            last_value = bindparam("cursor_value", type_=order_col.type)
+            page = query.where(keyset_predicate(order_col, id_col, last_value, last_id, key.ascending))
+        else:
+            page = query.where(order_col.is_not(None)) if nullable else query
+        page = page.order_by(*keyset_order_by(order_col, id_col, key.ascending))
+        if not nullable:
+            return page, None
+        null_query = query.where(order_col.is_(None))
+        return page, null_query.order_by(*keyset_order_by(order_col, id_col, key.ascending, null_block=True))
+
+    def expand_options(self, expand: Sequence[str], entity=None) -> List[Any]:
+        """
+        Loader options for the requested relationships. Many-to-one ones are
+        joined into the same SELECT, collections cost one IN query each,
+        so the statement count never grows with the number of rows.
+        `entity` is the model or an alias of it the query selects.
+        """
+        relationships = inspect(self.model).relationships
+        options = []
+        for name in dict.fromkeys(expand):
+            relationship = relationships.get(name)
+            if relationship is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Cannot expand {name}: not a relationship of {self.model.__name__}",
+                )
+            attribute = getattr(entity if entity is not None else self.model, name)
+            options.append(selectinload(attribute) if relationship.uselist else joinedload(attribute))
+        return options
+
+    def expanded_tables(self, expand: Sequence[str]) -> List[str]:
+        relationships = inspect(self.model).relationships
+        return [relationships[name].mapper.class_.__tablename__ for name in expand if name in relationships]
+
+    def serializer_for(self, expand: Optional[Sequence[str]]) -> EntitySerializer:
+        if not expand:
+            return self.serializer
+        key = tuple(sorted(set(expand)))
+        serializer = self._expanded_serializers.get(key)
+        if serializer is None:
+            self.expand_options(key)  # rejects unknown names
+            serializer = EntitySerializer(expanded_response_model(self.model, self.serializer.response_model, key))
+            self._expanded_serializers[key] = serializer
+        return serializer
+
+    def get_all(self, db: Session, expand: Sequence[str] = ()) -> List[T]:
+        use_cache = self.cache is not None and self.cache.cache_all and not expand
+        if use_cache:
+            generation, version = self.cache.generation(), self._table_version()
+            cached = self.cache.get_query("all", "", generation, version)
+            if cached is not None:
+                return cached
+        try:
+            entities = db.scalars(select(self.model).options(*self.expand_options(expand))).all()
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        if use_cache:
+            entities = self.serializer.to_python(entities)
+            if not reads_replica(db):
+                self.cache.set_query("all", "", entities, generation, version)
+        return entities
+
+    def iter_all(
+        self, db: Session, batch_size: int = STREAM_BATCH_SIZE, expand: Sequence[str] = ()
+    ) -> Iterator[List[T]]:
+        """
+        Stream every row in id order through a server-side cursor,
+        `batch_size` rows at a time, so memory stays bounded.
+        """
+        result = db.execute(
+            select(self.model)
+            .options(*self.expand_options(expand))
+            .order_by(self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for partition in result.scalars().partitions():
+            # the identity map only holds weak references, a consumed batch is freed
+            yield partition
 
-    def get(self, db: Session, entity_id: int) -> T:
-        entity = db.query(self.model).filter(self.model.id == entity_id).first()
+    def get(self, db: Session, entity_id: int, expand: Sequence[str] = ()) -> T:
+        if self.cache is None or expand:
+            return self._get_entity(db, entity_id, expand)
+        generation, version = self.cache.generation(), self._table_version()
+        cached = self.cache.get_entity(entity_id, version)
+        if cached is not None:
+            return cached
+        entity = self.serializer.to_python([self._get_entity(db, entity_id)])[0]
+        if not reads_replica(db):
+            self.cache.set_entity(entity_id, entity, generation, version)
+        return entity
+
+    def _get_entity(self, db: Session, entity_id: int, expand: Sequence[str] = ()) -> T:
+        entity = db.scalar(
+            select(self.model).options(*self.expand_options(expand)).where(self.model.id == entity_id)
+        )
         if not entity:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -97,13 +438,14 @@ class BaseCrudService(Generic[T]):
             db.add(entity)
             db.commit()
             db.refresh(entity)
+            self._invalidate([entity.id], "create")
             return entity
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     def update(self, db: Session, entity_id: int, data: Dict[str, Any]) -> T:
-        entity = self.get(db, entity_id)
+        entity = self._get_entity(db, entity_id)
         if not entity:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Entity not found")
 
@@ -113,19 +455,173 @@ class BaseCrudService(Generic[T]):
             setattr(entity, "id", entity_id)
             db.commit()
             db.refresh(entity)
+            self._invalidate([entity_id])
             return entity
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     def remove(self, db: Session, entity_id: int) -> None:
-        entity = self.get(db, entity_id)
+        entity = self._get_entity(db, entity_id)
         if not entity:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Entity not found")
 
         try:
             db.delete(entity)
             db.commit()
+            self._invalidate([entity_id], "delete")
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    def bulk_create(self, db: Session, items: List[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Insert (index, data) pairs with multi-row INSERT ... RETURNING in one transaction.
+        Rows the database rejects are reported per item, the rest are kept.
+        """
+        statement = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        created, errors = self.bulk_execute(
+            db, items, lambda chunk: db.scalars(statement, [data for _, data in chunk]).all()
+        )
+        self._invalidate([entity.id for entity in created], "create")
+        return {"items": created, "errors": errors}
+
+    def bulk_update(self, db: Session, items: List[Tuple[int, int, Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Apply (index, id, data) triples as one UPDATE executemany keyed by primary key,
+        then load the updated rows with a single SELECT.
+        """
+        ids = [entity_id for _, entity_id, _ in items]
+        existing = set(db.scalars(select(self.model.id).where(self.model.id.in_(ids))).all())
+        errors = [
+            {"index": index, "id": entity_id, "detail": f"{self.model.__name__} with id={entity_id} not found"}
+            for index, entity_id, _ in items if entity_id not in existing
+        ]
+        pending = [(index, {**data, "id": entity_id}) for index, entity_id, data in items if entity_id in existing]
+
+        def run(chunk):
+            db.execute(update(self.model), [data for _, data in chunk])
+            return [data["id"] for _, data in chunk]
+
+        updated_ids, update_errors = self.bulk_execute(db, pending, run)
+        self._invalidate(updated_ids)
+        errors.extend(update_errors)
+        updated = db.scalars(
+            select(self.model)
+            .where(self.model.id.in_(updated_ids))
+            .order_by(self.model.id)
+            .execution_options(populate_existing=True)
+        ).all()
+        return {"items": updated, "errors": sorted(errors, key=lambda error: error["index"])}
+
+    def bulk_remove(self, db: Session, ids: List[int]) -> Dict[str, Any]:
+        """
+        Delete ids with one DELETE ... RETURNING; ids that did not exist are reported.
+        """
+        statement = delete(self.model).returning(self.model.id)
+        deleted, errors = self.bulk_execute(
+            db,
+            list(enumerate(ids)),
+            lambda chunk: db.scalars(
+                statement.where(self.model.id.in_([entity_id for _, entity_id in chunk]))
+            ).all(),
+        )
+        deleted_ids = set(deleted)
+        self._invalidate(deleted_ids, "delete")
+        failed = {error["index"] for error in errors}
+        for index, entity_id in enumerate(ids):
+            if entity_id not in deleted_ids and index not in failed:
+                errors.append({
+                    "index": index,
+                    "id": entity_id,
+                    "detail": f"{self.model.__name__} with id={entity_id} not found",
+                })
+        return {"items": sorted(deleted_ids), "errors": sorted(errors, key=lambda error: error["index"])}
+
+    def bulk_execute(self, db: Session, items: List[Tuple[int, Any]], run) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """
+        Run `run(items)` as one statement inside a savepoint. If the database rejects
+        the batch, retry item by item in their own savepoints to isolate the failures,
+        then commit everything that succeeded at once. Also the building block of
+        bulk writers outside the service, e.g. imports; they call invalidate_bulk.
+        """
+        results, errors = [], []
+        if items:
+            try:
+                with db.begin_nested():
+                    results = list(run(items))
+            except Exception:
+                for item in items:
+                    try:
+                        with db.begin_nested():
+                            results.extend(run([item]))
+                    except Exception as e:
+                        index, data = item
+                        entity_id = data.get("id") if isinstance(data, dict) else data
+                        errors.append({"index": index, "id": entity_id, "detail": str(e)})
+        # returned rows are already loaded, expiring them would cost a SELECT per row
+        expire_on_commit = db.expire_on_commit
+        db.expire_on_commit = False
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        finally:
+            db.expire_on_commit = expire_on_commit
+        return results, errors
+
+    def _table_version(self) -> int:
+        """
+        The model table's version as this process last read it, which the
+        router's ETag was just built from; taken with the cache generation
+        before the read. Cache entries stored under an older version are
+        skipped, so a body cached before a write another process made
+        (its notification not in yet) is never sent under the ETag that
+        covers the write.
+        """
+        return version_tracker.peek(self.model.__tablename__)
+
+    def _invalidate(self, entity_ids, op: str = "update") -> None:
+        """
+        Called after a committed write: drops the touched entities and
+        every cached list, search and count of the model, and announces
+        the change on the feed.
+        """
+        entity_ids = list(entity_ids)
+        self._drop_cached(entity_ids)
+        change_feed.record_write(self.model.__tablename__, op, entity_ids)
+
+    def begin_bulk_write(self, db: Session) -> None:
+        """
+        Silence the per-row change notifications of the current transaction
+        (Postgres, migration 0008); call announce_bulk_write before commit.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            # reset at commit, so every transaction of a long job sets it again
+            db.execute(text("SET LOCAL app.bulk_load = 'on'"))
+
+    def announce_bulk_write(self, db: Session, op: str) -> None:
+        """
+        Queue one change event without an id for the current transaction,
+        delivered on commit to every process listening on Postgres.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": CHANGE_CHANNEL, "payload": json.dumps({"table": self.model.__tablename__, "op": op})},
+            )
+
+    def invalidate_bulk(self, op: str, entity_ids: Iterable[int] = ()) -> None:
+        """
+        _invalidate for a committed write too large to announce row by row:
+        the feed gets one event without an id instead of one per entity.
+        """
+        self._drop_cached(list(entity_ids))
+        change_feed.record_bulk_write(self.model.__tablename__, op)
+
+    def _drop_cached(self, entity_ids: List[int]) -> None:
+        count_cache.invalidate_model(self.model.__name__)
+        version_tracker.invalidate(self.model.__tablename__)
+        if self.cache is not None:
+            self.cache.invalidate(entity_ids)
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from app.metrics import Counter, gauge_providers
+
+# Identical concurrent reads share one execution, 0 turns it off
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1") == "1"
+
+single_flight_requests = Counter(
+    "single_flight_requests_total",
+    "Coalescable reads by route: leaders ran the query, followers reused a leader's result.",
+    ("route", "role"),
+)
+gauge_providers.append(single_flight_requests.render)
+
+# Every SingleFlight, for the stats endpoint
+single_flight_registry: Dict[str, "SingleFlight"] = {}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: the first caller for a key runs
+    it, callers arriving before it finishes wait and get the same result
+    (or exception). Nothing is kept afterwards, this is not a cache.
+
+    `do` serves sync routes running on the thread pool, `do_async` async
+    routes on the event loop. `fn` runs on the leader's session, keys must
+    tell apart anything that changes the result, the database included.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.leaders = 0
+        self.followers = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        single_flight_registry[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        if not SINGLE_FLIGHT:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            self._count("follower")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self._count("leader")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not SINGLE_FLIGHT:
+            return await fn()
+        task = self._tasks.get(key)
+        if task is None:
+            self._count("leader")
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            # runs on the leader's session, so it goes when the leader is cancelled
+            return await task
+        self._count("follower")
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled() and not asyncio.current_task().cancelling():
+                # the leader's client went away, not ours: run it again
+                return await self.do_async(key, fn)
+            raise
+
+    def _count(self, role: str) -> None:
+        with self._lock:
+            if role == "leader":
+                self.leaders += 1
+            else:
+                self.followers += 1
+        single_flight_requests.inc(self.name, role)
+
+    def stats(self) -> Dict[str, int]:
+        return {"leaders": self.leaders, "coalesced": self.followers}
+
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    return {f"single_flight:{name}": flight.stats() for name, flight in single_flight_registry.items()}
@@ -0,0 +1,81 @@
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, List
+from .crud_serializer import EntitySerializer
+
+STREAM_BATCH_SIZE = 500
+
+STREAM_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def encode_batch(batch: List[Any], fmt: str, first: bool, serializer: EntitySerializer) -> bytes:
+    """
+    One chunk of a streamed body: NDJSON lines, or comma-joined elements
+    of a JSON array whose brackets are written by the caller.
+    """
+    if fmt == "ndjson":
+        return b"\n".join(serializer.dump_one(entity) for entity in batch) + b"\n"
+    # a serialized list minus its brackets
+    return (b"" if first else b",") + serializer.dump_many(batch)[1:-1]
+
+
+def stream_batches(batches: Iterable[List[Any]], fmt: str, serializer: EntitySerializer) -> Iterator[bytes]:
+    if fmt == "json":
+        yield b"["
+    first = True
+    for batch in batches:
+        if batch:
+            yield encode_batch(batch, fmt, first, serializer)
+            first = False
+    if fmt == "json":
+        yield b"]"
+
+
+async def stream_batches_async(batches: AsyncIterator[List[Any]], fmt: str, serializer: EntitySerializer) -> AsyncIterator[bytes]:
+    if fmt == "json":
+        yield b"["
+    first = True
+    async for batch in batches:
+        if batch:
+            yield encode_batch(batch, fmt, first, serializer)
+            first = False
+    if fmt == "json":
+        yield b"]"
+
+
+def release_once(context) -> Callable[[], None]:
+    """
+    Exit an entered session context manager at most once. A streamed
+    body owns its session; the stream's end, the response's background
+    task and the route's error path all call this, so the connection goes
+    back to the pool even if the body is never iterated.
+    """
+    lock = threading.Lock()
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        with lock:
+            if released:
+                return
+            released = True
+        context.__exit__(None, None, None)
+
+    return release
+
+
+def release_once_async(context) -> Callable[[], Awaitable[None]]:
+    """
+    release_once for an async context manager, on the event loop.
+    """
+    released = False
+
+    async def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            await context.__aexit__(None, None, None)
+
+    return release
@@ -0,0 +1,312 @@
+import csv
+import io
+import itertools
+import os
+from datetime import date, datetime, timezone
+from time import perf_counter
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Table, insert, select
+from sqlalchemy.orm import Session
+from app.metrics import Counter, gauge_providers, logger
+
+# Rows per fetch on export and per COPY (and commit) on import
+TRANSFER_BATCH_SIZE = int(os.getenv("TRANSFER_BATCH_SIZE", "5000"))
+# Rejected rows listed in an import report, the rest are only counted
+TRANSFER_MAX_ERRORS = int(os.getenv("TRANSFER_MAX_ERRORS", "100"))
+# Bytes of an uploaded import held in memory before it spills to a temporary file
+TRANSFER_SPOOL_SIZE = int(os.getenv("TRANSFER_SPOOL_SIZE", str(8 * 1024 * 1024)))
+# Seconds between progress lines in the log
+TRANSFER_LOG_INTERVAL = 10.0
+
+# csv is always available, arrow (Arrow IPC stream) needs the optional `pyarrow` package
+TRANSFER_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+transfer_rows = Counter(
+    "transfer_rows_total", "Rows moved by bulk export and import.", ("table", "direction"),
+)
+gauge_providers.append(transfer_rows.render)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError as e:
+        raise RuntimeError("the arrow format needs the 'pyarrow' package") from e
+    return pyarrow
+
+
+def require_format(fmt: str) -> None:
+    """
+    Fail before any row moves when `fmt` is unknown or its package is
+    missing. Raises ValueError or RuntimeError.
+    """
+    if fmt not in TRANSFER_MEDIA_TYPES:
+        raise ValueError(f"unknown format {fmt!r}, expected one of {', '.join(TRANSFER_MEDIA_TYPES)}")
+    if fmt == "arrow":
+        _pyarrow()
+
+
+class TransferProgress:
+    """
+    Row counts and throughput of one export or import, logged every
+    TRANSFER_LOG_INTERVAL seconds and once at the end.
+    """
+    def __init__(self, table: str, direction: str):
+        self.table = table
+        self.direction = direction
+        self.rows = 0
+        self.rejected = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.started = perf_counter()
+        self._logged = self.started
+
+    def add(self, rows: int) -> None:
+        self.rows += rows
+        transfer_rows.inc(self.table, self.direction, amount=rows)
+        now = perf_counter()
+        if now - self._logged >= TRANSFER_LOG_INTERVAL:
+            self._logged = now
+            logger.info("%s %s: %d rows so far, %.0f rows/s", self.table, self.direction, self.rows, self.rows_per_second)
+
+    def reject(self, errors: List[Dict[str, Any]]) -> None:
+        self.rejected += len(errors)
+        self.errors.extend(errors[:max(TRANSFER_MAX_ERRORS - len(self.errors), 0)])
+
+    @property
+    def seconds(self) -> float:
+        return perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / max(self.seconds, 1e-9)
+
+    def finish(self) -> Dict[str, Any]:
+        logger.info(
+            "%s %s: %d rows (%d rejected) in %.1fs, %.0f rows/s",
+            self.table, self.direction, self.rows, self.rejected, self.seconds, self.rows_per_second,
+        )
+        return {
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "seconds": round(self.seconds, 3),
+            "rowsPerSecond": round(self.rows_per_second, 1),
+            "errors": self.errors,
+        }
+
+
+def _csv_value(value: Any) -> Any:
+    # None stays an empty unquoted field, which COPY ... (FORMAT csv) reads as NULL;
+    # isoformat() keeps the offset of aware datetimes
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+
+def _db_value(column, value: Any) -> Any:
+    # a timestamp without time zone column silently drops an offset: store the
+    # UTC instant, as the datetime.utcnow() defaults do
+    if isinstance(value, datetime) and value.tzinfo is not None and not getattr(column.type, "timezone", False):
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _arrow_type(pa, column):
+    python_type = column.type.python_type
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is datetime:
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    if python_type is date:
+        return pa.date32()
+    return pa.string()
+
+
+class _Drain(io.RawIOBase):
+    # file object the Arrow writer writes to, emptied after every batch
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def _encode_csv(names: List[str], batches: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(names)
+    for batch in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _encode_arrow(columns, batches: Iterable[List[Tuple]]) -> Iterator[bytes]:
+    pa = _pyarrow()
+    schema = pa.schema([(column.name, _arrow_type(pa, column)) for column in columns])
+    sink = _Drain()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.take()
+    yield sink.take()
+
+
+def export_table(db: Session, table: Table, fmt: str, batch_size: int = TRANSFER_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Every row of `table` in primary key order as CSV (with a header line)
+    or an Arrow IPC stream, one chunk per fetched batch. Rows come from a
+    server-side cursor, so memory stays at one batch whatever the size.
+    """
+    require_format(fmt)
+    columns = list(table.columns)
+    result = db.execute(
+        select(*columns).order_by(*table.primary_key.columns).execution_options(yield_per=batch_size)
+    )
+    progress = TransferProgress(table.name, "export")
+
+    def batches():
+        for partition in result.partitions():
+            yield partition
+            progress.add(len(partition))
+
+    if fmt == "csv":
+        yield from _encode_csv([column.name for column in columns], batches())
+    else:
+        yield from _encode_arrow(columns, batches())
+    progress.finish()
+
+
+def _read_csv(source: IO[bytes], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    stream = io.TextIOWrapper(source, encoding="utf-8", newline="")
+    reader = csv.DictReader(stream)
+    try:
+        while True:
+            batch = [
+                # empty fields are missing values, as they are in our own exports
+                {name: value if value != "" else None for name, value in row.items()}
+                for row in itertools.islice(reader, batch_size)
+            ]
+            if not batch:
+                return
+            yield batch
+    finally:
+        stream.detach()  # the caller owns and closes `source`
+
+
+def _read_arrow(source: IO[bytes], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    pa = _pyarrow()
+    for record_batch in pa.ipc.open_stream(source):
+        for offset in range(0, record_batch.num_rows, batch_size):
+            yield record_batch.slice(offset, batch_size).to_pylist()
+
+
+def _copy_rows(db: Session, table: Table, names: List[str], rows: List[Dict[str, Any]]) -> None:
+    rows = [{name: _db_value(table.columns[name], row[name]) for name in names} for row in rows]
+    connection = db.connection()
+    if connection.dialect.driver != "psycopg2":
+        # SQLite in local runs and drivers without copy_expert: one executemany INSERT
+        db.execute(insert(table), rows)
+        return
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows([_csv_value(row[name]) for name in names] for row in rows)
+    buffer.seek(0)
+    quote = connection.dialect.identifier_preparer.quote
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {quote(table.name)} ({', '.join(quote(name) for name in names)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def _client_defaults(table: Table, names: Iterable[str]) -> Dict[str, Callable[[], Any]]:
+    # COPY skips SQLAlchemy's Python-side defaults, e.g. Task.created_at
+    defaults = {}
+    for column in table.columns:
+        default = column.default
+        if column.name in names or column.primary_key or default is None:
+            continue
+        if default.is_callable:
+            defaults[column.name] = lambda arg=default.arg: arg(None)
+        elif default.is_scalar:
+            defaults[column.name] = lambda value=default.arg: value
+    return defaults
+
+
+def import_table(
+    db: Session,
+    service,
+    create_model: Type[BaseModel],
+    source: IO[bytes],
+    fmt: str,
+    batch_size: int = TRANSFER_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Load rows from a CSV (header line required) or Arrow IPC stream into
+    the service's table. Every row is validated against `create_model`;
+    valid rows go in with COPY, one batch and one commit at a time, so
+    memory stays at one batch. A batch the database rejects is retried
+    row by row to isolate the failures, like bulk_create. Rejected rows
+    are reported by 0-based index. Ids come from the sequence, and
+    columns outside `create_model` get their defaults.
+
+    The per-row change notifications are skipped for the load and one
+    "import" event without an id is sent instead.
+    """
+    require_format(fmt)
+    table = service.model.__table__
+    names = [name for name in create_model.model_fields if name in table.columns]
+    defaults = _client_defaults(table, names)
+    progress = TransferProgress(table.name, "import")
+    reader = _read_csv if fmt == "csv" else _read_arrow
+
+    copied = names + list(defaults)
+
+    def run(chunk):
+        rows = [data for _, data in chunk]
+        for data in rows:
+            for name, default in defaults.items():
+                data[name] = default()
+        _copy_rows(db, table, copied, rows)
+        return [index for index, _ in chunk]
+
+    index = 0
+    for batch in reader(source, batch_size):
+        valid, errors = [], []
+        for row in batch:
+            try:
+                valid.append((index, create_model.model_validate(row).model_dump(include=set(names))))
+            except ValidationError as e:
+                errors.append({"index": index, "detail": e.errors(include_url=False, include_context=False)})
+            index += 1
+        service.begin_bulk_write(db)
+        imported, failed = service.bulk_execute(db, valid, run)
+        progress.add(len(imported))
+        progress.reject(sorted(errors + failed, key=lambda error: error["index"]))
+
+    if progress.rows:
+        service.announce_bulk_write(db, "import")
+        db.commit()
+        service.invalidate_bulk("import")
+    return progress.finish()
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import BigInteger, Column, DateTime, String, Table, func, select
+from app.database import BaseDataModel, engine
+
+# How long a version read from the database is trusted before re-reading it.
+# Within this window conditional GETs are answered without any query.
+VERSION_TTL = float(os.getenv("VERSION_TTL", "1"))
+
+# Committed log rows past which a reload folds table_change into table_version
+VERSION_COMPACT_ROWS = 1000
+
+# One row per tracked table; statement-level triggers (migrations 0005, 0011)
+# append a table_change row in the writing transaction, so a version is never
+# visible before its data. A table's version is its row's version plus its
+# rows in the log, compact_table_changes() moves the log into the row.
+table_version = Table(
+    "table_version",
+    BaseDataModel.metadata,
+    Column("table_name", String, primary_key=True),
+    Column("version", BigInteger, nullable=False, default=0),
+    Column("updated_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+table_change = Table(
+    "table_change",
+    BaseDataModel.metadata,
+    Column("table_name", String, nullable=False),
+    Column("changed_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+
+class VersionTracker:
+    """
+    Cheap per-table change versions for ETag/Last-Modified.
+    Postgres versions come from `table_version`; other dialects (no triggers)
+    fall back to in-process counters bumped by BaseCrudService writes.
+    """
+    def __init__(self, ttl: float = VERSION_TTL, bind=None, compact: bool = True):
+        self.ttl = ttl
+        self.bind = bind if bind is not None else engine
+        # replicas are read-only, their log is folded on the primary and replicated
+        self.compact = compact
+        self._versions: Dict[str, Tuple[int, datetime]] = {}
+        self._local: Dict[str, Tuple[int, datetime]] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self, table_name: str) -> Tuple[int, datetime]:
+        if self.bind.dialect.name != "postgresql":
+            with self._lock:
+                return self._local.get(table_name, (0, _boot_time))
+        with self._lock:
+            fresh = time.monotonic() - self._loaded_at < self.ttl
+            if fresh and table_name in self._versions:
+                return self._versions[table_name]
+        self._reload()
+        with self._lock:
+            return self._versions.get(table_name, (0, _boot_time))
+
+    def peek(self, table_name: str) -> int:
+        """
+        The version `current` last returned for the table, without going
+        to the database.
+        """
+        with self._lock:
+            versions = self._local if self.bind.dialect.name != "postgresql" else self._versions
+            return versions.get(table_name, (0, _boot_time))[0]
+
+    def _reload(self) -> None:
+        logged = func.count(table_change.c.table_name)
+        with self.bind.connect() as connection:
+            # one statement, so the row and the log are read from the same snapshot
+            rows = connection.execute(
+                select(
+                    table_version.c.table_name,
+                    (table_version.c.version + logged).label("version"),
+                    func.greatest(table_version.c.updated_at, func.max(table_change.c.changed_at)).label("updated_at"),
+                    logged.label("logged"),
+                )
+                .select_from(table_version.outerjoin(
+                    table_change, table_change.c.table_name == table_version.c.table_name
+                ))
+                .group_by(table_version.c.table_name, table_version.c.version, table_version.c.updated_at)
+            ).all()
+        with self._lock:
+            self._versions = {row.table_name: (row.version, row.updated_at) for row in rows}
+            self._loaded_at = time.monotonic()
+        if self.compact and sum(row.logged for row in rows) >= VERSION_COMPACT_ROWS:
+            # leaves every version as it is, just keeps the next count short
+            with self.bind.begin() as connection:
+                connection.execute(select(func.compact_table_changes()))
+
+    def expire(self) -> None:
+        """
+        Force the next read of every table to hit the database, e.g. after
+        change notifications may have been missed.
+        """
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def invalidate(self, table_name: str) -> None:
+        """
+        Note a committed write: bump the local counter and force the next
+        read to hit the database, so this process never serves its own
+        writes as "not modified".
+        """
+        with self._lock:
+            version, _ = self._local.get(table_name, (0, _boot_time))
+            self._local[table_name] = (version + 1, datetime.now(timezone.utc))
+            self._loaded_at = 0.0
+
+
+_boot_time = datetime.now(timezone.utc)
+
+version_tracker = VersionTracker()
+_replica_trackers: Dict[str, VersionTracker] = {}
+
+
+def version_tracker_for(db) -> VersionTracker:
+    """
+    The tracker matching the data `db` reads: a replica's own table_version
+    rows replicate with its data, so its ETags never claim rows it has not
+    replayed yet. Without triggers (non-Postgres) versions are in-process.
+    """
+    replica = db.info.get("replica") if db is not None else None
+    if replica is None or replica.engine.dialect.name != "postgresql":
+        return version_tracker
+    tracker = _replica_trackers.get(replica.name)
+    if tracker is None:
+        tracker = _replica_trackers.setdefault(replica.name, VersionTracker(bind=replica.engine, compact=False))
+    return tracker
+
+
+def make_etag(table_versions: Dict[str, int], variant: str = "") -> str:
+    digest = hashlib.blake2b(variant.encode(), digest_size=8).hexdigest()
+    tables = ".".join(f"{name}-{version}" for name, version in sorted(table_versions.items()))
+    return f'W/"{tables}.{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison, as required for If-None-Match
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
@@ -1,29 +1,52 @@
 import os
-from alembic.config import Config
-from alembic import command
-from sqlmodel import Session, select
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, select
 from app.api.status.status_model import Status
 from app.database import DATABASE_URL
 import logging
 
 logger = logging.getLogger("uvicorn.error")
 
+# Run migrations and seeding in the app's lifespan. Set to 0 when they are run
+# once per deploy with `python -m app.manage init`, so workers boot lean.
+SCHEMA_ON_STARTUP = os.getenv("SCHEMA_ON_STARTUP", "1") == "1"
+
+# pg_advisory_lock key serializing schema work across workers and deploys
+SCHEMA_LOCK_KEY = 8002
+
 # # Create all tables
 # def init_db():
 #     Base.metadata.create_all(bind=engine)
 
-def run_migrations():
+def alembic_config():
+    # alembic is imported here, not at module level, to keep it off the boot path
+    from alembic.config import Config
+
     base_dir = os.path.dirname(os.path.abspath(__file__))
     alembic_ini_path = os.path.join(base_dir, "..", "alembic.ini")
     alembic_cfg = Config(alembic_ini_path)
     alembic_cfg.attributes["configure_logger"] = False
-    alembic_cfg.set_main_option("script_location", "alembic")
+    alembic_cfg.set_main_option("script_location", os.path.join(base_dir, "..", "alembic"))
     alembic_cfg.set_main_option("sqlalchemy.url", DATABASE_URL)
+    return alembic_cfg
+
+def run_migrations(strict: bool = False):
+    from alembic import command
+
     try:
-        command.upgrade(alembic_cfg, "head")
+        command.upgrade(alembic_config(), "head")
         logger.info("Successfully applied Alembic migrations")
     except Exception:
         logger.exception("!!! Alembic migrations failed")
+        if strict:
+            raise
+
+def schema_is_current(connection) -> bool:
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    heads = set(ScriptDirectory.from_config(alembic_config()).get_heads())
+    return set(MigrationContext.configure(connection).get_current_heads()) == heads
 
 def create_initial_if_missing(engine):
     # ensure some statuses exist
@@ -33,4 +56,32 @@ def create_initial_if_missing(engine):
         if not statuses:
             for i, name in enumerate(["In Progress", "Done"]):
                 s.add(Status(name=name, order=i))
-            s.commit()
\ No newline at end of file
+            s.commit()
+
+def prepare_database(engine, strict: bool = False):
+    """
+    Migrate, create missing tables and seed, once. On Postgres a session
+    advisory lock makes concurrent callers (workers, deploy jobs) queue up;
+    whoever gets it after the first finds the schema at head and only
+    re-checks the seed data.
+    """
+    if engine.dialect.name != "postgresql":
+        run_migrations(strict)
+        SQLModel.metadata.create_all(engine)  # if you still want this
+        create_initial_if_missing(engine)
+        return
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        connection.commit()
+        try:
+            if schema_is_current(connection):
+                logger.info("Schema is at head, skipping migrations")
+            else:
+                run_migrations(strict)
+                SQLModel.metadata.create_all(engine)  # if you still want this
+            connection.commit()
+            create_initial_if_missing(engine)
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            connection.commit()
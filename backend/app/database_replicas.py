@@ -0,0 +1,254 @@
+import asyncio
+import itertools
+import os
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.metrics import routed_reads
+
+# Comma-separated read replica URLs, reads stay on the primary when unset
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# Replicas further behind than this many seconds serve no reads
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "5"))
+# Seconds between health and lag checks of one replica
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+# Seconds a connection attempt to a replica may take before it counts as down
+REPLICA_CONNECT_TIMEOUT = int(os.getenv("REPLICA_CONNECT_TIMEOUT", "2"))
+# Seconds after a client's own write during which its reads stay on the primary
+READ_YOUR_WRITES_WINDOW = float(os.getenv("READ_YOUR_WRITES_WINDOW", "1"))
+
+WROTE_AT_COOKIE = "db_wrote_at"
+# The same marker as a header, for cross-origin clients that send no cookies:
+# exposed through CORS, sent back on the next requests (see frontend/utils/api.ts)
+WROTE_AT_HEADER = "X-DB-Wrote-At"
+
+# On a standby: seconds since the last replayed transaction, 0 once replay has
+# caught up with everything received (an idle primary sends nothing new).
+# On anything else, e.g. a second SQLite file in local tests: 0.
+POSTGRES_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def replica_connect_args(url: str) -> Dict[str, Any]:
+    """
+    Driver arguments bounding how long connecting to a replica may block,
+    a dead host otherwise hangs for the OS TCP timeout.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "postgresql":
+        return {}
+    if url.get_driver_name() == "asyncpg":
+        return {"timeout": REPLICA_CONNECT_TIMEOUT}
+    return {"connect_timeout": REPLICA_CONNECT_TIMEOUT}
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine, async_engine=None):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = False
+        self.lag = float("inf")
+        self.checked_at = 0.0
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(exception_context):
+            # a dropped connection takes the replica out until its next check
+            if exception_context.is_disconnect:
+                self.healthy = False
+
+        if async_engine is not None:
+            event.listen(async_engine.sync_engine, "handle_error", handle_error)
+
+    def fresh(self) -> bool:
+        # a replica whose checks stopped coming serves no reads on old results
+        return time.monotonic() - self.checked_at < 3 * REPLICA_CHECK_INTERVAL
+
+    def check(self) -> None:
+        # blocking, runs on ReplicaSet's background task; requests keep
+        # routing on the last result meanwhile
+        try:
+            with self.engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    self.lag = float(connection.scalar(POSTGRES_LAG_SQL))
+                else:
+                    connection.execute(text("SELECT 1"))
+                    self.lag = 0.0
+            self.healthy = True
+        except Exception:
+            self.healthy = False
+        finally:
+            self.checked_at = time.monotonic()
+
+    def as_dict(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "lag": self.lag if self.healthy else None,
+            "checked_ago": round(time.monotonic() - self.checked_at, 3) if self.checked_at else None,
+        }
+
+
+class ReplicaSet:
+    """
+    Picks a healthy replica, round robin, that is recent enough for the
+    current client: within REPLICA_MAX_LAG in general and, after the client's
+    own write, behind by less than the time since that write. None means
+    read from the primary.
+
+    Health and lag come from a background task started in the app lifespan,
+    so requests never wait on a check; until the first one, and whenever
+    checks stop, reads stay on the primary.
+    """
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._next = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    async def start(self) -> None:
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            # blocking checks side by side on the thread pool, a dead replica
+            # costs at most REPLICA_CONNECT_TIMEOUT and holds up no other
+            await asyncio.gather(*(run_in_threadpool(replica.check) for replica in self.replicas))
+            await asyncio.sleep(REPLICA_CHECK_INTERVAL)
+
+    def pick(self, wrote_at: Optional[float]) -> Optional[Replica]:
+        if not self.replicas:
+            return None
+        max_lag = REPLICA_MAX_LAG
+        if wrote_at is not None:
+            since_write = time.time() - wrote_at
+            if since_write < READ_YOUR_WRITES_WINDOW:
+                routed_reads.inc("primary", "own_write")
+                return None
+            max_lag = min(max_lag, since_write)
+        candidates = [
+            replica for replica in self.replicas
+            if replica.healthy and replica.fresh() and replica.lag < max_lag
+        ]
+        if not candidates:
+            routed_reads.inc("primary", "no_replica")
+            return None
+        replica = candidates[next(self._next) % len(candidates)]
+        routed_reads.inc(replica.name, "replica")
+        return replica
+
+    def stats(self) -> dict:
+        return {replica.name: replica.as_dict() for replica in self.replicas}
+
+    def render_gauges(self) -> List[str]:
+        lines = [
+            "# HELP db_replica_lag_seconds Replay lag at the last check, -1 while unhealthy.",
+            "# TYPE db_replica_lag_seconds gauge",
+        ]
+        for replica in self.replicas:
+            lag = replica.lag if replica.healthy else -1
+            lines.append(f'db_replica_lag_seconds{{replica="{replica.name}"}} {lag}')
+        return lines
+
+
+class RoutingState:
+    __slots__ = ("wrote_at", "committed_at")
+
+    def __init__(self, wrote_at: Optional[float]):
+        self.wrote_at = wrote_at      # the client's last write, from its cookie or header
+        self.committed_at = None      # a write committed by this request
+
+
+# Set by ReadYourWritesMiddleware, mutated from the threadpool like RequestStats
+_routing_state: ContextVar[Optional[RoutingState]] = ContextVar("routing_state", default=None)
+
+
+def client_wrote_at() -> Optional[float]:
+    state = _routing_state.get()
+    return state.wrote_at if state is not None else None
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_write(session) -> None:
+    # AsyncSession commits through a plain Session too
+    state = _routing_state.get()
+    if state is not None:
+        state.committed_at = time.time()
+
+
+def _parse_wrote_at(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def request_wrote_at(scope) -> Optional[float]:
+    """
+    The client's last write time from its cookie or WROTE_AT_HEADER, the
+    later one when it sends both.
+    """
+    marks = []
+    header = WROTE_AT_HEADER.lower().encode("latin-1")
+    for name, value in scope["headers"]:
+        if name == header:
+            marks.append(_parse_wrote_at(value.decode("latin-1")))
+        elif name == b"cookie":
+            morsel = SimpleCookie(value.decode("latin-1")).get(WROTE_AT_COOKIE)
+            if morsel is not None:
+                marks.append(_parse_wrote_at(morsel.value))
+    return max((mark for mark in marks if mark is not None), default=None)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware: a request that committed a write hands the client
+    the write time, as a short-lived cookie and as WROTE_AT_HEADER, so its
+    next reads avoid replicas that have not replayed that write yet.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        state = RoutingState(request_wrote_at(scope))
+        token = _routing_state.set(state)
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start" and state.committed_at is not None:
+                max_age = int(READ_YOUR_WRITES_WINDOW + REPLICA_MAX_LAG) + 1
+                wrote_at = f"{state.committed_at:.3f}"
+                cookie = f"{WROTE_AT_COOKIE}={wrote_at}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                    (WROTE_AT_HEADER.lower().encode("latin-1"), wrote_at.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            _routing_state.reset(token)
@@ -1,27 +1,35 @@
-import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
-from sqlmodel import SQLModel, create_engine, Session, select
-from sqlalchemy import func
+from fastapi.responses import PlainTextResponse
 from app.api.task.task_model import Task
 from app.api.status.status_model import Status
 from app.api.category.category_model import Category
-from app.api.task.task_router import task_router
+from app.api.task.task_router import task_archiver, task_router
 from app.api.status.status_router import status_router
 from app.api.category.category_router import category_router
-from app.database_init import create_initial_if_missing, run_migrations
-from pydantic import BaseModel
-from datetime import datetime
-from app.database import engine
+from app.database_init import SCHEMA_ON_STARTUP, prepare_database
+from app.database import engine, read_replicas, serving_engines
+from app.admission import ADMISSION_CONTROL, AdmissionMiddleware, pool_capacity
+from app.database_replicas import WROTE_AT_HEADER, ReadYourWritesMiddleware
+from app.crud.crud_cache import cache_stats
+from app.crud.crud_search_plan import search_plan_stats
+from app.crud.crud_single_flight import single_flight_stats
+from app.metrics import MetricsMiddleware, render_metrics
+from app.crud.crud_change_feed import change_feed
+from app.crud.crud_change_router import change_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    run_migrations()
-    SQLModel.metadata.create_all(engine)  # if you still want this
-    create_initial_if_missing(engine)
+    if SCHEMA_ON_STARTUP:
+        prepare_database(engine)
+    await read_replicas.start()
+    await change_feed.start()
+    await task_archiver.start()
     yield
+    await task_archiver.stop()
+    await change_feed.stop()
+    await read_replicas.stop()
 
 app = FastAPI(
     lifespan=lifespan,
@@ -30,16 +38,39 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+# inside CORS and metrics, so 503s carry CORS headers and are counted
+if ADMISSION_CONTROL:
+    app.add_middleware(AdmissionMiddleware, capacity=pool_capacity(serving_engines()))
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # read back by the frontend, which sends no cookies cross-origin
+    expose_headers=[WROTE_AT_HEADER],
 )
 
+app.add_middleware(MetricsMiddleware)
+if read_replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 app.include_router(task_router)
 app.include_router(status_router)
 app.include_router(category_router)
+app.include_router(change_router)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/replicas/stats")
+def get_replica_stats():
+    return read_replicas.stats()
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    return {**cache_stats(), **search_plan_stats(), **single_flight_stats()}
 
 # class TaskIn(BaseModel):
 #     title: str
@@ -157,20 +188,6 @@ app.include_router(category_router)
 #         s.refresh(task)
 #         return task
 
-# @app.post("/tasks/reorder")
-# def reorder_tasks(moves: list[dict]):
-#     """Moves is a list of {id, status_id, priority}. Priorities are 0-based within each status."""
-#     with Session(engine) as s:
-#         # update statuses and positions
-#         for m in moves:
-#             task = s.get(Task, int(m["id"]))
-#             if task:
-#                 task.status_id = int(m["status_id"]) if m.get("status_id") is not None else None
-#                 task.priority = int(m["priority"]) if m.get("priority") is not None else 0
-#                 s.add(task)
-#         s.commit()
-#         return {"ok": True}
-
 # @app.delete("/tasks/{task_id}")
 # def delete_task(task_id: int):
 #     with Session(engine) as s:
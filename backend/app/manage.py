@@ -0,0 +1,78 @@
+"""
+Schema and seed data management, run once per deploy instead of in every worker.
+
+    python -m app.manage init       # migrate + seed (what the app does with SCHEMA_ON_STARTUP=1)
+    python -m app.manage migrate    # alembic upgrade head
+    python -m app.manage seed       # default statuses if there are none
+    python -m app.manage check      # exit 1 unless the schema is at head
+    python -m app.manage export tasks.csv   # every task to a file, "-" for stdout; .arrow for Arrow IPC
+    python -m app.manage import tasks.csv   # COPY tasks in, validated like POST /task; "-" for stdin
+    python -m app.manage archive    # move completed tasks to task_archive now, e.g. from cron
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from app.database import engine
+from app.database_init import create_initial_if_missing, prepare_database, run_migrations, schema_is_current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["init", "migrate", "seed", "check", "export", "import", "archive"])
+    parser.add_argument("path", nargs="?", default="-", help="export/import file, - for stdout/stdin")
+    parser.add_argument("--format", choices=["csv", "arrow"], help="export/import format, by default from the file extension")
+    args = parser.parse_args()
+
+    if args.command == "init":
+        prepare_database(engine, strict=True)
+    elif args.command == "migrate":
+        run_migrations(strict=True)
+    elif args.command == "seed":
+        create_initial_if_missing(engine)
+    elif args.command == "check":
+        with engine.connect() as connection:
+            current = schema_is_current(connection)
+        print("schema is at head" if current else "schema is behind, run: python -m app.manage migrate")
+        sys.exit(0 if current else 1)
+    elif args.command in ("export", "import"):
+        transfer(args.command, args.path, args.format or transfer_format(args.path))
+    elif args.command == "archive":
+        from app.api.task.task_archive import archive_completed
+        from app.api.task.task_service import TaskService
+        print(f"archived {archive_completed(TaskService())} tasks")
+
+
+def transfer_format(path: str) -> str:
+    return "arrow" if Path(path).suffix in (".arrow", ".arrows", ".ipc") else "csv"
+
+
+def transfer(command: str, path: str, fmt: str):
+    from app.api.task.task_dtos import TaskCreateDto
+    from app.api.task.task_model import Task
+    from app.api.task.task_service import TaskService
+    from app.crud.crud_transfer import export_table, import_table, require_format
+    from app.database import SessionLocal
+
+    try:
+        require_format(fmt)
+    except (ValueError, RuntimeError) as e:
+        sys.exit(str(e))
+    # progress and rows/s go to stderr, stdout may carry the data
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    with SessionLocal() as db:
+        if command == "export":
+            with (open(path, "wb") if path != "-" else sys.stdout.buffer) as out:
+                for chunk in export_table(db, Task.__table__, fmt):
+                    out.write(chunk)
+        else:
+            with (open(path, "rb") if path != "-" else sys.stdin.buffer) as source:
+                report = import_table(db, TaskService(), TaskCreateDto, source, fmt)
+            print(json.dumps(report, default=str, indent=2))
+            sys.exit(1 if report["rejected"] else 0)
+
+
+if __name__ == "__main__":
+    main()
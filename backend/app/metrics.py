@@ -0,0 +1,297 @@
+import logging
+import os
+import random
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import Pool, QueuePool
+
+logger = logging.getLogger("uvicorn.error")
+
+# Fraction of SQL statements logged (0 = none, 1 = every one, like echo=True)
+SQL_ECHO_SAMPLE = float(os.getenv("SQL_ECHO_SAMPLE", "0"))
+# Most SQL statements one request may issue before it fails, 0 = unlimited.
+# Meant for test runs, where an N+1 regression then fails loudly.
+SQL_STATEMENT_BUDGET = int(os.getenv("SQL_STATEMENT_BUDGET", "0"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+ROW_BUCKETS = (0, 1, 10, 20, 100, 500, 1000, 10000, 100000)
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # per label set: [count per bucket (+Inf last)], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    bucket_labels = _labels(self.label_names, labels, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total[0]}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds", "Request latency until the last body byte.", ("method", "route", "status"),
+)
+request_statements = Histogram(
+    "db_statements_per_request", "SQL statements executed per request.", ("route",), COUNT_BUCKETS,
+)
+request_sql_seconds = Histogram(
+    "db_sql_seconds_per_request", "Time spent executing SQL per request.", ("route",),
+)
+request_rows = Histogram(
+    "crud_rows_returned", "Entities serialized into a response.", ("route",), ROW_BUCKETS,
+)
+sql_statements = Counter("db_statements_total", "SQL statements executed.", ("engine",))
+sql_seconds = Histogram("db_statement_duration_seconds", "SQL statement latency.", ("engine",))
+pool_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ("engine",), WAIT_BUCKETS,
+)
+pool_timeouts = Counter("db_pool_checkout_timeouts_total", "Checkouts that gave up waiting.", ("engine",))
+routed_reads = Counter("db_reads_routed_total", "Read sessions handed out, by target.", ("target", "reason"))
+
+# Callables returning extra exposition lines, e.g. replica lag gauges or
+# metrics of optional middleware
+gauge_providers: List[Callable[[], List[str]]] = []
+
+
+class StatementBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    __slots__ = ("statements", "sql_seconds", "rows", "budget")
+
+    def __init__(self, budget: int = SQL_STATEMENT_BUDGET):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.budget = budget
+
+
+# Set by MetricsMiddleware; copied into the threadpool with the rest of the context
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def statement_budget(limit: int) -> Iterator[RequestStats]:
+    """
+    Fail any statement past the `limit`-th one issued inside the block, e.g.
+
+        with statement_budget(2):
+            service.search(db, EntitySearchDto(expand=["status", "category"]))
+    """
+    stats = RequestStats(budget=limit)
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """
+    The statement counts of the request being served, None outside
+    MetricsMiddleware. Statements run later in the request still add to it.
+    """
+    return _request_stats.get()
+
+
+def record_rows(count: int) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.rows += count
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware, so streamed responses are timed until their last
+    chunk. Requests are labelled by route template to bound cardinality.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        start = perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_seconds.observe(perf_counter() - start, scope["method"], route, str(status_code))
+            request_statements.observe(stats.statements, route)
+            request_sql_seconds.observe(stats.sql_seconds, route)
+            if stats.rows:
+                request_rows.observe(stats.rows, route)
+
+
+class InstrumentedPoolMixin:
+    """
+    Times how long `connect()` waits for a connection. Pools have no event
+    before checkout, so the wait is measured around QueuePool._do_get.
+    """
+    metrics_name = "primary"
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc(self.metrics_name)
+            raise
+        finally:
+            pool_wait_seconds.observe(perf_counter() - start, self.metrics_name)
+
+
+def instrumented_pool_class(url: str, name: str) -> Type[Pool]:
+    """
+    The pool class SQLAlchemy would pick for `url`, wrapped to time checkouts.
+    Non-queue pools (in-memory SQLite) never wait and are returned as is.
+    """
+    url = make_url(url)
+    base = url.get_dialect().get_pool_class(url)
+    if not issubclass(base, QueuePool):
+        return base
+    return type(f"Instrumented{base.__name__}", (InstrumentedPoolMixin, base), {"metrics_name": name})
+
+
+_engines: Dict[str, Engine] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Count and time every statement, attribute it to the current request,
+    and log a sample of them instead of echoing all.
+    """
+    _engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _request_stats.get()
+        if stats is not None and stats.budget and stats.statements >= stats.budget:
+            raise StatementBudgetExceeded(
+                f"Statement budget of {stats.budget} exceeded, an N+1 lazy load? Next statement: {statement}"
+            )
+        conn.info.setdefault("query_start", []).append(perf_counter())
+        if SQL_ECHO_SAMPLE and random.random() < SQL_ECHO_SAMPLE:
+            logger.info("SQL [%s] %s %r", name, statement, parameters)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _statement_done(conn, name)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            _statement_done(exception_context.connection, name)
+
+
+def _statement_done(conn, name: str) -> None:
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = perf_counter() - starts.pop()
+    sql_statements.inc(name)
+    sql_seconds.observe(elapsed, name)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_seconds += elapsed
+
+
+def _pool_gauges() -> List[str]:
+    gauges = {
+        "db_pool_size": ("Configured pool size.", lambda pool: pool.size()),
+        "db_pool_checked_out": ("Connections currently checked out.", lambda pool: pool.checkedout()),
+        "db_pool_overflow": ("Connections open beyond the pool size.", lambda pool: max(pool.overflow(), 0)),
+        "db_pool_saturation": (
+            "Checked out connections over the most the pool will open.",
+            lambda pool: pool.checkedout() / max(pool.size() + max(getattr(pool, "_max_overflow", 0), 0), 1),
+        ),
+    }
+    lines = []
+    for metric, (help, read) in gauges.items():
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} gauge"]
+        for name, engine in sorted(_engines.items()):
+            if isinstance(engine.pool, QueuePool):
+                lines.append(f'{metric}{{engine="{name}"}} {read(engine.pool)}')
+    return lines
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in (
+        http_request_seconds, request_statements, request_sql_seconds, request_rows,
+        sql_statements, sql_seconds, pool_wait_seconds, pool_timeouts, routed_reads,
+    ):
+        lines.extend(metric.render())
+    lines.extend(_pool_gauges())
+    for provider in gauge_providers:
+        lines.extend(provider())
+    return "\n".join(lines) + "\n"
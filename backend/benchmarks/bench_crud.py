@@ -0,0 +1,185 @@
+"""
+Drive every BaseCrudRouter route of /task at set concurrency levels.
+
+Seed first with `python -m benchmarks.seed`. By default the app is mounted
+in-process through httpx's ASGI transport; pass --base-url to load a running
+server instead. Results (p50/p99 latency, throughput) are JSON tagged with the
+git revision, compare two runs with `python -m benchmarks.compare`.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_crud --concurrency 1,16,64 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import httpx
+
+from app.crud.crud_search_utils import encode_cursor
+from benchmarks.bench_utils import git_revision, latency_summary
+from benchmarks.seed import VOCABULARY
+
+SCENARIOS = (
+    "search",
+    "search_filter",
+    "search_deep_offset",
+    "search_deep_cursor",
+    "get",
+    "all",
+    "create",
+    "update",
+    "delete",
+)
+PAGE_SIZE = 20
+
+
+class Workload:
+    """
+    Deterministic request generator for one run over the seeded dataset.
+    Tasks made by `create` are the ones `delete` removes, so the dataset
+    keeps its size between runs.
+    """
+    def __init__(self, total: int, min_id: int, max_id: int, status_ids: List[int], seed: int):
+        self.total = total
+        self.min_id = min_id
+        self.max_id = max_id
+        self.status_ids = status_ids
+        self.rng = random.Random(seed)
+        self.created: List[int] = []
+
+    def random_id(self) -> int:
+        return self.rng.randint(self.min_id, self.max_id)
+
+    def request(self, scenario: str, i: int) -> Optional[dict]:
+        if scenario == "search":
+            return {"method": "POST", "url": "/task/search", "json": {"pageSize": PAGE_SIZE}}
+        if scenario == "search_filter":
+            body = {"pageSize": PAGE_SIZE, "globalFilter": VOCABULARY[i % len(VOCABULARY)]}
+            return {"method": "POST", "url": "/task/search", "json": body}
+        if scenario == "search_deep_offset":
+            body = {"pageSize": PAGE_SIZE, "pageNo": max(self.total // PAGE_SIZE - 1, 1)}
+            return {"method": "POST", "url": "/task/search", "json": body}
+        if scenario == "search_deep_cursor":
+            deep_id = self.min_id + (self.max_id - self.min_id) * 9 // 10
+            body = {"pageSize": PAGE_SIZE, "cursor": encode_cursor("id", deep_id, deep_id), "countStrategy": "none"}
+            return {"method": "POST", "url": "/task/search", "json": body}
+        if scenario == "get":
+            return {"method": "GET", "url": f"/task/{self.random_id()}"}
+        if scenario == "all":
+            return {"method": "GET", "url": "/task/all?format=ndjson"}
+        if scenario == "create":
+            body = {
+                "title": f"Benchmark task {i}",
+                "description": "created by bench_crud",
+                "status_id": self.status_ids[i % len(self.status_ids)],
+                "priority": float(i),
+            }
+            return {"method": "POST", "url": "/task/", "json": body, "expect": 201}
+        if scenario == "update":
+            return {"method": "PUT", "url": f"/task/{self.random_id()}", "json": {"title": f"Updated {i}"}}
+        if scenario == "delete":
+            if not self.created:
+                return None
+            return {"method": "DELETE", "url": f"/task/{self.created.pop()}", "expect": 204}
+        raise ValueError(f"Unknown scenario {scenario}")
+
+
+async def discover(client: httpx.AsyncClient) -> dict:
+    """
+    Dataset shape through the API itself, so it works against any server.
+    """
+    first = (await client.post("/task/search", json={"pageSize": 1, "countStrategy": "exact"})).json()
+    last = (await client.post("/task/search", json={"pageSize": 1, "ascending": False, "countStrategy": "none"})).json()
+    statuses = (await client.get("/status/all")).json()
+    if not first["items"] or not statuses:
+        raise SystemExit("No tasks or statuses, run `python -m benchmarks.seed` first")
+    return {
+        "total": first["pageCount"],
+        "min_id": first["items"][0]["id"],
+        "max_id": last["items"][0]["id"],
+        "status_ids": [status["id"] for status in statuses],
+    }
+
+
+async def drive(client: httpx.AsyncClient, workload: Workload, scenario: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(i: int):
+        nonlocal failures
+        request = workload.request(scenario, i)
+        if request is None:
+            return
+        expect = request.pop("expect", 200)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(**request)
+            latencies.append(time.perf_counter() - started)
+        if response.status_code != expect:
+            failures += 1
+        elif scenario == "create":
+            workload.created.append(response.json()["id"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latency_summary(latencies, time.perf_counter() - started, failures)
+
+
+def make_client(base_url: Optional[str]) -> httpx.AsyncClient:
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=300)
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", default="1,16,64", help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=500, help="per scenario and level")
+    parser.add_argument("--all-requests", type=int, default=3, help="for /all, which returns every row")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    scenarios = [scenario for scenario in args.scenarios.split(",") if scenario]
+    results = []
+    async with make_client(args.base_url) as client:
+        shape = await discover(client)
+        workload = Workload(shape["total"], shape["min_id"], shape["max_id"], shape["status_ids"], args.seed)
+        for concurrency in levels:
+            for scenario in scenarios:
+                requests = args.all_requests if scenario == "all" else args.requests
+                # warm up pools, caches and compiled statements
+                await drive(client, workload, scenario, min(args.warmup, requests), min(concurrency, 4))
+                summary = await drive(client, workload, scenario, requests, concurrency)
+                results.append({"scenario": scenario, "concurrency": concurrency, **summary})
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "target": args.base_url or "in-process",
+            "python": platform.python_version(),
+            "dataset": {"tasks": shape["total"], "statuses": len(shape["status_ids"])},
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
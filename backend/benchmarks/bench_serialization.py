@@ -0,0 +1,76 @@
+"""
+Rows per second of FastAPI's default jsonable_encoder path versus EntitySerializer.
+
+No database needed: rows are transient ORM instances and Core-style Row tuples.
+
+    python -m benchmarks.bench_serialization --rows 20000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.category.category_model import Category  # noqa: F401 (relationship targets)
+from app.api.status.status_model import Status  # noqa: F401
+from app.api.task.task_dtos import TaskResponseDto
+from app.api.task.task_model import Task
+from app.crud.crud_serializer import EntitySerializer
+
+
+def make_tasks(count: int):
+    now = datetime(2026, 1, 1)
+    return [
+        Task(
+            id=i,
+            title=f"Task {i}",
+            description=f"Description of task {i}",
+            due_date=now + timedelta(days=i % 30),
+            created_at=now,
+            priority=float(i),
+            status_id=1 + i % 3,
+            category_id=1 + i % 5,
+        )
+        for i in range(count)
+    ]
+
+
+def make_rows(tasks):
+    # Row objects as returned by select(Task.__table__) on a Core connection
+    from sqlalchemy.engine.result import result_tuple
+    columns = [column.key for column in Task.__table__.columns]
+    make_row = result_tuple(columns)
+    return [make_row([getattr(task, column) for column in columns]) for task in tasks]
+
+
+def measure(label: str, fn, rows: int, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return {"case": label, "rows": rows, "seconds": round(best, 4), "rows_per_second": round(rows / best)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.rows)
+    rows = make_rows(tasks)
+    serializer = EntitySerializer(TaskResponseDto)
+
+    results = [
+        # what FastAPI does for a route without response_model returning ORM objects
+        measure("jsonable_encoder+json.dumps (orm)", lambda: json.dumps(jsonable_encoder(tasks)).encode(), args.rows, args.repeat),
+        measure("EntitySerializer.dump_many (orm)", lambda: serializer.dump_many(tasks), args.rows, args.repeat),
+        measure("EntitySerializer.dump_many (row)", lambda: serializer.dump_many(rows), args.rows, args.repeat),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
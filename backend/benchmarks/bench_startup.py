@@ -0,0 +1,103 @@
+"""
+Measure cold start: `import app.main` time and process start to first response.
+
+Each sample is a fresh interpreter, once with schema work in the lifespan
+(SCHEMA_ON_STARTUP=1, the old default) and once with the lean boot path
+(SCHEMA_ON_STARTUP=0, after `python -m app.manage init`).
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_startup --repeat 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_seconds(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def first_response_seconds(env: dict, path: str, timeout: float) -> float:
+    """
+    Start uvicorn and poll `path` until it answers 200.
+    """
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while time.perf_counter() - started < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {server.returncode} before answering")
+                try:
+                    if client.get(path).status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        raise TimeoutError(f"no 200 from {path} within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summarize(samples) -> dict:
+    return {
+        "min": round(min(samples), 4),
+        "median": round(statistics.median(samples), 4),
+        "max": round(max(samples), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--path", default="/status/all")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--no-init", action="store_true", help="database is already migrated and seeded")
+    args = parser.parse_args()
+
+    if not args.no_init:
+        # make sure the lean runs start from a migrated, seeded database
+        subprocess.run([sys.executable, "-m", "app.manage", "init"], cwd=BACKEND_DIR, check=True)
+
+    results = {}
+    for name, schema_on_startup in (("schema_on_startup", "1"), ("lean", "0")):
+        env = {**os.environ, "SCHEMA_ON_STARTUP": schema_on_startup}
+        imports = [import_seconds(env) for _ in range(args.repeat)]
+        first_responses = [first_response_seconds(env, args.path, args.timeout) for _ in range(args.repeat)]
+        results[name] = {
+            "import_seconds": summarize(imports),
+            "first_response_seconds": summarize(first_responses),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
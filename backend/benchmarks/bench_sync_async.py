@@ -0,0 +1,83 @@
+"""
+Compare throughput of the sync (thread pool) and asyncio CRUD routes.
+
+Both variants of the task router are mounted in-process and driven through
+httpx's ASGI transport, so the numbers reflect handler + database cost only.
+Neither service has a cache, or most requests would never reach the database.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_sync_async --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.category.category_model import Category  # noqa: F401 (relationship targets)
+from app.api.status.status_model import Status  # noqa: F401
+from app.api.task.task_dtos import TaskCreateDto, TaskResponseDto, TaskUpdateDto
+from app.api.task.task_model import Task
+from app.crud.crud_async_service import AsyncBaseCrudService
+from app.crud.crud_service import BaseCrudService
+from app.crud.crud_router import BaseCrudRouter
+from app.database import async_engine, get_async_database, get_database
+from benchmarks.bench_utils import latency_summary
+
+
+def build_app(use_async: bool) -> FastAPI:
+    app = FastAPI()
+    service_class = AsyncBaseCrudService if use_async else BaseCrudService
+    app.include_router(BaseCrudRouter[Task, TaskCreateDto, TaskUpdateDto](
+        service=service_class(Task, TaskResponseDto),
+        create_model=TaskCreateDto,
+        update_model=TaskUpdateDto,
+        get_database=get_async_database if use_async else get_database,
+        prefix="/task",
+    ).router)
+    return app
+
+
+async def drive(app: FastAPI, requests: int, concurrency: int, body: dict) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/task/search", json=body)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return {"concurrency": concurrency, **latency_summary(latencies, elapsed, failures)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--global-filter", default="")
+    args = parser.parse_args()
+
+    body = {"pageSize": 20, "globalFilter": args.global_filter}
+    results = {}
+    for name, use_async in (("sync", False), ("async", True)):
+        app = build_app(use_async)
+        # warm up pools and compiled statement caches
+        await drive(app, min(args.requests, 50), 10, body)
+        results[name] = await drive(app, args.requests, args.concurrency, body)
+    await async_engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
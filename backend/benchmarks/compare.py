@@ -0,0 +1,58 @@
+"""
+Compare two bench_crud reports scenario by scenario.
+
+Prints p50/p99/throughput of both runs and their ratio; with --fail-above the
+exit code is 1 when any p99 grew by more than that factor.
+
+    python -m benchmarks.compare before.json after.json --fail-above 1.2
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def ratio(before, after):
+    if not before or after is None:
+        return None
+    return round(after / before, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--fail-above", type=float, help="p99 ratio counted as a regression")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    baseline = {(row["scenario"], row["concurrency"]): row for row in before["results"]}
+    print(f"{before['meta']['revision']} -> {after['meta']['revision']}")
+    print(f"{'scenario':<22}{'conc':>6}{'p50 ms':>18}{'p99 ms':>18}{'rps':>18}{'p99 x':>8}")
+    regressions = []
+    for row in after["results"]:
+        key = (row["scenario"], row["concurrency"])
+        old = baseline.get(key)
+        if old is None:
+            continue
+        p99_ratio = ratio(old["p99_ms"], row["p99_ms"])
+        print(
+            f"{row['scenario']:<22}{row['concurrency']:>6}"
+            f"{old['p50_ms']:>9}{row['p50_ms']:>9}"
+            f"{old['p99_ms']:>9}{row['p99_ms']:>9}"
+            f"{old['throughput_rps']:>9}{row['throughput_rps']:>9}"
+            f"{p99_ratio if p99_ratio is not None else '-':>8}"
+        )
+        if args.fail_above and p99_ratio is not None and p99_ratio > args.fail_above:
+            regressions.append(key)
+    if regressions:
+        print(f"p99 regressed more than {args.fail_above}x: {regressions}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Seed a reproducible benchmark dataset of tasks across statuses and categories.
+
+Every value is a function of the row number, so the same arguments give the
+same data on Postgres and SQLite and across runs. Postgres rows are generated
+server-side with generate_series; elsewhere they are inserted in batches.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.seed --tasks 1000000 --reset
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+
+from app.api.category.category_model import Category
+from app.api.status.status_model import Status
+from app.api.task.task_model import Task
+from app.database import BaseDataModel, engine
+from app.database_init import prepare_database
+
+# globalFilter terms of the benchmark hit a known share of rows
+VOCABULARY = (
+    "backend", "frontend", "database", "migration", "invoice", "billing", "search",
+    "report", "onboarding", "refactor", "security", "release", "metrics", "export",
+    "mobile", "payment", "cache", "deploy", "review", "design",
+)
+BASE_DATE = datetime(2026, 1, 1)
+BATCH_SIZE = 10000
+
+
+def task_row(n: int, status_ids, category_ids) -> dict:
+    """
+    Row `n` (1-based) of the dataset, mirrored by the SQL in seed_tasks_postgres.
+    """
+    words = len(VOCABULARY)
+    return {
+        "title": f"Task {n} {VOCABULARY[n % words]}",
+        "description": f"{VOCABULARY[(n * 7) % words]} {VOCABULARY[(n * 13) % words]} item {n}",
+        "due_date": None if n % 4 == 0 else BASE_DATE + timedelta(days=n % 90),
+        "created_at": BASE_DATE + timedelta(minutes=n),
+        "priority": float(n * 1024),
+        "status_id": status_ids[n % len(status_ids)],
+        "category_id": None if n % 10 == 0 else category_ids[n % len(category_ids)],
+    }
+
+
+def seed_tasks_postgres(connection, tasks: int, status_ids, category_ids) -> None:
+    words = len(VOCABULARY)
+    connection.execute(
+        text(f"""
+            INSERT INTO task (title, description, due_date, created_at, priority, status_id, category_id)
+            SELECT
+                'Task ' || n || ' ' || (:vocabulary)[n % {words} + 1],
+                (:vocabulary)[(n * 7) % {words} + 1] || ' ' || (:vocabulary)[(n * 13) % {words} + 1] || ' item ' || n,
+                CASE WHEN n % 4 = 0 THEN NULL ELSE :base_date + make_interval(days => (n % 90)::int) END,
+                :base_date + make_interval(mins => n::int),
+                n * 1024.0,
+                (:status_ids)[n % :status_count + 1],
+                CASE WHEN n % 10 = 0 THEN NULL ELSE (:category_ids)[n % :category_count + 1] END
+            FROM generate_series(1, :tasks) AS n
+        """),
+        {
+            "vocabulary": list(VOCABULARY),
+            "base_date": BASE_DATE,
+            "status_ids": list(status_ids),
+            "status_count": len(status_ids),
+            "category_ids": list(category_ids),
+            "category_count": len(category_ids),
+            "tasks": tasks,
+        },
+    )
+
+
+def seed(tasks: int, statuses: int, categories: int, reset: bool) -> dict:
+    if engine.dialect.name == "postgresql":
+        prepare_database(engine, strict=True)
+    else:
+        BaseDataModel.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        if reset:
+            if engine.dialect.name == "postgresql":
+                connection.execute(text("TRUNCATE task, status, category RESTART IDENTITY"))
+            else:
+                for model in (Task, Status, Category):
+                    connection.execute(delete(model))
+        # a handful of rows, one INSERT each keeps their ids in order
+        status_ids = [
+            connection.scalar(insert(Status).values(name=f"Status {i}", order=i).returning(Status.id))
+            for i in range(statuses)
+        ]
+        category_ids = [
+            connection.scalar(insert(Category).values(name=f"Category {i}").returning(Category.id))
+            for i in range(categories)
+        ]
+        if engine.dialect.name == "postgresql":
+            # one NOTIFY per seeded row would flood the change feed listeners
+            connection.execute(text("ALTER TABLE task DISABLE TRIGGER task_notify_change"))
+            seed_tasks_postgres(connection, tasks, status_ids, category_ids)
+            connection.execute(text("ALTER TABLE task ENABLE TRIGGER task_notify_change"))
+        else:
+            for start in range(1, tasks + 1, BATCH_SIZE):
+                connection.execute(
+                    insert(Task),
+                    [task_row(n, status_ids, category_ids) for n in range(start, min(start + BATCH_SIZE, tasks + 1))],
+                )
+    if engine.dialect.name == "postgresql":
+        # fresh statistics, or the first benchmark runs plan against an empty table
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE task, status, category"))
+
+    with engine.connect() as connection:
+        total = connection.scalar(select(func.count()).select_from(Task))
+    return {"tasks": total, "statuses": statuses, "categories": categories, "seconds": round(time.perf_counter() - started, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--statuses", type=int, default=5)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--reset", action="store_true", help="empty task, status and category first")
+    args = parser.parse_args()
+    print(json.dumps(seed(args.tasks, args.statuses, args.categories, args.reset), indent=2))
+
+
+if __name__ == "__main__":
+    main()
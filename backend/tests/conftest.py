@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+
+# configure the app before it is imported: a throwaway SQLite database
+# (created below, migrations are Postgres-only) and no replicas
+_database_path = os.path.join(tempfile.mkdtemp(prefix="fastapi-todo-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_path}"
+os.environ["SCHEMA_ON_STARTUP"] = "0"
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+os.environ.pop("CACHE_URL", None)
+os.environ.pop("USE_ASYNC_DATABASE", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from app.database import BaseDataModel, SessionLocal, engine
+from app.crud.crud_cache import cache_registry
+from app.crud.crud_search_count import count_cache
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def empty_database():
+    BaseDataModel.metadata.drop_all(engine)
+    BaseDataModel.metadata.create_all(engine)
+    # cached rows of the previous test's tables
+    for cache in cache_registry.values():
+        cache.clear()
+    count_cache.clear()
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def seed(client):
+    """
+    Two statuses, one category and `count` tasks; every third task has no
+    due date. Returns the created tasks as JSON.
+    """
+    def seed_tasks(count: int = 30):
+        client.post("/status/", json={"name": "Todo", "order": 0})
+        client.post("/status/", json={"name": "Done", "order": 1})
+        client.post("/category/", json={"name": "Feature"})
+        tasks = []
+        for i in range(count):
+            response = client.post("/task/", json={
+                "title": f"task {i}",
+                "description": f"description {i % 5}",
+                "due_date": None if i % 3 == 0 else f"2026-01-{1 + i % 7:02d}T00:00:00",
+                "status_id": 1 + i % 2,
+                "category_id": 1,
+                "priority": i % 7,
+            })
+            assert response.status_code == 201, response.text
+            tasks.append(response.json())
+        return tasks
+
+    return seed_tasks
+
+
+@pytest.fixture
+def search_tasks(client):
+    def search(**body):
+        response = client.post("/task/search", json=body)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return search
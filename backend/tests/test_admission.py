@@ -0,0 +1,74 @@
+import asyncio
+import random
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool, StaticPool
+from app.admission import READ, WRITE, AdmissionController, pool_capacity
+
+
+def controller(limit: int = 15) -> AdmissionController:
+    return AdmissionController(limit=limit, min_limit=2, max_limit=limit, queue_size=4 * limit)
+
+
+def serve(admission, requests, concurrency, seconds, priority=READ, route="/task/search", timed=True, failed=False):
+    """
+    `concurrency` clients sending `requests` in all, each request taking
+    `seconds()`; admission holds them back as it would in the middleware.
+    """
+    async def client():
+        for _ in range(requests // concurrency):
+            key, shed = await admission.acquire(route, priority)
+            assert shed is None
+            await asyncio.sleep(0)
+            admission.release(key, seconds(), failed, timed)
+
+    async def run():
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    asyncio.run(run())
+
+
+def two_speed(seed):
+    # cache misses among otherwise fast reads
+    rng = random.Random(seed)
+    return lambda: 0.0004 if rng.random() < 0.7 else 0.004
+
+
+def test_limit_is_sized_from_the_connection_pools():
+    pooled = create_engine("sqlite://", poolclass=QueuePool, pool_size=5, max_overflow=10)
+    single = create_engine("sqlite://", poolclass=StaticPool)
+    assert pool_capacity([pooled]) == 15
+    assert pool_capacity([pooled, single]) == 16
+
+
+def test_limit_holds_without_overload():
+    admission = controller()
+    serve(admission, 400, 1, two_speed(1))
+    assert admission.limit == 15
+
+
+def test_limit_holds_at_full_demand_with_usual_latency():
+    admission = controller()
+    serve(admission, 2000, 40, two_speed(2))
+    assert admission.limit == 15
+
+
+def test_limit_shrinks_when_requests_slow_down_under_load():
+    admission = controller()
+    serve(admission, 400, 40, lambda: 0.002, priority=WRITE, route="/task")
+    assert admission.limit == 15
+    serve(admission, 160, 40, lambda: 0.05, priority=WRITE, route="/task")
+    assert admission.limit < 10
+
+
+def test_untimed_runs_stay_out_of_the_baseline():
+    # 304s and cache hits first, then database reads at their usual speed
+    admission = controller()
+    serve(admission, 400, 40, lambda: 0.0002, timed=False)
+    serve(admission, 400, 40, lambda: 0.004)
+    assert admission.limit == 15
+
+
+def test_failures_under_load_shrink_the_limit():
+    admission = controller()
+    serve(admission, 400, 40, lambda: 0.01, priority=WRITE, route="/task", failed=True)
+    assert admission.limit < 15
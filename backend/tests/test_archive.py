@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, text
+from app.api.task.task_archive import archive_completed
+from app.api.task.task_model import Task
+from app.api.task.task_router import task_service
+
+
+def age_tasks(db, days, column="created_at"):
+    db.execute(text(f"UPDATE task SET {column} = :at"), {"at": datetime.utcnow() - timedelta(days=days)})
+    db.commit()
+
+
+def task_ids(search_tasks, **body):
+    return sorted(task["id"] for task in search_tasks(pageSize=20, **body)["items"])
+
+
+def test_old_task_moved_to_done_today_is_kept(client, db, search_tasks):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    client.post("/status/", json={"name": "Done", "order": 1})
+    for i in range(3):
+        client.post("/task/", json={"title": f"task {i}", "status_id": 1, "priority": i})
+    age_tasks(db, 40)
+    age_tasks(db, 40, "status_changed_at")
+
+    # done today, each through a different write path
+    assert client.put("/task/1", json={"status_id": 2}).status_code == 200
+    assert client.put("/task/bulk", json=[{"id": 2, "data": {"status_id": 2}}]).status_code == 200
+    assert client.post("/task/3/reorder", json={"status_id": 2}).status_code == 200
+
+    assert archive_completed(task_service) == 0
+    assert task_ids(search_tasks) == [1, 2, 3]
+
+
+def test_tasks_done_for_long_are_archived(client, db, search_tasks, seed):
+    seed(10)
+    age_tasks(db, 40, "status_changed_at")
+    # created long ago, only just done
+    client.put("/task/1", json={"status_id": 2})
+
+    moved = archive_completed(task_service)
+
+    done_long_ago = [2, 4, 6, 8, 10]
+    assert moved == len(done_long_ago)
+    assert task_ids(search_tasks) == [1, 3, 5, 7, 9]
+    assert task_ids(search_tasks, includeArchived=True) == list(range(1, 11))
+
+
+def test_status_change_restarts_the_clock(client, db):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    client.post("/status/", json={"name": "Done", "order": 1})
+    client.post("/task/", json={"title": "task", "status_id": 2, "priority": 0})
+    age_tasks(db, 40, "status_changed_at")
+
+    # an unrelated edit keeps it, a status change resets it
+    client.put("/task/1", json={"title": "renamed"})
+    assert db.scalar(select(Task.status_changed_at)) < datetime.utcnow() - timedelta(days=30)
+    client.put("/task/1", json={"status_id": 1})
+    client.put("/task/1", json={"status_id": 2})
+    assert archive_completed(task_service) == 0
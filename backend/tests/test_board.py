@@ -0,0 +1,53 @@
+def board(client, **params):
+    response = client.get("/task/board", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def column_order(tasks, status_id):
+    # the board's order: priority, then id
+    column = [task for task in tasks if task["status_id"] == status_id]
+    return [task["id"] for task in sorted(column, key=lambda task: (task["priority"], task["id"]))]
+
+
+def test_first_page_of_every_column(client, seed):
+    tasks = seed(30)
+    result = board(client, limit=4)
+
+    assert result["limit"] == 4
+    assert [column["status_id"] for column in result["columns"]] == [1, 2]
+    for column in result["columns"]:
+        assert column["total"] == 15
+        assert [task["id"] for task in column["items"]] == column_order(tasks, column["status_id"])[:4]
+        assert column["hasNext"] and column["nextCursor"]
+
+
+def test_cursor_pages_through_one_column(client, seed):
+    tasks = seed(30)
+    first = board(client, limit=4, status_id=2)["columns"][0]
+    ids, cursor, pages = [task["id"] for task in first["items"]], first["nextCursor"], 1
+    while cursor:
+        column = board(client, limit=4, status_id=2, cursor=cursor)["columns"]
+        assert len(column) == 1
+        assert column[0]["total"] == 15  # counted before the cursor
+        ids += [task["id"] for task in column[0]["items"]]
+        cursor, pages = column[0]["nextCursor"], pages + 1
+
+    assert ids == column_order(tasks, 2)
+    assert pages == 4
+
+
+def test_requested_empty_column_is_returned(client, seed):
+    seed(6)
+    columns = board(client, limit=4, status_id=[1, 3])["columns"]
+    assert [column["status_id"] for column in columns] == [1, 3]
+    assert columns[1] == {"status_id": 3, "total": 0, "items": [], "hasNext": False, "nextCursor": None}
+
+
+def test_cursor_needs_exactly_one_column(client, seed):
+    seed(10)
+    cursor = board(client, limit=2, status_id=1)["columns"][0]["nextCursor"]
+
+    assert client.get("/task/board", params={"cursor": cursor}).status_code == 400
+    assert client.get("/task/board", params={"cursor": cursor, "status_id": [1, 2]}).status_code == 400
+    assert client.get("/task/board", params={"cursor": "garbage", "status_id": 1}).status_code == 400
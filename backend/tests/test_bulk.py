@@ -0,0 +1,51 @@
+from app.api.status.status_router import status_service
+
+
+def test_bulk_create_keeps_the_valid_items(client):
+    response = client.post("/status/bulk", json=[
+        {"name": "Todo", "order": 0},
+        {"name": 5, "order": "first"},
+        {"name": "Done", "order": 1},
+    ])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [item["name"] for item in body["items"]] == ["Todo", "Done"]
+    assert [error["index"] for error in body["errors"]] == [1]
+    assert [status["name"] for status in client.get("/status/all").json()] == ["Todo", "Done"]
+
+
+def test_bulk_create_isolates_rows_the_database_rejects(db):
+    result = status_service.bulk_create(db, [
+        (0, {"name": "Todo", "order": 0}),
+        (1, {"name": None, "order": 1}),  # NOT NULL fails the whole batch, the retry only this row
+        (2, {"name": "Done", "order": 2}),
+    ])
+    assert [status.name for status in result["items"]] == ["Todo", "Done"]
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert "NOT NULL" in result["errors"][0]["detail"]
+    assert [status["name"] for status in status_service.get_all(db)] == ["Todo", "Done"]
+
+
+def test_bulk_update_reports_missing_and_invalid_items(client):
+    client.post("/status/bulk", json=[{"name": "Todo", "order": 0}, {"name": "Done", "order": 1}])
+    response = client.put("/status/bulk", json=[
+        {"id": 1, "data": {"name": "Backlog"}},
+        {"id": 99, "data": {"name": "Missing"}},
+        {"id": 2, "data": {"order": "last"}},
+    ])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [item["name"] for item in body["items"]] == ["Backlog"]
+    assert [(error["index"], error["id"]) for error in body["errors"]] == [(1, 99), (2, 2)]
+    assert client.get("/status/1").json()["name"] == "Backlog"
+    assert client.get("/status/2").json()["order"] == 1
+
+
+def test_bulk_remove_reports_missing_ids(client):
+    client.post("/status/bulk", json=[{"name": "Todo", "order": 0}, {"name": "Done", "order": 1}])
+    response = client.request("DELETE", "/status/bulk", json=[2, 42])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["items"] == [2]
+    assert [(error["index"], error["id"]) for error in body["errors"]] == [(1, 42)]
+    assert [status["id"] for status in client.get("/status/all").json()] == [1]
@@ -0,0 +1,73 @@
+from sqlalchemy import text
+from app.api.status.status_router import status_service
+from app.crud.crud_cache import EntityCache, LocalCacheBackend
+from app.crud.crud_versions import version_tracker
+
+
+def test_query_stored_after_a_racing_invalidation_is_never_served():
+    cache = EntityCache("test-query-race", backend=LocalCacheBackend())
+    generation = cache.generation()  # a reader starts its query
+    cache.invalidate()  # a writer commits meanwhile
+    cache.set_query("search", "key", ["stale"], generation)
+    assert cache.get_query("search", "key", cache.generation()) is None
+
+
+def test_entity_stored_after_a_racing_invalidation_is_dropped():
+    cache = EntityCache("test-entity-race", backend=LocalCacheBackend())
+    generation = cache.generation()
+    cache.invalidate([1])
+    cache.set_entity(1, {"id": 1, "name": "stale"}, generation)
+    assert cache.get_entity(1) is None
+
+
+def test_get_racing_an_update_does_not_cache_the_old_row(client, db, monkeypatch):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    read_row = status_service._get_entity
+
+    def read_then_update(db, entity_id, expand=()):
+        entity = read_row(db, entity_id, expand)
+        # another request updates the row after this read, before the store
+        monkeypatch.setattr(status_service, "_get_entity", read_row)  # the update reads the row too
+        assert client.put(f"/status/{entity_id}", json={"name": "Done"}).status_code == 200
+        return entity
+
+    monkeypatch.setattr(status_service, "_get_entity", read_then_update)
+    assert status_service.get(db, 1)["name"] == "Todo"
+    monkeypatch.undo()
+
+    assert client.get("/status/1").json()["name"] == "Done"
+
+
+def test_search_racing_a_create_does_not_cache_the_old_page(client, monkeypatch):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    split_page = status_service._split_page
+
+    def split_then_create(rows, req):
+        assert client.post("/status/", json={"name": "Done", "order": 1}).status_code == 201
+        return split_page(rows, req)
+
+    monkeypatch.setattr(status_service, "_split_page", split_then_create)
+    client.post("/status/search", json={})
+    monkeypatch.undo()
+
+    assert [status["name"] for status in client.post("/status/search", json={}).json()["items"]] == ["Todo", "Done"]
+
+
+def test_body_is_never_older_than_its_etag(client, db):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    first = client.get("/status/1")
+    all_first = client.get("/status/all")
+    assert client.get("/status/1").json()["name"] == "Todo"  # served from the cache
+
+    # another process writes; its notification is not in yet, but the
+    # version this process builds ETags from has moved on
+    db.execute(text("UPDATE status SET name = 'Done' WHERE id = 1"))
+    db.commit()
+    version_tracker.invalidate("status")
+
+    for path, before in (("/status/1", first), ("/status/all", all_first)):
+        response = client.get(path, headers={"If-None-Match": before.headers["ETag"]})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != before.headers["ETag"]
+        body = response.json()
+        assert (body if isinstance(body, dict) else body[0])["name"] == "Done"
@@ -0,0 +1,69 @@
+import asyncio
+from app.api.status.status_router import status_service
+from app.crud.crud_change_feed import FEED_BULK_ROWS, ChangeFeed
+from app.crud.crud_search_count import count_cache
+from app.crud.crud_versions import version_tracker
+
+
+def drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+def test_bulk_write_is_announced_as_capped_events():
+    feed = ChangeFeed()
+
+    async def run():
+        await feed.start()
+        subscription = feed.subscribe(["task"])
+        feed.record_write("task", "create", range(1, 2 * FEED_BULK_ROWS + 1))
+        await asyncio.sleep(0)
+        return drain(subscription)
+
+    events = asyncio.run(run())
+    assert [event["id"] for event in events[:-1]] == list(range(1, FEED_BULK_ROWS + 1))
+    assert "id" not in events[-1] and events[-1]["op"] == "create"
+
+
+def test_resync_drops_subscribers_that_cannot_take_it():
+    feed = ChangeFeed(queue_size=1)
+
+    async def run():
+        full, idle = feed.subscribe(), feed.subscribe()
+        feed.publish({"table": "task", "op": "update", "id": 1})
+        drain(idle)
+        feed._broadcast_resync("reconnect")
+        assert [event.get("reason") for event in drain(idle)] == ["reconnect"]
+        feed.publish({"table": "task", "op": "update", "id": 2})
+        return full, idle
+
+    full, idle = asyncio.run(run())
+    assert full.closed and full not in feed._subscriptions
+    assert feed.dropped == 1
+    # closed subscriptions get nothing after their final resync
+    assert drain(full) == [{"type": "resync", "reason": "reconnect"}]
+    assert [event["id"] for event in drain(idle)] == [2]
+
+
+def test_recovery_drops_every_local_cache(client):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    client.get("/status/1")
+    client.get("/status/all")
+    count_cache.set(("Status", "", "{}", False), 1)
+    cache = status_service.cache
+    assert cache.get_entity(1) is not None
+
+    feed = ChangeFeed()
+
+    async def run():
+        subscription = feed.subscribe()
+        feed._recover()
+        return drain(subscription)
+
+    assert asyncio.run(run()) == [{"type": "resync", "reason": "reconnect"}]
+    assert cache.get_entity(1) is None
+    assert cache.get_query("all", "", cache.generation()) is None
+    assert count_cache.get(("Status", "", "{}", False)) is None
+    assert version_tracker._loaded_at == 0.0
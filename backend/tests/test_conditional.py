@@ -0,0 +1,26 @@
+def test_all_is_not_modified_until_a_write(client):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    first = client.get("/status/all")
+    etag = first.headers["ETag"]
+
+    unchanged = client.get("/status/all", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+
+    assert client.post("/status/", json={"name": "Done", "order": 1}).status_code == 201
+    changed = client.get("/status/all", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [status["name"] for status in changed.json()] == ["Todo", "Done"]
+    assert client.get("/status/all", headers={"If-None-Match": changed.headers["ETag"]}).status_code == 304
+
+
+def test_search_is_not_modified_until_a_write(client):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    etag = client.post("/status/search", json={}).headers["ETag"]
+    assert client.post("/status/search", json={}, headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.put("/status/1", json={"name": "Done"}).status_code == 200
+    changed = client.post("/status/search", json={}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["items"][0]["name"] == "Done"
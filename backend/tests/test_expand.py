@@ -0,0 +1,34 @@
+import pytest
+from app.api.task.task_router import task_service
+from app.crud.crud_search_dtos import EntitySearchDto
+from app.metrics import StatementBudgetExceeded, statement_budget
+
+
+@pytest.mark.parametrize("req, budget", [
+    (EntitySearchDto(), 2),  # page, exact count
+    (EntitySearchDto(expand=["status", "category"]), 2),  # relationships joined into the page
+    (EntitySearchDto(countStrategy="inline", expand=["status", "category"]), 1),
+    (EntitySearchDto(cursor="", orderByColumn="due_date", countStrategy="none"), 2),  # plus the NULL block
+])
+def test_search_statement_budget(seed, db, req, budget):
+    seed(30)
+    with statement_budget(budget):
+        result = task_service.search(db, req)
+    assert len(result["items"]) == 10
+
+
+def test_get_all_statement_budget(seed, db):
+    seed(30)
+    with statement_budget(1):
+        tasks = task_service.get_all(db, expand=["status", "category"])
+    assert len(tasks) == 30
+    assert all(task.status is not None and task.category is not None for task in tasks)
+
+
+def test_statement_budget_catches_lazy_loads(seed, db):
+    seed(3)
+    task_service.get_all(db)
+    db.expire_all()
+    with pytest.raises(StatementBudgetExceeded):
+        with statement_budget(1):
+            [task.status.name for task in task_service.get_all(db)]
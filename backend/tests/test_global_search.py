@@ -0,0 +1,28 @@
+from sqlalchemy.dialects import postgresql
+from app.api.task.task_router import task_service
+from app.crud.crud_search_dtos import EntitySearchDto
+
+
+def make_tasks(client, *descriptions):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    for i, description in enumerate(descriptions):
+        client.post("/task/", json={"title": f"task {i}", "description": description, "status_id": 1, "priority": i})
+
+
+def titles(search_tasks, text):
+    return sorted(task["title"] for task in search_tasks(globalFilter=text)["items"])
+
+
+def test_description_matches_substrings(client, search_tasks):
+    make_tasks(client, "send the invoice", "call the customer", None)
+    assert titles(search_tasks, "voic") == ["task 0"]
+    assert titles(search_tasks, "CUSTOM") == ["task 1"]
+    assert titles(search_tasks, "task 2") == ["task 2"]  # titles still match
+
+
+def test_postgres_keeps_substring_next_to_word_matches():
+    plan, _, params = task_service._build_search_queries(EntitySearchDto(globalFilter="voic"), "postgresql")
+    sql = str(plan.base_query.compile(dialect=postgresql.dialect()))
+    assert "task.description ILIKE %(filter_contains)s" in sql
+    assert "task.search_vector @@ websearch_to_tsquery" in sql
+    assert params["filter_contains"] == "%voic%"
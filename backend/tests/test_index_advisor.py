@@ -0,0 +1,27 @@
+from app.api.task.task_dtos import TaskResponseDto
+from app.api.task.task_model import Task
+from app.crud import crud_index_advisor
+from app.crud.crud_serializer import response_model_registry
+
+
+def record(**request):
+    return {"model": "Task", "request": {"pageSize": 20, **request}}
+
+
+def test_replay_keeps_the_app_response_models(db, monkeypatch):
+    # EXPLAIN (FORMAT JSON) is Postgres-only: every statement scans task
+    monkeypatch.setattr(crud_index_advisor, "explain", lambda *args, **kwargs: {"Node Type": "Seq Scan", "Relation Name": "task"})
+    built = []
+    service_class = crud_index_advisor.BaseCrudService
+    monkeypatch.setattr(crud_index_advisor, "BaseCrudService", lambda *args: built.append(args) or service_class(*args))
+
+    records = [record(criteria={"category_id": 1}, orderByColumn="priority")] * 3 + [record(orderByColumn="title")]
+    report = crud_index_advisor.advise(db, records, crud_index_advisor.load_models())
+
+    assert len(built) == 1
+    assert response_model_registry[Task] is TaskResponseDto
+    assert report["errors"] == []
+    assert report["seqScans"][0]["count"] == 3
+    assert {entry["ddl"] for entry in report["suggestions"]} == {
+        "CREATE INDEX CONCURRENTLY ix_task_title_id ON task (title, id);",
+    }
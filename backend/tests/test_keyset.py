@@ -0,0 +1,31 @@
+import pytest
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_keyset_pages_cross_the_null_block(seed, search_tasks, ascending):
+    tasks = seed(20)
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = search_tasks(cursor=cursor, orderByColumn="due_date", ascending=ascending, pageSize=3)
+        seen += page["items"]
+        cursor = page["nextCursor"]
+        assert page["hasNext"] == (cursor is not None)
+
+    assert sorted(task["id"] for task in seen) == sorted(task["id"] for task in tasks)
+    dated = [task for task in seen if task["due_date"] is not None]
+    undated = [task for task in seen if task["due_date"] is None]
+    # (due_date, id) order, then every task without a due date in id order
+    assert seen == dated + undated
+    keys = [(task["due_date"], task["id"]) for task in dated]
+    assert keys == sorted(keys, reverse=not ascending)
+    ids = [task["id"] for task in undated]
+    assert ids == sorted(ids, reverse=not ascending)
+
+
+def test_keyset_page_ending_on_the_last_non_null_row(seed, search_tasks):
+    tasks = seed(6)  # tasks 0 and 3 have no due date
+    page = search_tasks(cursor="", orderByColumn="due_date", pageSize=4)
+    assert all(task["due_date"] is not None for task in page["items"])
+    page = search_tasks(cursor=page["nextCursor"], orderByColumn="due_date", pageSize=4)
+    assert [task["id"] for task in page["items"]] == [tasks[0]["id"], tasks[3]["id"]]
+    assert page["nextCursor"] is None
@@ -0,0 +1,70 @@
+import math
+from sqlalchemy import text
+from app.api.task.task_service import PRIORITY_STEP
+
+
+def column(client, status_id):
+    tasks = client.post("/task/search", json={
+        "criteria": {"status_id": status_id}, "orderByColumn": "priority", "pageSize": 20,
+    }).json()["items"]
+    return [task["id"] for task in tasks]
+
+
+def make_column(client, count, status_id=1):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    client.post("/status/", json={"name": "Done", "order": 1})
+    for i in range(count):
+        response = client.post("/task/", json={"title": f"task {i}", "status_id": status_id, "priority": i * PRIORITY_STEP})
+        assert response.status_code == 201, response.text
+
+
+def test_move_within_the_column_keeps_the_status(client):
+    make_column(client, 4)
+    response = client.post("/task/1/reorder", json={"after_id": 3})
+    assert response.status_code == 200, response.text
+    assert response.json()["status_id"] == 1
+    assert column(client, 1) == [2, 3, 1, 4]
+
+    assert client.post("/task/4/reorder", json={}).status_code == 200  # to the top
+    assert column(client, 1) == [4, 2, 3, 1]
+
+
+def test_move_to_another_column(client):
+    make_column(client, 3)
+    assert client.post("/task/2/reorder", json={"status_id": 2}).json()["status_id"] == 2
+    assert client.post("/task/3/reorder", json={"status_id": 2, "after_id": 2}).status_code == 200
+    assert column(client, 2) == [2, 3]
+    assert column(client, 1) == [1]
+
+
+def test_anchor_must_be_in_the_target_column(client):
+    make_column(client, 3)
+    client.post("/task/3/reorder", json={"status_id": 2})
+    response = client.post("/task/1/reorder", json={"after_id": 3})
+    assert response.status_code == 400
+    assert "not in status 1" in response.json()["detail"]
+
+
+def test_exhausted_midpoint_rebalances_the_column_inline(client, db):
+    make_column(client, 3)
+    # no float left between tasks 1 and 2
+    db.execute(text("UPDATE task SET priority = :priority WHERE id = 2"), {"priority": math.nextafter(0.0, 1.0)})
+    db.commit()
+
+    response = client.post("/task/3/reorder", json={"after_id": 1})
+    assert response.status_code == 200, response.text
+    assert column(client, 1) == [1, 3, 2]
+    priorities = [row[0] for row in db.execute(text("SELECT priority FROM task ORDER BY priority"))]
+    # respaced with task 3 still last, then moved to the new midpoint
+    assert priorities == [PRIORITY_STEP, 1.5 * PRIORITY_STEP, 2 * PRIORITY_STEP]
+
+
+def test_crowded_column_is_rebalanced_after_the_response(client, db):
+    make_column(client, 3)
+    db.execute(text("UPDATE task SET priority = 1e-7 WHERE id = 2"))
+    db.commit()
+
+    assert client.post("/task/3/reorder", json={"after_id": 1}).status_code == 200
+    assert column(client, 1) == [1, 3, 2]
+    priorities = [row[0] for row in db.execute(text("SELECT priority FROM task ORDER BY priority"))]
+    assert priorities == [PRIORITY_STEP, 2 * PRIORITY_STEP, 3 * PRIORITY_STEP]
@@ -0,0 +1,91 @@
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.database import SessionLocal
+from app.database_replicas import (
+    READ_YOUR_WRITES_WINDOW,
+    WROTE_AT_COOKIE,
+    WROTE_AT_HEADER,
+    ReadYourWritesMiddleware,
+    Replica,
+    ReplicaSet,
+    client_wrote_at,
+    request_wrote_at,
+)
+
+
+def checked_replica(lag: float = 0.0) -> Replica:
+    replica = Replica("replica0", create_engine("sqlite://"))
+    replica.check()
+    replica.lag = lag
+    return replica
+
+
+def test_reads_go_to_a_healthy_replica():
+    replica = checked_replica()
+    assert replica.healthy
+    assert ReplicaSet([replica]).pick(None) is replica
+
+
+def test_reads_right_after_an_own_write_stay_on_the_primary():
+    replicas = ReplicaSet([checked_replica()])
+    assert replicas.pick(time.time()) is None
+    assert replicas.pick(time.time() - READ_YOUR_WRITES_WINDOW - 1) is not None
+
+
+def test_a_replica_behind_the_clients_write_serves_no_reads():
+    replicas = ReplicaSet([checked_replica(lag=3.0)])
+    assert replicas.pick(time.time() - READ_YOUR_WRITES_WINDOW - 1) is None
+    assert replicas.pick(time.time() - 4.0) is not None
+
+
+def test_unchecked_or_stale_replicas_serve_no_reads():
+    replica = Replica("replica0", create_engine("sqlite://"))
+    assert ReplicaSet([replica]).pick(None) is None
+    replica.check()
+    replica.checked_at -= 3600
+    assert ReplicaSet([replica]).pick(None) is None
+
+
+def scope(*headers):
+    return {"headers": [(name.lower().encode(), value.encode()) for name, value in headers]}
+
+
+def test_write_marker_from_header_or_cookie():
+    assert request_wrote_at(scope()) is None
+    assert request_wrote_at(scope((WROTE_AT_HEADER, "100.5"))) == 100.5
+    assert request_wrote_at(scope(("Cookie", f"{WROTE_AT_COOKIE}=100.5"))) == 100.5
+    assert request_wrote_at(scope(("Cookie", f"{WROTE_AT_COOKIE}=90"), (WROTE_AT_HEADER, "100.5"))) == 100.5
+    assert request_wrote_at(scope((WROTE_AT_HEADER, "soon"))) is None
+
+
+def test_write_marker_round_trip_through_the_header():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/write")
+    def write():
+        with SessionLocal() as db:
+            db.execute(text("SELECT 1"))
+            db.commit()
+
+    @app.get("/read")
+    def read():
+        return {"wroteAt": client_wrote_at()}
+
+    client = TestClient(app)
+    before = time.time()
+    written = client.post("/write")
+    marker = written.headers[WROTE_AT_HEADER]
+    assert float(marker) >= before - 0.001
+    assert client.get("/read").headers.get(WROTE_AT_HEADER) is None  # reads hand out nothing
+
+    client.cookies.clear()  # a cross-origin browser sends no cookies, only the header
+    assert client.get("/read").json()["wroteAt"] is None
+    assert client.get("/read", headers={WROTE_AT_HEADER: marker}).json()["wroteAt"] == float(marker)
+
+
+def test_write_marker_is_exposed_to_cross_origin_clients(client):
+    response = client.get("/status/all", headers={"Origin": "http://localhost:3000"})
+    assert WROTE_AT_HEADER in response.headers["access-control-expose-headers"]
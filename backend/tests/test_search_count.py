@@ -0,0 +1,58 @@
+from app.crud import crud_service
+
+
+def test_estimated_count_with_criteria_is_filtered(seed, search_tasks, monkeypatch):
+    seed(30)
+    calls = []
+
+    def count_estimated(db, model, query, params, filtered):
+        calls.append(filtered)
+        return None  # no planner here, falls back to an exact count
+
+    monkeypatch.setattr(crud_service, "count_estimated", count_estimated)
+    unfiltered = search_tasks(countStrategy="estimated", pageSize=5)
+    filtered = search_tasks(countStrategy="estimated", pageSize=5, criteria={"status_id": 1})
+    assert calls == [False, True]
+    assert unfiltered["countStrategy"] == filtered["countStrategy"] == "exact"
+    assert unfiltered["pageCount"] == 6
+    assert filtered["pageCount"] == 3
+
+
+def test_estimated_count_never_uses_table_statistics_for_criteria(seed, search_tasks, monkeypatch):
+    seed(30)
+    # a whole-table estimate far above the exact-count threshold
+    monkeypatch.setattr(
+        crud_service, "count_estimated",
+        lambda db, model, query, params, filtered: None if filtered else 1_000_000,
+    )
+    assert search_tasks(countStrategy="estimated", pageSize=5)["pageCount"] == 200_000
+    result = search_tasks(countStrategy="estimated", pageSize=5, criteria={"status_id": {"in": [2]}})
+    assert result["countStrategy"] == "exact"
+    assert result["pageCount"] == 3
+
+
+def test_inline_count_matches_exact(seed, search_tasks):
+    seed(30)
+    for criteria in ({}, {"status_id": 2}, {"priority": {"gte": 5}}):
+        exact = search_tasks(pageSize=4, criteria=criteria)
+        inline = search_tasks(countStrategy="inline", pageSize=4, criteria=criteria)
+        assert inline["countStrategy"] == "inline"
+        assert inline["pageCount"] == exact["pageCount"]
+        assert inline["items"] == exact["items"]
+    # a page past the end still knows the total
+    assert search_tasks(countStrategy="inline", pageSize=4, pageNo=20)["pageCount"] == 8
+
+
+def test_none_skips_the_count(seed, search_tasks):
+    seed(30)
+    first = search_tasks(countStrategy="none", pageSize=20)
+    last = search_tasks(countStrategy="none", pageSize=20, pageNo=2)
+    assert first["pageCount"] is None and first["hasNext"]
+    assert len(last["items"]) == 10 and not last["hasNext"]
+
+
+def test_cached_count_is_dropped_on_write(client, seed, search_tasks):
+    seed(30)
+    assert search_tasks(countStrategy="cached", pageSize=5, criteria={"status_id": 1})["pageCount"] == 3
+    client.post("/task/", json={"title": "one more", "status_id": 1, "priority": 0})
+    assert search_tasks(countStrategy="cached", pageSize=5, criteria={"status_id": 1})["pageCount"] == 4
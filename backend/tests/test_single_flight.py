@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.crud.crud_single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    flight = SingleFlight("test-sync")
+    runs, release = [], threading.Event()
+
+    def query():
+        runs.append(1)
+        release.wait(5)
+        return [1, 2, 3]
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flight.do, "key", query) for _ in range(8)]
+        while flight.leaders + flight.followers < 8:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(runs) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"leaders": 1, "coalesced": 7}
+    # nothing is kept once the call is done
+    assert flight.do("key", lambda: "again") == "again"
+
+
+def test_followers_get_the_leaders_error():
+    flight = SingleFlight("test-error")
+    release = threading.Event()
+
+    def query():
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(flight.do, "key", query) for _ in range(3)]
+        while flight.leaders + flight.followers < 3:
+            time.sleep(0.001)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test-keys")
+    assert [flight.do(key, lambda key=key: key * 2) for key in (1, 2)] == [2, 4]
+    assert flight.stats() == {"leaders": 2, "coalesced": 0}
+
+
+def test_async_follower_reruns_when_the_leader_is_cancelled():
+    flight = SingleFlight("test-async")
+    runs = []
+
+    async def query():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return len(runs)
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do_async("key", query))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.do_async("key", query)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    # the leader's query goes with it, one follower takes over for the rest
+    assert asyncio.run(run()) == [2, 2, 2]
+    assert len(runs) == 2
@@ -0,0 +1,35 @@
+import json
+from app.api.task.task_router import task_service
+from app.database import engine
+
+
+def test_json_and_ndjson_list_every_task_in_id_order(client, seed):
+    tasks = seed(12)
+    as_json = client.get("/task/all")
+    as_ndjson = client.get("/task/all", params={"format": "ndjson"})
+
+    assert as_json.headers["content-type"].startswith("application/json")
+    assert as_ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert as_json.json() == tasks
+    assert [json.loads(line) for line in as_ndjson.text.splitlines()] == tasks
+
+
+def test_expanded_stream_embeds_relations(client, seed):
+    seed(4)
+    lines = client.get("/task/all", params={"format": "ndjson", "expand": "status,category"}).text.splitlines()
+    assert [json.loads(line)["status"]["name"] for line in lines] == ["Todo", "Done", "Todo", "Done"]
+    assert {json.loads(line)["category"]["name"] for line in lines} == {"Feature"}
+
+
+def test_rows_come_in_bounded_batches(seed, db):
+    seed(10)
+    batches = list(task_service.iter_all(db, batch_size=4))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert [task.id for batch in batches for task in batch] == list(range(1, 11))
+
+
+def test_session_is_released_with_the_response(client, seed):
+    seed(5)
+    checked_out = engine.pool.checkedout()
+    assert client.get("/task/all", params={"format": "ndjson"}).status_code == 200
+    assert engine.pool.checkedout() == checked_out
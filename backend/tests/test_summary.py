@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+
+def summary(client, **params):
+    response = client.get("/task/summary", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_counts_per_status_and_category(client, seed):
+    seed(30)  # due dates in January 2026, every third task without one
+    tomorrow = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    client.post("/task/", json={"title": "later", "due_date": tomorrow, "status_id": 2, "priority": 0})
+
+    result = summary(client, mode="live")
+    assert (result["total"], result["overdue"], result["mode"]) == (31, 20, "live")
+    assert result["byStatus"] == [
+        {"status_id": 1, "count": 15, "overdue": 10},
+        {"status_id": 2, "count": 16, "overdue": 10},
+    ]
+    assert result["byCategory"] == [
+        {"category_id": 1, "count": 30, "overdue": 20},
+        {"category_id": None, "count": 1, "overdue": 0},
+    ]
+
+
+def test_table_mode_falls_back_to_live_without_triggers(client, seed):
+    seed(6)
+    result = summary(client)
+    assert result["mode"] == "live"
+    assert result["total"] == 6
+    client.delete("/task/1")
+    assert summary(client)["byStatus"][0] == {"status_id": 1, "count": 2, "overdue": 2}
@@ -0,0 +1,84 @@
+import csv
+import importlib.util
+import io
+import pytest
+from app.api.task.task_dtos import TaskCreateDto
+from app.api.task.task_router import task_service
+from app.crud import crud_transfer
+from app.crud.crud_transfer import import_table
+
+HEADER = "title,description,due_date,status_id,category_id,priority\n"
+
+
+def make_statuses(client):
+    client.post("/status/", json={"name": "Todo", "order": 0})
+    client.post("/status/", json={"name": "Done", "order": 1})
+
+
+def import_csv(client, body):
+    response = client.post("/task/import", content=body.encode(), headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_invalid_rows_are_reported_by_index(client, search_tasks):
+    make_statuses(client)
+    report = import_csv(client, HEADER + (
+        "write docs,,2026-01-01T00:00:00,1,,1\n"
+        ",no title,,1,,2\n"
+        "ship it,,,2,,3\n"
+        "tidy up,,,1,,high\n"
+    ))
+
+    assert (report["rows"], report["rejected"]) == (2, 2)
+    assert [error["index"] for error in report["errors"]] == [1, 3]
+    assert report["errors"][1]["detail"][0]["loc"] == ["priority"]
+    assert sorted(task["title"] for task in search_tasks()["items"]) == ["ship it", "write docs"]
+
+
+def test_rows_keep_their_index_across_batches(client, db, search_tasks):
+    make_statuses(client)
+    rows = "".join(f"task {i},,,1,,{i}\n" if i % 3 else f",,,1,,{i}\n" for i in range(7))
+    with io.BytesIO((HEADER + rows).encode()) as source:
+        report = import_table(db, task_service, TaskCreateDto, source, "csv", batch_size=2)
+
+    assert [error["index"] for error in report["errors"]] == [0, 3, 6]
+    assert report["rows"] == 4
+    tasks = search_tasks(orderByColumn="priority")["items"]
+    assert [(task["title"], task["priority"]) for task in tasks] == [(f"task {i}", i) for i in (1, 2, 4, 5)]
+    # defaults the CSV does not carry are filled in
+    assert all(task["created_at"] for task in tasks)
+
+
+def test_report_lists_a_bounded_number_of_errors(client, monkeypatch):
+    monkeypatch.setattr(crud_transfer, "TRANSFER_MAX_ERRORS", 3)
+    make_statuses(client)
+    report = import_csv(client, HEADER + ",,,1,,1\n" * 5)
+    assert (report["rows"], report["rejected"], len(report["errors"])) == (0, 5, 3)
+
+
+def test_export_imports_back(client, seed, search_tasks):
+    tasks = seed(6)
+    exported = client.get("/task/export")
+    assert exported.status_code == 200
+    assert exported.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(exported.text)))
+    assert [int(row["id"]) for row in rows] == [task["id"] for task in tasks]
+
+    # ids are not part of the create DTO, the copies get new ones
+    assert import_csv(client, exported.text)["rows"] == 6
+
+    def fields(task):
+        return task["title"], task["description"], task["due_date"], task["status_id"], task["priority"]
+
+    everything = search_tasks(orderByColumn="id", pageSize=20)["items"]
+    assert [fields(task) for task in everything[6:]] == [fields(task) for task in tasks]
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pyarrow") is not None, reason="pyarrow is installed")
+@pytest.mark.parametrize("route", ["/task/export?format=arrow", "/task/import?format=arrow"])
+def test_arrow_without_pyarrow_is_a_bad_request(client, route):
+    method = client.get if "export" in route else client.post
+    response = method(route)
+    assert response.status_code == 400
+    assert "pyarrow" in response.json()["detail"]
@@ -0,0 +1,4 @@
+#!/bin/sh
+# Runs once on a fresh primary volume: let the standby stream WAL.
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
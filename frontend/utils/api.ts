@@ -1,19 +1,32 @@
 export const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+// Time of this client's last write, handed out by the API and sent back so
+// reads right after it are not served by a replica that has not replayed it
+const WROTE_AT_HEADER = "X-DB-Wrote-At";
+let wroteAt: string | null = null;
+
+const request = async (path: string, init: RequestInit) => {
+  const headers = new Headers(init.headers);
+  wroteAt && headers.set(WROTE_AT_HEADER, wroteAt);
+  const response = await fetch(API_URL + path, { ...init, headers });
+  wroteAt = response.headers.get(WROTE_AT_HEADER) || wroteAt;
+  return response;
+};
+
 export const emitHttp = (method: string, path: string) =>
-  fetch(API_URL + path, {
+  request(path, {
     method
   });
 
 export const emitHttpRaw = (method: string, path: string, body: any = undefined) =>
-  fetch(API_URL + path, {
+  request(path, {
     method,
     headers: { "Content-Type": "application/json" },
     body,
   });
 
 export const emitHttpJson = (method: string, path: string, body: any = undefined) =>
-  fetch(API_URL + path, {
+  request(path, {
     method,
     headers: { "Content-Type": "application/json" },
     body: body && JSON.stringify(body),
@@ -24,7 +37,7 @@ export const emitHttpForm = (method: string, path: string, body: any = undefined
   body && Object.keys(body).map((key) => {
     formData.append(key, body[key]);
   });
-  return fetch(API_URL + path, {
+  return request(path, {
     method,
     body: formData,
   });